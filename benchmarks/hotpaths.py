@@ -0,0 +1,556 @@
+"""Throughput of the state, dedup and conversion hot paths at realistic scale.
+
+Every benchmark runs in a fresh interpreter against copies of shared
+synthetic fixtures: a state.db holding 100k captured URLs and 5k
+allowlisted senders, large markdown bodies, a local mock feed server and
+an in-memory vault backend. Each reports operations per second (median
+and best of `--repeat` runs) and the worker's peak RSS, so two commits
+can be compared on the same machine.
+
+    python benchmarks/hotpaths.py                      # print a table
+    python benchmarks/hotpaths.py --only is_captured   # a subset, by name prefix
+    python benchmarks/hotpaths.py --scale 0.1          # smaller fixtures, quicker
+    python benchmarks/hotpaths.py --json out.json      # save results
+    python benchmarks/hotpaths.py --baseline out.json  # compare, exit 1 on regression
+
+Feed sync runs the real `feed sync` command against the mock server, with
+article extraction stubbed out, so it measures our orchestration —
+conditional fetch, dedup, watermarks, batched writes and state commits —
+rather than trafilatura. The server (a separate process) answers
+instantly, so `feed_sync.parallel` shows the pipeline's own overhead, not
+the speed-up it buys against real network latency.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable
+
+CAPTURED = 100_000
+SENDERS = 5_000
+LOOKUPS = 50_000
+FEEDS = 20
+ENTRIES_PER_FEED = 50
+BODY_KB = 256
+SEED = 1234
+
+HOSTS = [f"{word}{i}.example" for i in range(100) for word in ("news", "blog", "mag", "dev", "zine")]
+
+
+# --- Synthetic data (deterministic, so every worker regenerates the same) ---
+
+
+def captured_urls(n: int) -> list[str]:
+    rng = random.Random(SEED)
+    return [
+        f"https://{rng.choice(HOSTS)}/{2020 + i % 7}/{i % 12 + 1:02d}/post-{i}-{rng.getrandbits(32):08x}"
+        for i in range(n)
+    ]
+
+
+def new_urls(n: int) -> list[str]:
+    return [f"https://fresh{i % 50}.example/p/{i}?utm_source=rss&ref=feed" for i in range(n)]
+
+
+def sender_entries(n: int) -> list[str]:
+    domains = n // 5
+    return [f"@letters{i}.example" for i in range(domains)] + [
+        f"writer{i}@{HOSTS[i % len(HOSTS)]}" for i in range(n - domains)
+    ]
+
+
+def sender_lookups(n: int, senders: int) -> list[str]:
+    """A third exact-address hits, a third subdomain hits, a third misses."""
+    rng = random.Random(SEED)
+    domains = senders // 5
+    out = []
+    for i in range(n):
+        kind = i % 3
+        if kind == 0:
+            j = rng.randrange(senders - domains)
+            out.append(f"Writer{j}@{HOSTS[j % len(HOSTS)]}")
+        elif kind == 1:
+            out.append(f"digest@mail.letters{rng.randrange(domains)}.example")
+        else:
+            out.append(f"someone{i}@unknown{i % 997}.example")
+    return out
+
+
+def markdown_body(kb: int, salt: int = 0) -> str:
+    """Roughly *kb* KiB of article-shaped markdown."""
+    rng = random.Random(SEED + salt)
+    words = "the of capture vault feed markdown reader archive signal latency index".split()
+    parts: list[str] = []
+    size = 0
+    section = 0
+    while size < kb * 1024:
+        if size == 0 or rng.random() < 0.08:
+            section += 1
+            parts.append(f"## Section {section}\n")
+        if rng.random() < 0.05:
+            parts.append("```python\n" + "\n".join(f"x{j} = {j} * 2" for j in range(8)) + "\n```\n")
+        para = " ".join(rng.choice(words) for _ in range(80))
+        parts.append(f"{para} [link](https://example.com/{section}/{size}).\n")
+        size += len(parts[-1]) + len(parts[-2])
+    return "\n".join(parts)
+
+
+def build_fixtures(root: Path, scale: float) -> None:
+    """Seed a state dir with the captured history and sender allowlist."""
+    from amperstand.state import AppState
+
+    state = AppState(root / "state")
+    try:
+        with state.batch():
+            for url in captured_urls(int(CAPTURED * scale)):
+                state.mark_captured(url)
+        for entry in sender_entries(int(SENDERS * scale)):
+            state.add_sender(entry)
+        state.is_captured("https://warm.example/")  # write captured.idx
+    finally:
+        state.close()
+
+
+# --- Worker side ---
+
+
+class Bench:
+    """One benchmark: untimed `setup`, then a timed `run` returning the op count."""
+
+    def __init__(self, run: Callable[[Any], int], setup: Callable[[Path], Any] | None = None) -> None:
+        self.run = run
+        self.setup = setup
+
+
+def _fresh_state_dir(ctx: Path) -> Path:
+    """A private copy of the seeded state dir (for benchmarks that write)."""
+    target = Path.home() / ".amperstand"
+    shutil.rmtree(target, ignore_errors=True)
+    shutil.copytree(ctx / "state", target)
+    return target
+
+
+def _open_state(ctx: Path):
+    from amperstand.state import AppState
+
+    return AppState(_fresh_state_dir(ctx))
+
+
+def _bench_mark_batched(state) -> int:
+    urls = new_urls(LOOKUPS // 2)
+    with state.batch():
+        for url in urls:
+            state.mark_captured(url)
+    state.close()
+    return len(urls)
+
+
+def _bench_mark_single(state) -> int:
+    urls = new_urls(500)
+    for url in urls:
+        state.mark_captured(url)
+    state.close()
+    return len(urls)
+
+
+def _setup_lookups(ctx: Path, hits: bool):
+    state = _open_state(ctx)
+    if hits:
+        urls = captured_urls(int(CAPTURED * _scale()))
+        rng = random.Random(SEED)
+        # Some spellings only match after canonicalization.
+        urls = [
+            u + "?utm_source=newsletter" if i % 4 == 0 else u
+            for i, u in enumerate(rng.choices(urls, k=LOOKUPS))
+        ]
+    else:
+        urls = [f"https://{HOSTS[i % len(HOSTS)]}/unseen/{i}" for i in range(LOOKUPS)]
+    state.is_captured(urls[0])  # open the index outside the timing
+    return state, urls, hits
+
+
+def _bench_lookups(ctx) -> int:
+    state, urls, hits = ctx
+    found = sum(state.is_captured(url) for url in urls)
+    state.close()
+    if found != (len(urls) if hits else 0):
+        raise AssertionError(f"expected {'all' if hits else 'no'} hits, got {found}/{len(urls)}")
+    return len(urls)
+
+
+def _setup_senders(ctx: Path):
+    state = _open_state(ctx)
+    lookups = sender_lookups(LOOKUPS, int(SENDERS * _scale()))
+    state.is_sender_allowed(lookups[0])  # compile the allowlist outside the timing
+    return state, lookups
+
+
+def _bench_senders(ctx) -> int:
+    state, lookups = ctx
+    allowed = sum(state.is_sender_allowed(s) for s in lookups)
+    state.close()
+    if allowed != len(lookups) - len(lookups) // 3:
+        raise AssertionError(f"unexpected allowlist hits: {allowed}")
+    return len(lookups)
+
+
+def _setup_convert(ctx: Path):
+    from amperstand_core.models import CapturedContent
+
+    return [
+        CapturedContent(url=f"https://mag{i}.example/long", title=f"Long read {i}", content_markdown=markdown_body(BODY_KB, i))
+        for i in range(8)
+    ]
+
+
+def _bench_convert(contents) -> int:
+    from amperstand.backend_bridge import content_to_backend_args
+
+    n = 0
+    for _ in range(250):
+        for content in contents:
+            content_to_backend_args(content)
+            n += 1
+    return n
+
+
+# Feed sync: mock feed server + in-memory vault backend.
+
+
+class MemoryBackend:
+    """Stands in for StoreBackend: hashes the body, keeps only counts."""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.bytes = 0
+
+    def create(self, body: str, frontmatter: dict[str, Any] | None = None) -> dict[str, Any]:
+        self.created += 1
+        self.bytes += len(body)
+        doc_id = f"{self.created:026d}"
+        return {
+            "id": doc_id,
+            "title": (frontmatter or {}).get("title"),
+            "path": f"docs/2026/01/{doc_id}.md",
+            "content_hash": hashlib.sha256(body.encode("utf-8")).hexdigest(),
+        }
+
+    def close(self) -> None:
+        pass
+
+
+def _feed_xml(base: str, feed: int) -> bytes:
+    items = "".join(
+        f"<item><title>Post {feed}-{j}</title><link>{base}/post/{feed}/{j}</link>"
+        f"<guid>{base}/post/{feed}/{j}</guid>"
+        f"<pubDate>{time.strftime('%a, %d %b %Y %H:%M:%S +0000', time.gmtime(1_700_000_000 + j * 3600))}</pubDate></item>"
+        for j in range(ENTRIES_PER_FEED)
+    )
+    return (
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>Feed {feed}</title>'
+        f"<link>{base}/</link>{items}</channel></rss>"
+    ).encode("utf-8")
+
+
+def _feed_server() -> tuple[ThreadingHTTPServer, str]:
+    body = markdown_body(16)
+    feeds: dict[str, bytes] = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        # Headers and body go out in separate writes; with Nagle on, each
+        # keep-alive response would stall on the client's delayed ACK.
+        disable_nagle_algorithm = True
+
+        def do_GET(self) -> None:  # noqa: N802
+            parts = self.path.strip("/").split("/")
+            if parts[0] == "feed":
+                payload = feeds[parts[1]]
+                etag = '"' + hashlib.md5(payload).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self._reply(payload, "application/rss+xml", etag)
+            else:
+                html = f"<html><title>{self.path}</title><article>{body}</article></html>"
+                self._reply(html.encode("utf-8"), "text/html")
+
+        def _reply(self, payload: bytes, ctype: str, etag: str | None = None) -> None:
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(payload)))
+            if etag:
+                self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format: str, *args) -> None:  # noqa: A002
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    for i in range(_feed_count()):
+        feeds[f"{i}.xml"] = _feed_xml(base, i)
+    return server, base
+
+
+def _start_feed_server() -> tuple[subprocess.Popen, str]:
+    """Run the mock feed server in its own process, so it doesn't share our GIL."""
+    proc = subprocess.Popen(
+        [sys.executable, __file__, "--feed-server"], stdout=subprocess.PIPE, text=True
+    )
+    base = proc.stdout.readline().strip()
+    if not base.startswith("http://"):
+        proc.kill()
+        raise RuntimeError("mock feed server did not start")
+    return proc, base
+
+
+def _patch_capture_path(backend: MemoryBackend) -> None:
+    """Route saves to *backend* and replace extraction with a cheap stub."""
+    import httpx
+
+    import amperstand.backend_bridge as bridge
+    import amperstand.capture_flow as capture_flow
+    from amperstand_core.models import CapturedContent
+
+    client = httpx.Client(timeout=30.0)
+
+    def fetch(url: str, **_) -> str:
+        resp = client.get(url)
+        resp.raise_for_status()
+        return resp.text
+
+    def extract_from_html(url: str, html: str, **_) -> CapturedContent:
+        title = html.split("<title>", 1)[1].split("</title>", 1)[0]
+        markdown = html.split("<article>", 1)[1].rsplit("</article>", 1)[0]
+        return CapturedContent(url=url, title=title, content_markdown=markdown)
+
+    bridge.get_backend = lambda: backend
+    capture_flow.fetch_html = fetch
+    capture_flow.extract_html = extract_from_html
+
+
+def _setup_feed_sync(ctx: Path, workers: int, unchanged: bool):
+    from amperstand.config import save_backend_config, set_value
+    from amperstand.state import AppState
+
+    state_dir = _fresh_state_dir(ctx)
+    save_backend_config({"kind": "store", "store": {"path": str(state_dir.parent / "vault")}}, state_dir)
+    set_value("extract_cache.enabled", "false", state_dir)  # every run starts cold
+    server, base = _start_feed_server()
+    state = AppState(state_dir)
+    for i in range(_feed_count()):
+        state.add_feed(f"{base}/feed/{i}.xml", name=f"Feed {i}")
+    state.close()
+    backend = MemoryBackend()
+    _patch_capture_path(backend)
+    args = ["feed", "sync", "--workers", str(workers), "--per-host", str(workers)]
+    if unchanged:
+        _invoke(args)
+        backend.created = 0
+    return server, backend, args, unchanged
+
+
+def _bench_feed_sync(ctx) -> int:
+    server, backend, args, unchanged = ctx
+    try:
+        _invoke(args)
+    finally:
+        server.terminate()
+        server.wait()
+    if unchanged:
+        if backend.created:
+            raise AssertionError(f"unchanged resync captured {backend.created} entries")
+        return _feed_count()
+    expected = _feed_count() * ENTRIES_PER_FEED
+    if backend.created != expected:
+        raise AssertionError(f"captured {backend.created} of {expected} entries")
+    return backend.created
+
+
+def _invoke(args: list[str]) -> None:
+    from typer.testing import CliRunner
+
+    from amperstand.cli import app
+
+    result = CliRunner().invoke(app, args)
+    if result.exit_code != 0:
+        raise RuntimeError(f"amperstand {' '.join(args)} failed:\n{result.output}") from result.exception
+
+
+BENCHMARKS: dict[str, Bench] = {
+    "mark_captured.batched": Bench(_bench_mark_batched, _open_state),
+    "mark_captured.single": Bench(_bench_mark_single, _open_state),
+    "is_captured.hit": Bench(_bench_lookups, lambda ctx: _setup_lookups(ctx, True)),
+    "is_captured.miss": Bench(_bench_lookups, lambda ctx: _setup_lookups(ctx, False)),
+    "is_sender_allowed": Bench(_bench_senders, _setup_senders),
+    "content_to_backend_args": Bench(_bench_convert, _setup_convert),
+    "feed_sync.serial": Bench(_bench_feed_sync, lambda ctx: _setup_feed_sync(ctx, 1, False)),
+    "feed_sync.parallel": Bench(_bench_feed_sync, lambda ctx: _setup_feed_sync(ctx, 8, False)),
+    "feed_sync.unchanged": Bench(_bench_feed_sync, lambda ctx: _setup_feed_sync(ctx, 1, True)),
+}
+
+
+def _scale() -> float:
+    return float(os.environ.get("AMPERSTAND_BENCH_SCALE", "1"))
+
+
+def _feed_count() -> int:
+    return max(2, int(FEEDS * min(1.0, _scale())))
+
+
+def _peak_rss_mb() -> float | None:
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_worker(name: str, fixtures: Path, repeat: int) -> dict[str, Any]:
+    import gc
+
+    bench = BENCHMARKS[name]
+    rates: list[float] = []
+    ops = 0
+    for _ in range(repeat):
+        ctx = bench.setup(fixtures) if bench.setup else fixtures
+        gc.collect()
+        started = time.perf_counter()
+        ops = bench.run(ctx)
+        rates.append(ops / (time.perf_counter() - started))
+    return {
+        "ops": ops,
+        "median_ops_s": round(statistics.median(rates), 1),
+        "best_ops_s": round(max(rates), 1),
+        "peak_rss_mb": round(_peak_rss_mb() or 0.0, 1),
+        "scale": _scale(),
+    }
+
+
+# --- Driver ---
+
+
+def measure(names: list[str], repeat: int, scale: float) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = Path(tmp) / "fixtures"
+        env = {
+            **os.environ,
+            "HOME": str(fixtures),
+            "AMPERSTAND_BENCH_SCALE": str(scale),
+            "PYTHONDONTWRITEBYTECODE": "1",
+        }
+        # Build in a child too: DEFAULT_STATE_DIR is fixed when amperstand is imported.
+        started = time.perf_counter()
+        subprocess.run(
+            [sys.executable, __file__, "--build", str(fixtures)], env=env, check=True
+        )
+        print(f"fixtures built in {time.perf_counter() - started:.1f}s", file=sys.stderr)
+        for name in names:
+            home = Path(tmp) / "home" / name
+            home.mkdir(parents=True)
+            proc = subprocess.run(
+                [sys.executable, __file__, "--worker", name, str(fixtures), "--repeat", str(repeat)],
+                env={**env, "HOME": str(home)},
+                capture_output=True,
+                text=True,
+            )
+            row = None
+            for line in proc.stdout.splitlines():
+                if line.startswith("@@result "):
+                    row = json.loads(line[len("@@result "):])
+            if row is None:
+                print(f"{name} failed:\n{proc.stderr[-2000:]}", file=sys.stderr)
+                row = {"error": (proc.stderr.strip().splitlines() or ["no output"])[-1]}
+            results[name] = row
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per benchmark (default 3)")
+    parser.add_argument("--only", action="append", default=[], help="run benchmarks whose name starts with this (repeatable)")
+    parser.add_argument("--scale", type=float, default=1.0, help="fixture size multiplier (default 1 = 100k URLs, 5k senders)")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --json run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="allowed throughput drop vs. baseline as a fraction (default 0.20)",
+    )
+    parser.add_argument("--build", type=Path, help=argparse.SUPPRESS)
+    parser.add_argument("--worker", nargs=2, metavar=("NAME", "FIXTURES"), help=argparse.SUPPRESS)
+    parser.add_argument("--feed-server", action="store_true", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    if opts.feed_server:
+        server, base = _feed_server()
+        print(base, flush=True)
+        server.serve_forever()
+        return 0
+
+    if opts.build:
+        build_fixtures(opts.build, _scale())
+        return 0
+    if opts.worker:
+        name, fixtures = opts.worker
+        print("@@result " + json.dumps(run_worker(name, Path(fixtures), opts.repeat)))
+        return 0
+
+    names = [n for n in BENCHMARKS if not opts.only or n.startswith(tuple(opts.only))]
+    if not names:
+        parser.error(f"no benchmark matches {opts.only}; have {', '.join(BENCHMARKS)}")
+    results = measure(names, opts.repeat, opts.scale)
+    baseline = json.loads(opts.baseline.read_text()) if opts.baseline else {}
+
+    regressions = []
+    failed = [name for name, row in results.items() if "error" in row]
+    width = max(len(name) for name in results)
+    print(f"{'benchmark'.ljust(width)}  {'ops':>7}  {'median ops/s':>12}  {'best ops/s':>12}  {'peak MB':>8}")
+    for name, row in results.items():
+        if "error" in row:
+            print(f"{name.ljust(width)}  error: {row['error']}")
+            continue
+        line = (
+            f"{name.ljust(width)}  {row['ops']:>7}  {row['median_ops_s']:>12,.0f}  "
+            f"{row['best_ops_s']:>12,.0f}  {row['peak_rss_mb']:>8.1f}"
+        )
+        before = baseline.get(name)
+        if before and "error" not in before and before.get("scale") == row["scale"]:
+            delta = row["median_ops_s"] / before["median_ops_s"] - 1
+            line += f"  ({delta:+.0%} vs baseline)"
+            if delta < -opts.threshold:
+                regressions.append(name)
+        print(line)
+
+    if opts.json:
+        opts.json.write_text(json.dumps(results, indent=2) + "\n")
+    if regressions:
+        print(f"\nslower than baseline by more than {opts.threshold:.0%}: {', '.join(regressions)}")
+    if failed:
+        print(f"\nfailed: {', '.join(failed)}")
+    return 1 if regressions or failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""Measure CLI startup time per subcommand.
+
+Each command runs in a fresh interpreter against a throwaway HOME, so the
+numbers include the full import cost a user pays when typing the command.
+Alongside the wall time we record which heavy third-party modules got
+imported: bookkeeping commands (`config show`, `feed list`, `--help`…)
+should never load trafilatura, feedparser, yt-dlp or Playwright.
+
+    python benchmarks/startup.py                      # print a table
+    python benchmarks/startup.py --json out.json      # save results
+    python benchmarks/startup.py --baseline out.json  # compare, exit 1 on regression
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+COMMANDS: list[list[str]] = [
+    ["--version"],
+    ["--help"],
+    ["config", "show"],
+    ["feed", "list"],
+    ["feed", "--help"],
+    ["email", "list"],
+    ["email", "--help"],
+    ["vault", "status"],
+    ["cache", "stats"],
+    ["daemon", "status"],
+    ["capture", "--help"],
+]
+
+# Modules that only the capture / sync paths need.
+HEAVY_MODULES = (
+    "trafilatura",
+    "feedparser",
+    "yt_dlp",
+    "playwright",
+    "bs4",
+    "lxml",
+    "httpx",
+    "amperstand_core.extractor",
+    "amperstand_core.youtube",
+    "amperstand_core.backend",
+)
+
+# Runs the CLI in-process, then reports which heavy modules it loaded.
+_RUNNER = """
+import json, sys
+sys.argv = ["amperstand", *sys.argv[1:]]
+from amperstand.cli import app
+try:
+    app()
+except SystemExit:
+    pass
+heavy = sorted(m for m in {heavy!r} if m in sys.modules)
+sys.stderr.write("\\n@@heavy " + json.dumps(heavy) + "\\n")
+"""
+
+
+def _run(args: list[str], env: dict[str, str]) -> tuple[float, list[str]]:
+    code = _RUNNER.format(heavy=HEAVY_MODULES)
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-c", code, *args],
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = (time.perf_counter() - started) * 1000
+    heavy: list[str] = []
+    for line in proc.stderr.splitlines():
+        if line.startswith("@@heavy "):
+            heavy = json.loads(line[len("@@heavy "):])
+    return elapsed, heavy
+
+
+def measure(repeat: int) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as home:
+        env = {**os.environ, "HOME": home, "PYTHONDONTWRITEBYTECODE": "1"}
+        for args in COMMANDS:
+            _run(args, env)  # warm the OS page cache and bytecode
+            timings = []
+            heavy: list[str] = []
+            for _ in range(repeat):
+                elapsed, heavy = _run(args, env)
+                timings.append(elapsed)
+            results[" ".join(args)] = {
+                "median_ms": round(statistics.median(timings), 1),
+                "min_ms": round(min(timings), 1),
+                "heavy": heavy,
+            }
+    return results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per command (default 5)")
+    parser.add_argument("--json", type=Path, help="write results to this file")
+    parser.add_argument("--baseline", type=Path, help="compare against a previous --json run")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.20,
+        help="allowed slowdown vs. baseline as a fraction (default 0.20)",
+    )
+    opts = parser.parse_args()
+
+    results = measure(opts.repeat)
+    baseline = json.loads(opts.baseline.read_text()) if opts.baseline else {}
+
+    regressions = []
+    width = max(len(name) for name in results)
+    print(f"{'command'.ljust(width)}  median ms   min ms  heavy imports")
+    for name, row in results.items():
+        line = f"{name.ljust(width)}  {row['median_ms']:9.1f}  {row['min_ms']:7.1f}  {', '.join(row['heavy']) or '-'}"
+        before = baseline.get(name)
+        if before:
+            delta = row["median_ms"] / before["median_ms"] - 1
+            line += f"  ({delta:+.0%} vs baseline)"
+            if delta > opts.threshold:
+                regressions.append(name)
+        print(line)
+
+    if opts.json:
+        opts.json.write_text(json.dumps(results, indent=2) + "\n")
+    if regressions:
+        print(f"\nslower than baseline by more than {opts.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
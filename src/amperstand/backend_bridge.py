@@ -4,27 +4,48 @@ The CLI deals in `CapturedContent` (title, url, author, body markdown, tags…).
 The backend's `create()` takes a body string + frontmatter dict. This module
 adapts one to the other and resolves the configured backend (or returns None
 for the legacy save_markdown fallback).
+
+`BackendSession` keeps one backend alive for a whole command run so a sync
+that saves hundreds of documents reads config.json once and reuses one
+keep-alive connection pool instead of paying a TLS handshake per document.
+
+`BatchWriter` is the batched write stage on top of it: it buffers converted
+documents and flushes them with `create_many()` once a batch is full (item
+count or body bytes) or its oldest document has waited long enough.
 """
 
 from __future__ import annotations
 
-from typing import Any
-
-from amperstand_core.backend import (
-    BackendError,
-    VaultBackend,
-    build_backend,
-)
-from amperstand_core.models import CapturedContent
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Sequence
 
+from amperstand import profiling
 from amperstand.config import load_backend_config
 
+if TYPE_CHECKING:
+    from amperstand_core.backend import VaultBackend
+    from amperstand_core.models import CapturedContent
+
+    from amperstand.outbox import Outbox
+
+# amperstand_core.backend pulls in httpx and the markdown store; it's
+# imported inside the functions that build or talk to a backend so commands
+# that never save (`config show`, `feed list`) don't pay for it at startup.
+
+logger = logging.getLogger(__name__)
+
 
 def get_backend() -> VaultBackend | None:
     """Return the configured VaultBackend, or None if no backend is set.
 
     None means: fall back to the legacy save_markdown + commit_file path.
     """
+    from amperstand_core.backend import BackendError, build_backend
+
     cfg = load_backend_config()
     if not cfg:
         return None
@@ -34,28 +55,300 @@ def get_backend() -> VaultBackend | None:
         return None
 
 
+class BackendSession:
+    """One lazily-built VaultBackend shared by every save in a command run.
+
+    The backend is built on first use and kept until `close()`. HTTPBackend
+    wraps an `httpx.Client`, which is thread-safe and pools keep-alive
+    connections, so worker threads call it concurrently. Other backends
+    (StoreBackend's MarkdownStore shares one SQLite connection with no
+    locking) get their `create()` calls serialized.
+
+    Callbacks registered with `subscribe()` see every created doc; the CLI
+    uses that to queue store-backend files for a batched git commit.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._backend: VaultBackend | None = None
+        self._resolved = False
+        self._concurrent = False
+        self._listeners: list[Callable[[dict[str, Any]], None]] = []
+
+    def kind(self) -> str | None:
+        """The configured backend kind ("http", "store"), read without building it."""
+        cfg = load_backend_config()
+        if not cfg:
+            return None
+        return (cfg.get("kind") or cfg.get("backend") or "").strip().lower() or None
+
+    def get(self) -> VaultBackend | None:
+        """Return the shared backend, building it on first call."""
+        with self._lock:
+            if not self._resolved:
+                from amperstand_core.backend import HTTPBackend
+
+                self._backend = get_backend()
+                self._concurrent = isinstance(self._backend, HTTPBackend)
+                self._resolved = True
+            return self._backend
+
+    @property
+    def concurrent(self) -> bool:
+        """True if `create()` may be called from several threads at once."""
+        self.get()
+        return self._concurrent
+
+    def create(self, body: str, frontmatter: dict[str, Any]) -> dict[str, Any]:
+        """`backend.create()` on the shared backend; raises BackendError if unset."""
+        backend = self.get()
+        if backend is None:
+            from amperstand_core.backend import BackendError
+
+            raise BackendError("no vault backend configured")
+        if self._concurrent:
+            with profiling.span("backend.create"):
+                doc = backend.create(body, frontmatter)
+        else:
+            with self._write_lock, profiling.span("backend.create"):
+                doc = backend.create(body, frontmatter)
+        for listener in self._listeners:
+            try:
+                listener(doc)
+            except Exception:  # noqa: BLE001
+                logger.exception("backend create listener failed")
+        return doc
+
+    def subscribe(self, listener: Callable[[dict[str, Any]], None]) -> None:
+        """Call *listener* with each doc `create()` returns, until `close()`."""
+        with self._lock:
+            self._listeners = [*self._listeners, listener]
+
+    def close(self) -> None:
+        """Close the backend (if built) and drop listeners. The next `get()` rebuilds it."""
+        with self._lock:
+            backend, self._backend, self._resolved = self._backend, None, False
+            self._listeners = []
+        if backend is not None:
+            try:
+                backend.close()
+            except Exception:  # noqa: BLE001
+                pass
+
+
+_session = BackendSession()
+
+
+def backend_session() -> BackendSession:
+    """Return the process-wide session the CLI commands share."""
+    return _session
+
+
 def content_to_backend_args(
     content: CapturedContent, *, prepend_heading: bool = True
 ) -> tuple[str, dict[str, Any]]:
     """Convert a CapturedContent into (body, frontmatter) for `backend.create()`."""
-    body_md = content.content_markdown
-    if prepend_heading and content.title and not body_md.lstrip().startswith("#"):
-        body_md = f"# {content.title}\n\n{body_md}"
-    if not body_md.endswith("\n"):
-        body_md += "\n"
-
-    # Serialize captured_at to ISO string — HTTPBackend's json= path can't
-    # handle a raw datetime, and the store now accepts both datetime and ISO.
-    captured_iso = content.captured_at.strftime("%Y-%m-%dT%H:%M:%SZ")
-    frontmatter: dict[str, Any] = {
-        "title": content.title,
-        "source": content.url,
-        "type": content.content_type.value,
-        "captured_at": captured_iso,
-        "tags": list(content.tags),
-    }
-    if content.author:
-        frontmatter["author"] = content.author
-    if content.sender_email:
-        frontmatter["sender_email"] = content.sender_email
-    return body_md, frontmatter
+    with profiling.span("convert"):
+        body_md = content.content_markdown
+        if prepend_heading and content.title and not body_md.lstrip().startswith("#"):
+            body_md = f"# {content.title}\n\n{body_md}"
+        if not body_md.endswith("\n"):
+            body_md += "\n"
+
+        # Serialize captured_at to ISO string — HTTPBackend's json= path can't
+        # handle a raw datetime, and the store now accepts both datetime and ISO.
+        captured_iso = content.captured_at.strftime("%Y-%m-%dT%H:%M:%SZ")
+        frontmatter: dict[str, Any] = {
+            "title": content.title,
+            "source": content.url,
+            "type": content.content_type.value,
+            "captured_at": captured_iso,
+            "tags": list(content.tags),
+        }
+        if content.author:
+            frontmatter["author"] = content.author
+        if content.sender_email:
+            frontmatter["sender_email"] = content.sender_email
+        return body_md, frontmatter
+
+
+# ── Batched writes ──────────────────────────────────────────────────
+
+
+@dataclass
+class CreateResult:
+    """Outcome of one document in a batch. `item` is the caller's handle."""
+
+    item: Any
+    doc: dict[str, Any] | None = None
+    error: Exception | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    @property
+    def queued(self) -> bool:
+        """True if the write failed and the document was parked in the outbox."""
+        return self.doc is not None and self.doc.get("outbox_id") is not None
+
+
+def create_many(
+    session: BackendSession,
+    docs: Sequence[tuple[str, dict[str, Any]]],
+    *,
+    concurrency: int = 4,
+) -> list[dict[str, Any] | Exception]:
+    """Create every `(body, frontmatter)` in *docs*; one result per input, in order.
+
+    Each result is the created doc dict or the exception that item raised —
+    one bad document never fails the rest of the batch. The server has no
+    bulk endpoint yet, so an HTTP batch is fanned out over the session's
+    pooled client `concurrency` requests at a time; other backends write
+    one after another.
+    """
+
+    def _one(doc: tuple[str, dict[str, Any]]) -> dict[str, Any] | Exception:
+        try:
+            return session.create(*doc)
+        except Exception as exc:  # noqa: BLE001
+            return exc
+
+    if concurrency <= 1 or len(docs) <= 1 or not session.concurrent:
+        return [_one(doc) for doc in docs]
+    with ThreadPoolExecutor(max_workers=min(concurrency, len(docs))) as pool:
+        return list(pool.map(_one, docs))
+
+
+class BatchWriter:
+    """Buffer converted documents and flush them in size- and time-bounded batches.
+
+    `add()` converts a CapturedContent and queues it; a batch is flushed
+    when it reaches `max_items` documents or `max_bytes` of body, or when
+    its oldest document has waited `max_delay` seconds (checked by a
+    background thread; pass `max_delay=None` to flush only on size and on
+    explicit `flush()` / `close()`).
+
+    `on_result` is called once per document with a `CreateResult`, from
+    whichever thread ran the flush — callers use it to `mark_captured` only
+    the documents that actually landed. With an `outbox`, a failed write is
+    parked there for retry and reported as a success whose doc is the
+    outbox's stand-in (`result.queued`).
+    """
+
+    def __init__(
+        self,
+        session: BackendSession,
+        on_result: Callable[[CreateResult], None],
+        *,
+        max_items: int = 25,
+        max_bytes: int = 2 * 1024 * 1024,
+        max_delay: float | None = 5.0,
+        concurrency: int = 4,
+        outbox: Outbox | None = None,
+    ) -> None:
+        self._session = session
+        self._on_result = on_result
+        self._outbox = outbox
+        self._max_items = max_items
+        self._max_bytes = max_bytes
+        self._max_delay = max_delay
+        self._concurrency = concurrency
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._buffer: list[tuple[Any, str, dict[str, Any]]] = []
+        self._buffered_bytes = 0
+        self._oldest: float | None = None
+        self._closed = False
+        self._timer: threading.Thread | None = None
+        if max_delay is not None:
+            self._timer = threading.Thread(target=self._run_timer, daemon=True)
+            self._timer.start()
+
+    def add(self, content: CapturedContent, item: Any = None) -> None:
+        """Queue *content*; `item` (default: the content) comes back in its result."""
+        body, fm = content_to_backend_args(content)
+        self.add_doc(body, fm, item=content if item is None else item)
+
+    def add_doc(self, body: str, frontmatter: dict[str, Any], item: Any = None) -> None:
+        """Queue an already-converted document."""
+        with self._cond:
+            self._buffer.append((item, body, frontmatter))
+            self._buffered_bytes += len(body.encode("utf-8"))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            full = (
+                len(self._buffer) >= self._max_items
+                or self._buffered_bytes >= self._max_bytes
+            )
+        if full:
+            self.flush()
+
+    def flush(self) -> list[CreateResult]:
+        """Write everything buffered now. Returns this flush's results."""
+        with self._flush_lock:
+            with self._cond:
+                batch, self._buffer = self._buffer, []
+                self._buffered_bytes = 0
+                self._oldest = None
+            if not batch:
+                return []
+            raw = create_many(
+                self._session,
+                [(body, fm) for _, body, fm in batch],
+                concurrency=self._concurrency,
+            )
+            results = []
+            for (item, body, fm), res in zip(batch, raw):
+                if isinstance(res, Exception):
+                    result = self._park(item, body, fm, res)
+                else:
+                    result = CreateResult(item, doc=res)
+                try:
+                    self._on_result(result)
+                except Exception:  # noqa: BLE001
+                    logger.exception("BatchWriter on_result callback failed")
+                results.append(result)
+            return results
+
+    def _park(self, item: Any, body: str, fm: dict[str, Any], error: Exception) -> CreateResult:
+        if self._outbox is None:
+            return CreateResult(item, error=error)
+        from amperstand.outbox import queued_doc
+
+        try:
+            entry_id = self._outbox.put(body, fm, error)
+        except Exception:  # noqa: BLE001
+            logger.exception("could not park failed write in the outbox")
+            return CreateResult(item, error=error)
+        return CreateResult(item, doc=queued_doc(entry_id, fm, error))
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and self._oldest is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._oldest + self._max_delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self.flush()
+
+    def close(self) -> list[CreateResult]:
+        """Flush what's left and stop the timer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._timer is not None:
+            self._timer.join()
+        return self.flush()
+
+    def __enter__(self) -> BatchWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
@@ -0,0 +1,269 @@
+"""A warm headless browser for JavaScript-heavy pages.
+
+The last fetch tier (`capture_flow.fetch_html`) renders pages that plain
+HTTP can't get in a headless browser. Launching Chromium for every such
+page dominates a feed sync that reaches dozens of them, so `BrowserPool`
+keeps one Chromium alive for the whole command and renders pages in up
+to `contexts` isolated browser contexts at once. Contexts share the
+browser process, so extra concurrency costs a renderer, not a browser.
+
+Playwright's async API drives every context from one event loop, which
+runs in the pool's own thread; capture threads call `fetch()`, which
+submits the page to that loop and waits. A context reuses its page for
+`page_uses` navigations before opening a new one (long-lived pages leak
+memory on script-heavy sites), and every fetch is bounded by
+`page_timeout` — a hung page fails that URL, not the run. If Chromium
+dies, the next fetch launches a new one.
+
+Nothing is launched until the first fetch, so runs where every page
+comes back over plain HTTP never start a browser. The pool is handed to
+the fetch tier explicitly; nothing in amperstand_core is patched.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeout
+from pathlib import Path
+from urllib.parse import urlparse
+
+from amperstand.config import as_bool, get_section
+from amperstand.state import DEFAULT_STATE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+class BrowserPoolError(RuntimeError):
+    """A pooled fetch failed or the pool was already closed."""
+
+
+def _launch_kwargs() -> dict:
+    """`chromium.launch()` arguments, routed through the residential proxy if one is set."""
+    from amperstand_core.proxy import get_proxy
+
+    kwargs: dict = {"headless": True}
+    raw = get_proxy()
+    parsed = urlparse(raw) if raw else None
+    if parsed is not None and parsed.hostname and parsed.port:
+        proxy = {"server": f"{parsed.scheme or 'http'}://{parsed.hostname}:{parsed.port}"}
+        if parsed.username:
+            proxy["username"] = parsed.username
+        if parsed.password:
+            proxy["password"] = parsed.password
+        kwargs["proxy"] = proxy
+        logger.info("browser pool launching with proxy=%s", proxy["server"])
+    return kwargs
+
+
+async def _launch_browser():
+    """Start Playwright and Chromium; returns `(playwright, browser)`."""
+    from playwright.async_api import async_playwright
+
+    playwright = await async_playwright().start()
+    try:
+        browser = await playwright.chromium.launch(**_launch_kwargs())
+    except BaseException:
+        await playwright.stop()
+        raise
+    return playwright, browser
+
+
+class _Context:
+    """One browser context and its current page."""
+
+    def __init__(self, browser, context) -> None:
+        self.browser = browser
+        self.context = context
+        self.page = None
+        self.page_uses = 0
+
+    async def close_page(self) -> None:
+        page, self.page, self.page_uses = self.page, None, 0
+        if page is not None:
+            try:
+                await page.close()
+            except Exception:  # noqa: BLE001
+                logger.debug("browser pool: page close failed", exc_info=True)
+
+    async def close(self) -> None:
+        await self.close_page()
+        try:
+            await self.context.close()
+        except Exception:  # noqa: BLE001
+            logger.debug("browser pool: context close failed", exc_info=True)
+
+
+class BrowserPool:
+    """One Chromium with up to `contexts` concurrent contexts, shared by every capture thread."""
+
+    def __init__(
+        self,
+        contexts: int = 4,
+        *,
+        page_uses: int = 20,
+        page_timeout: float = 30.0,
+        settle_ms: int = 3000,
+    ) -> None:
+        if contexts < 1:
+            raise ValueError("a browser pool needs at least one context")
+        self.contexts = contexts
+        self.page_uses = max(1, page_uses)
+        self.page_timeout = page_timeout
+        self.settle_ms = settle_ms
+        self._lock = threading.Lock()
+        self._closed = False
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        # Owned by the loop thread from here on.
+        self._playwright = None
+        self._browser = None
+        self._launching: asyncio.Lock | None = None
+        self._idle: asyncio.Queue | None = None
+        self._open = 0  # contexts created and not yet discarded
+        self.launches = 0
+        self.fetches = 0
+
+    def fetch(self, url: str) -> str:
+        """Render *url* in a pooled context and return the page HTML."""
+        with self._lock:
+            if self._closed:
+                raise BrowserPoolError("browser pool is closed")
+            self.fetches += 1
+            loop = self._start()
+        future = asyncio.run_coroutine_threadsafe(self._fetch(url), loop)
+        # Navigation is already bounded by page_timeout; the extra margin
+        # covers the settle delay, waiting for a free context and a cold launch.
+        wait = self.page_timeout + self.settle_ms / 1000 + 60
+        try:
+            return future.result(timeout=wait)
+        except FutureTimeout as exc:  # not the builtin TimeoutError before 3.11
+            if future.done():
+                raise  # the page itself timed out inside the browser
+            future.cancel()
+            raise BrowserPoolError(f"browser fetch timed out after {wait:.0f}s: {url}") from exc
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        """Start the loop thread on first use. Caller holds _lock."""
+        if self._loop is None:
+            self._loop = asyncio.new_event_loop()
+            self._thread = threading.Thread(
+                target=self._loop.run_forever, name="browser-pool", daemon=True
+            )
+            self._thread.start()
+        return self._loop
+
+    async def _fetch(self, url: str) -> str:
+        ctx = await self._acquire()
+        try:
+            if ctx.page is None:
+                ctx.page = await ctx.context.new_page()
+                ctx.page.set_default_timeout(self.page_timeout * 1000)
+            await ctx.page.goto(
+                url, wait_until="domcontentloaded", timeout=int(self.page_timeout * 1000)
+            )
+            if self.settle_ms:
+                # Give JS a moment to render dynamic content.
+                await ctx.page.wait_for_timeout(self.settle_ms)
+            html = await ctx.page.content()
+            ctx.page_uses += 1
+            if ctx.page_uses >= self.page_uses:
+                await ctx.close_page()
+            return html
+        except BaseException:
+            # A timed-out or crashed page may be unusable; start clean.
+            await ctx.close_page()
+            raise
+        finally:
+            self._release(ctx)
+
+    async def _acquire(self) -> _Context:
+        if self._idle is None:
+            self._idle = asyncio.Queue()
+            self._launching = asyncio.Lock()
+        while True:
+            if self._idle.empty() and self._open < self.contexts:
+                self._open += 1
+                try:
+                    browser = await self._browser_for_context()
+                    return _Context(browser, await browser.new_context())
+                except BaseException:
+                    self._open -= 1
+                    raise
+            ctx = await self._idle.get()
+            if ctx.browser is self._browser and self._connected(ctx.browser):
+                return ctx
+            self._open -= 1  # its browser died; make a fresh one
+
+    def _release(self, ctx: _Context) -> None:
+        self._idle.put_nowait(ctx)
+
+    async def _browser_for_context(self):
+        async with self._launching:
+            if self._browser is None or not self._connected(self._browser):
+                await self._stop_browser()
+                self._playwright, self._browser = await _launch_browser()
+                with self._lock:
+                    self.launches += 1
+            return self._browser
+
+    @staticmethod
+    def _connected(browser) -> bool:
+        try:
+            return browser.is_connected()
+        except Exception:  # noqa: BLE001
+            return False
+
+    async def _stop_browser(self) -> None:
+        browser, playwright = self._browser, self._playwright
+        self._browser = self._playwright = None
+        for close in (getattr(browser, "close", None), getattr(playwright, "stop", None)):
+            if close is None:
+                continue
+            try:
+                await close()
+            except Exception:  # noqa: BLE001
+                logger.debug("browser pool: shutdown step failed", exc_info=True)
+
+    async def _shutdown(self) -> None:
+        while self._idle is not None and not self._idle.empty():
+            await self._idle.get_nowait().close()
+        await self._stop_browser()
+
+    def close(self) -> None:
+        """Shut the browser down and stop the loop thread. Safe to call twice."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            loop, thread = self._loop, self._thread
+        if loop is None:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._shutdown(), loop).result(timeout=30)
+        except Exception:  # noqa: BLE001
+            logger.debug("browser pool: shutdown failed", exc_info=True)
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout=10)
+        if not thread.is_alive():
+            loop.close()
+
+    def __enter__(self) -> BrowserPool:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def open_browser_pool(state_dir: Path = DEFAULT_STATE_DIR) -> BrowserPool | None:
+    """Build the pool from the `browser` config section (None if disabled)."""
+    cfg = get_section("browser", state_dir)
+    if not as_bool(cfg.get("pool", True)):
+        return None
+    return BrowserPool(
+        int(cfg["contexts"]),
+        page_uses=int(cfg["page_uses"]),
+        page_timeout=float(cfg["page_timeout_s"]),
+        settle_ms=int(cfg["settle_ms"]),
+    )
@@ -0,0 +1,244 @@
+"""Fetch → extract → convert → save stages for capturing URLs on a `Pipeline`.
+
+Each URL travels through the pipeline as a `CaptureJob`, which collects the
+fetched HTML, the extracted `CapturedContent` and the backend arguments as
+it goes. The save stage hands documents to a `BatchWriter`; the writer's
+`on_result` callback (owned by the caller) is where each job finishes.
+
+Articles are fetched and extracted in separate stages so a slow download
+never holds an extraction worker, and vice versa. YouTube has no separate
+fetch step (yt-dlp does both), so those jobs pass straight through fetch.
+
+`fetch_html` is the fetch tier: trafilatura, then plain httpx, then the
+residential proxy (if one is configured), then a headless browser.
+`extract_html` hands the page to core's public `extract_article_from_html`
+and, like core's `extract_article`, retries a thin or challenge page once
+through the proxy.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+import httpx
+from amperstand_core.extractor import extract_article_from_html, is_youtube_url
+from amperstand_core.models import CapturedContent
+from amperstand_core.proxy import get_proxy
+from amperstand_core.youtube import extract_youtube
+
+from amperstand import profiling
+from amperstand.backend_bridge import BatchWriter, content_to_backend_args
+from amperstand.extract_cache import ExtractCache
+from amperstand.pipeline import Stage
+from amperstand.throttle import HostLimiter
+
+if TYPE_CHECKING:
+    from amperstand.browser_pool import BrowserPool
+
+logger = logging.getLogger(__name__)
+
+# Pages (and extracted articles) shorter than this are treated as block
+# pages or failed renders and move on to the next tier.
+THIN_PAGE = 200
+
+_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/131.0.0.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+
+@dataclass
+class CaptureJob:
+    """One URL on its way through the capture stages.
+
+    `context` is the caller's handle (a feed entry, a batch line number…);
+    `author` is a fallback used when extraction finds none. A `refresh` job
+    ignores the extraction cache and overwrites it with what it extracts.
+    """
+
+    url: str
+    context: Any = None
+    author: str | None = None
+    refresh: bool = False
+    html: str | None = None
+    content: CapturedContent | None = None
+    cached: bool = False
+    body: str | None = None
+    frontmatter: dict[str, Any] | None = None
+
+
+def _get(url: str, *, proxy: str | None = None, timeout: float = 30.0) -> str | None:
+    """GET *url* with browser headers; None on errors and thin pages."""
+    try:
+        resp = httpx.get(
+            url, headers=_HEADERS, follow_redirects=True, timeout=timeout, proxy=proxy
+        )
+        resp.raise_for_status()
+    except httpx.HTTPError as exc:
+        logger.debug("httpx (%s) failed for %s: %s", "proxy" if proxy else "direct", url, exc)
+        return None
+    if len(resp.text.strip()) <= THIN_PAGE:
+        logger.debug("httpx (%s) returned thin content for %s", "proxy" if proxy else "direct", url)
+        return None
+    return resp.text
+
+
+def fetch_via_proxy(url: str) -> str | None:
+    """Fetch *url* through the residential proxy; None if none is set or it fails."""
+    proxy = get_proxy()
+    if not proxy:
+        return None
+    html = _get(url, proxy=proxy, timeout=45.0)
+    if html is not None:
+        logger.info("Fetched %s via proxy (%d bytes)", url, len(html))
+    return html
+
+
+def fetch_html(url: str, *, browser: BrowserPool | None = None) -> str:
+    """Download *url*'s HTML, falling through the tiers until one works.
+
+    The last tier renders the page in *browser*; without a pool, a
+    one-page browser is launched for it.
+    """
+    import trafilatura
+
+    html = trafilatura.fetch_url(url) or _get(url) or fetch_via_proxy(url)
+    if html:
+        return html
+    logger.info("Using a headless browser for %s", url)
+    if browser is not None:
+        return browser.fetch(url)
+    from amperstand.browser_pool import BrowserPool
+
+    with BrowserPool(1) as pool:
+        return pool.fetch(url)
+
+
+def fetch_job(
+    job: CaptureJob,
+    *,
+    cache: ExtractCache | None = None,
+    limiter: HostLimiter | None = None,
+    browser: BrowserPool | None = None,
+) -> CaptureJob:
+    """Serve the job from the extraction cache, or download its HTML."""
+    if cache is not None and not job.refresh:
+        cached = cache.get(job.url)
+        if cached is not None:
+            job.content, job.cached = cached, True
+            return job
+    if is_youtube_url(job.url):
+        return job
+    if limiter is None:
+        with profiling.span("fetch", url=job.url):
+            job.html = fetch_html(job.url, browser=browser)
+    else:
+        with limiter.slot(job.url), profiling.span("fetch", url=job.url):
+            job.html = fetch_html(job.url, browser=browser)
+    return job
+
+
+def extract_job(
+    job: CaptureJob,
+    *,
+    cache: ExtractCache | None = None,
+    limiter: HostLimiter | None = None,
+) -> CaptureJob:
+    """Turn fetched HTML (or a YouTube URL) into `CapturedContent`."""
+    if job.content is None:
+        if is_youtube_url(job.url):
+            if limiter is None:
+                with profiling.span("extract", url=job.url):
+                    job.content = extract_youtube(job.url)
+            else:
+                with limiter.slot(job.url), profiling.span("extract", url=job.url):
+                    job.content = extract_youtube(job.url)
+        else:
+            with profiling.span("extract", url=job.url):
+                job.content = extract_html(job.url, job.html, limiter=limiter)
+        job.html = None  # done with it; don't carry pages through the queues
+        if cache is not None:
+            cache.put(job.content, job.url)
+    if job.author and not job.content.author:
+        job.content.author = job.author
+    return job
+
+
+def extract_html(
+    url: str, html: str | None, *, limiter: HostLimiter | None = None
+) -> CapturedContent:
+    """Extract an article from its fetched *html* with core's `extract_article_from_html`.
+
+    A page that yields nothing, a challenge page or a thin (< `THIN_PAGE`
+    chars) article is fetched once more through the residential proxy, if
+    one is configured, and the proxy's article is kept when it is longer.
+    Raises ValueError when nothing usable remains.
+    """
+    if not html:
+        raise ValueError(f"Failed to fetch URL: {url}")
+    content, error = _extract_or_error(url, html)
+    if content is not None and len(content.content_markdown.strip()) >= THIN_PAGE:
+        return content
+
+    if limiter is None:
+        retry_html = fetch_via_proxy(url)
+    else:
+        with limiter.slot(url):
+            retry_html = fetch_via_proxy(url)
+    if retry_html:
+        retry, _ = _extract_or_error(url, retry_html)
+        have = len(content.content_markdown.strip()) if content is not None else 0
+        if retry is not None and len(retry.content_markdown.strip()) > have:
+            logger.info("extract via proxy improved content for %s", url)
+            return retry
+    if content is None:
+        raise error
+    return content
+
+
+def _extract_or_error(url: str, html: str) -> tuple[CapturedContent | None, ValueError | None]:
+    try:
+        return extract_article_from_html(url, html), None
+    except ValueError as exc:  # no text, or a wall/challenge page
+        return None, exc
+
+
+def convert_job(job: CaptureJob) -> CaptureJob:
+    """Build the `(body, frontmatter)` pair `backend.create()` takes."""
+    job.body, job.frontmatter = content_to_backend_args(job.content)
+    return job
+
+
+def capture_stages(
+    writer: BatchWriter,
+    *,
+    cache: ExtractCache | None = None,
+    limiter: HostLimiter | None = None,
+    browser: BrowserPool | None = None,
+    fetch_workers: int = 8,
+    extract_workers: int = 4,
+    save_workers: int = 2,
+) -> list[Stage]:
+    """The fetch/extract/convert/save stages, ending in *writer*."""
+
+    def save(job: CaptureJob) -> CaptureJob:
+        writer.add_doc(job.body, job.frontmatter, item=job)
+        return job
+
+    return [
+        Stage(
+            "fetch",
+            lambda job: fetch_job(job, cache=cache, limiter=limiter, browser=browser),
+            fetch_workers,
+        ),
+        Stage("extract", lambda job: extract_job(job, cache=cache, limiter=limiter), extract_workers),
+        Stage("convert", convert_job, 1),
+        Stage("save", save, save_workers),
+    ]
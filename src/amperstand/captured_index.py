@@ -0,0 +1,214 @@
+"""Memory-mapped fingerprint index over the captured-URL history.
+
+Every feed entry, batch line and incoming email goes through
+`AppState.is_captured`, and nearly all of those lookups are for URLs we
+have *not* captured. `captured.idx` answers them without touching SQLite:
+it holds a 64-bit fingerprint of every canonical key in a sorted array,
+with a Bloom filter in front, and is mapped into memory rather than read,
+so opening it costs the same for ten captures as for ten million. A miss
+is settled by the Bloom filter, usually without touching the array at all.
+
+The file is a snapshot up to some `captured` rowid. Rows added since are
+kept in a small in-memory set of fingerprints: `AppState` adds its own
+marks as they commit, and rows committed by other processes are pulled
+from SQLite at most every `REFRESH_S` seconds, when `PRAGMA
+data_version` says the database changed. (A capture by another process
+can go unseen for that long — far shorter than the fetch-and-extract
+window in which two processes could already race for the same URL.)
+Once that set grows past `REBUILD_AT` or a fraction of the snapshot, the
+file is rebuilt and atomically swapped in.
+
+A hit means "some captured key has the same 64-bit fingerprint"; with a
+million captures the chance of a false one is about 1 in 10^7.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import mmap
+import os
+import sqlite3
+import struct
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+from typing import Iterable, Iterator
+
+INDEX_FILE = "captured.idx"
+REBUILD_AT = 4096  # fingerprints outside the snapshot before a rebuild
+BITS_PER_KEY = 10  # ~1% Bloom false positives with K_HASHES = 7
+K_HASHES = 7
+REFRESH_S = 1.0  # how stale other processes' captures may be
+
+_MAGIC = b"AMPIDX1" + (b"L" if sys.byteorder == "little" else b"B")
+# magic, canonical version, snapshot rowid, key count, bloom bits
+_HEADER = struct.Struct("=8sQqQQ")
+
+
+def fingerprint(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _bloom_positions(fp: int, nbits: int) -> Iterator[int]:
+    # Kirsch–Mitzenmacher: k positions from the fingerprint's two halves.
+    h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+    return ((h1 + i * h2) % nbits for i in range(K_HASHES))
+
+
+def write_index(path: Path, fingerprints: array, *, version: int, rowid: int) -> None:
+    """Write a sorted index of *fingerprints* (an `array("Q")`) to *path*, atomically."""
+    fps = array("Q", sorted(set(fingerprints)))
+    nbits = max(64, len(fps) * BITS_PER_KEY)
+    nbits += -nbits % 64  # keep the array that follows 8-byte aligned
+    bloom = bytearray(nbits // 8)
+    for fp in fps:
+        for pos in _bloom_positions(fp, nbits):
+            bloom[pos >> 3] |= 1 << (pos & 7)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(_HEADER.pack(_MAGIC, version, rowid, len(fps), nbits))
+            f.write(bloom)
+            f.write(fps.tobytes())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+class _Snapshot:
+    """A mapped `captured.idx`."""
+
+    def __init__(self, path: Path) -> None:
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, self.version, self.rowid, self.count, self._nbits = _HEADER.unpack_from(self._mm)
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a captured index")
+            start = _HEADER.size + self._nbits // 8
+            if len(self._mm) != start + 8 * self.count:
+                raise ValueError(f"{path} is truncated")
+            self._bloom = memoryview(self._mm)[_HEADER.size:start]
+            self._fps = memoryview(self._mm)[start:].cast("Q")
+        except BaseException:
+            self.close()
+            raise
+
+    def __contains__(self, fp: int) -> bool:
+        # _bloom_positions, inlined: most lookups are misses that stop at
+        # the first or second probe.
+        bloom, nbits = self._bloom, self._nbits
+        h1, h2 = fp & 0xFFFFFFFF, (fp >> 32) | 1
+        for i in range(K_HASHES):
+            pos = (h1 + i * h2) % nbits
+            if not bloom[pos >> 3] >> (pos & 7) & 1:
+                return False
+        i = bisect.bisect_left(self._fps, fp)
+        return i < self.count and self._fps[i] == fp
+
+    def close(self) -> None:
+        for view in ("_fps", "_bloom"):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self._mm.close()
+
+
+class CapturedIndex:
+    """Membership test over `captured.canonical`, snapshot plus recent rows; thread-safe."""
+
+    def __init__(self, db_path: Path, *, version: int) -> None:
+        self._path = db_path.with_name(INDEX_FILE)
+        self._version = version
+        self._lock = threading.Lock()
+        # Private connection: its data_version moves whenever any other
+        # connection — this process's writer included — commits.
+        self._conn = sqlite3.connect(db_path, timeout=30.0, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA busy_timeout=30000")
+        self._data_version: int | None = None
+        self._checked = 0.0
+        self._snapshot: _Snapshot | None = None
+        self._recent: set[int] = set()
+        self._rowid = 0
+        self._load()
+
+    def _load(self) -> None:
+        try:
+            snapshot = _Snapshot(self._path)
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot is not None and snapshot.version != self._version:
+            snapshot.close()
+            snapshot = None
+        if snapshot is None:
+            self._rebuild()
+            return
+        self._swap(snapshot)
+
+    def _swap(self, snapshot: _Snapshot) -> None:
+        if self._snapshot is not None:
+            self._snapshot.close()
+        self._snapshot = snapshot
+        self._recent = set()
+        self._rowid = snapshot.rowid
+        self._data_version = None
+        self._checked = 0.0  # top up on the next lookup
+
+    def _rebuild(self) -> None:
+        rows = self._conn.execute(
+            "SELECT rowid, canonical FROM captured WHERE canonical IS NOT NULL"
+        ).fetchall()
+        rowid = max((r for r, _ in rows), default=0)
+        write_index(
+            self._path,
+            array("Q", (fingerprint(key) for _, key in rows)),
+            version=self._version,
+            rowid=rowid,
+        )
+        self._swap(_Snapshot(self._path))
+
+    def _refresh(self) -> None:
+        """Pick up captures other processes committed. Caller holds _lock."""
+        now = time.monotonic()
+        if now - self._checked < REFRESH_S:
+            return
+        self._checked = now
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        if version == self._data_version:
+            return
+        rows = self._conn.execute(
+            "SELECT rowid, canonical FROM captured WHERE rowid > ? AND canonical IS NOT NULL",
+            (self._rowid,),
+        ).fetchall()
+        for rowid, key in rows:
+            self._recent.add(fingerprint(key))
+            self._rowid = max(self._rowid, rowid)
+        self._data_version = version
+        if len(self._recent) > max(REBUILD_AT, self._snapshot.count // 8):
+            try:
+                self._rebuild()
+            except OSError:
+                pass  # keep serving from the old snapshot plus _recent
+
+    def add(self, keys: Iterable[str]) -> None:
+        """Record canonical keys this process just committed."""
+        fps = [fingerprint(key) for key in keys]
+        with self._lock:
+            self._recent.update(fps)
+
+    def __contains__(self, key: str) -> bool:
+        fp = fingerprint(key)
+        with self._lock:
+            self._refresh()
+            return fp in self._recent or fp in self._snapshot
+
+    def close(self) -> None:
+        with self._lock:
+            if self._snapshot is not None:
+                self._snapshot.close()
+                self._snapshot = None
+            self._conn.close()
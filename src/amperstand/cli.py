@@ -2,21 +2,21 @@
 
 from __future__ import annotations
 
+import os
+import threading
 from datetime import datetime, timezone
 from pathlib import Path
 
 import typer
 
-from amperstand_core.converter import to_markdown
-from amperstand_core.email_parser import parse_eml_file
-from amperstand_core.extractor import extract_article, is_linkedin_url, is_youtube_url
-from amperstand_core.feed import parse_feed
-from amperstand_core.imap import fetch_unseen, watch
-from amperstand_core.newsletter_filter import get_sender_email, is_newsletter
-from amperstand_core.youtube import extract_youtube
+# amperstand_core's extraction, feed and email modules drag in trafilatura,
+# yt-dlp, feedparser, BeautifulSoup and friends — well over half a second
+# of imports. They're imported inside the commands that use them so
+# `config show`, `feed list` and other bookkeeping commands start fast
+# (see benchmarks/startup.py).
 
 from amperstand import __version__
-from amperstand.backend_bridge import content_to_backend_args, get_backend
+from amperstand.backend_bridge import backend_session, content_to_backend_args
 from amperstand.config import (
     add_email_account,
     clear_backend_config,
@@ -31,7 +31,8 @@ from amperstand.config import (
 )
 from amperstand.log_setup import setup_logging
 from amperstand.state import AppState
-from amperstand.vault import VaultError, commit_file, has_remote, init_vault, is_vault, sync
+from amperstand.urls import canonicalize
+from amperstand.vault import VaultError, has_remote, init_vault, is_vault, sync
 
 app = typer.Typer(
     name="amperstand",
@@ -53,6 +54,15 @@ app.add_typer(vault_app, name="vault")
 config_app = typer.Typer(help="View and update Amperstand configuration.")
 app.add_typer(config_app, name="config")
 
+cache_app = typer.Typer(help="Inspect or clear the local extraction cache.")
+app.add_typer(cache_app, name="cache")
+
+outbox_app = typer.Typer(help="Inspect and retry documents the vault backend failed to accept.")
+app.add_typer(outbox_app, name="outbox")
+
+daemon_app = typer.Typer(help="Run a long-lived capture daemon that queues and retries captures.")
+app.add_typer(daemon_app, name="daemon")
+
 
 def version_callback(value: bool) -> None:
     if value:
@@ -62,6 +72,7 @@ def version_callback(value: bool) -> None:
 
 @app.callback()
 def main(
+    ctx: typer.Context,
     version: bool = typer.Option(
         False,
         "--version",
@@ -70,22 +81,256 @@ def main(
         callback=version_callback,
         is_eager=True,
     ),
+    profile: bool = typer.Option(
+        False,
+        "--profile",
+        help="Time each capture stage and print a summary on exit.",
+    ),
+    profile_trace: Path | None = typer.Option(
+        None,
+        "--profile-trace",
+        help="Also write the spans as Chrome trace JSON (implies --profile).",
+    ),
 ) -> None:
     """Amperstand — capture anything from the web as markdown you own."""
     setup_logging()
+    if profile or profile_trace:
+        _start_profiling(ctx, profile_trace)
+    # Every save in this run goes through one backend; release it on exit.
+    ctx.call_on_close(backend_session().close)
+    ctx.call_on_close(_close_extract_cache)
+    ctx.call_on_close(_close_browser_pool)
+    ctx.call_on_close(_close_outbox)
+    ctx.call_on_close(_close_vault_writer)
+
+
+def _start_profiling(ctx: typer.Context, trace_path: Path | None) -> None:
+    from amperstand import profiling
+
+    profiling.start()
+
+    def report() -> None:
+        profiler = profiling.stop()
+        if profiler is None:
+            return
+        for line in profiler.summary():
+            typer.echo(line, err=True)
+        if trace_path is not None:
+            try:
+                profiler.write_trace(trace_path)
+            except OSError as exc:
+                typer.echo(f"Could not write profile trace: {exc}", err=True)
+            else:
+                typer.echo(f"Profile trace written to {trace_path}", err=True)
+
+    # Registered before the other close callbacks, so it runs after them
+    # and the final flushes they do are in the profile.
+    ctx.call_on_close(report)
 
 
 # ── Single URL capture ────────────────────────────────────────────────
 
 
-def _capture_url(url: str):
-    """Extract content from a single URL (article or YouTube)."""
+_extract_cache_lock = threading.Lock()
+_extract_cache = None
+_extract_cache_loaded = False
+
+
+def _get_extract_cache():
+    """Return the run's ExtractCache (None if disabled), opening it on first use."""
+    global _extract_cache, _extract_cache_loaded
+    with _extract_cache_lock:
+        if not _extract_cache_loaded:
+            from amperstand.extract_cache import open_extract_cache
+
+            try:
+                _extract_cache = open_extract_cache()
+            except Exception:  # noqa: BLE001
+                # A broken cache must never block a capture.
+                _extract_cache = None
+            _extract_cache_loaded = True
+        return _extract_cache
+
+
+def _close_extract_cache() -> None:
+    global _extract_cache, _extract_cache_loaded
+    with _extract_cache_lock:
+        if _extract_cache is not None:
+            _extract_cache.close()
+        _extract_cache, _extract_cache_loaded = None, False
+
+
+_browser_pool_lock = threading.Lock()
+_browser_pool = None
+_browser_pool_loaded = False
+
+
+def _use_browser_pool():
+    """Return the run's shared BrowserPool (None if disabled).
+
+    Cheap to call repeatedly: the pool is built once, and no browser
+    starts until a page actually falls through to the browser tier.
+    """
+    global _browser_pool, _browser_pool_loaded
+    with _browser_pool_lock:
+        if not _browser_pool_loaded:
+            from amperstand.browser_pool import open_browser_pool
+
+            try:
+                _browser_pool = open_browser_pool()
+            except Exception:  # noqa: BLE001
+                # Fall back to a one-page browser per fetch.
+                _browser_pool = None
+            _browser_pool_loaded = True
+        return _browser_pool
+
+
+def _close_browser_pool() -> None:
+    global _browser_pool, _browser_pool_loaded
+    with _browser_pool_lock:
+        if _browser_pool is not None:
+            _browser_pool.close()
+        _browser_pool, _browser_pool_loaded = None, False
+
+
+_outbox_lock = threading.Lock()
+_outbox = None
+_outbox_loaded = False
+_outbox_drained = False
+
+
+def _get_outbox():
+    """Return the run's Outbox (None if disabled), opening it on first use."""
+    global _outbox, _outbox_loaded
+    with _outbox_lock:
+        if not _outbox_loaded:
+            from amperstand.outbox import open_outbox
+
+            try:
+                _outbox = open_outbox()
+            except Exception:  # noqa: BLE001
+                _outbox = None
+            _outbox_loaded = True
+        return _outbox
+
+
+def _close_outbox() -> None:
+    global _outbox, _outbox_loaded, _outbox_drained
+    with _outbox_lock:
+        if _outbox is not None:
+            _outbox.close()
+        _outbox, _outbox_loaded, _outbox_drained = None, False, False
+
+
+def _drain_outbox(session, *, force: bool = False, quiet: bool = False) -> tuple[int, int]:
+    """Retry parked documents that are due (all of them with *force*)."""
+    outbox = _get_outbox()
+    if outbox is None:
+        return 0, 0
+    sent, left = outbox.drain(session, force=force, limit=None if force else 100)
+    if sent and not quiet:
+        typer.echo(f"Outbox: delivered {sent} queued document(s).", err=True)
+    if left and not quiet:
+        typer.echo(f"Outbox: {left} document(s) still failing; will retry later.", err=True)
+    return sent, left
+
+
+_vault_writer_lock = threading.Lock()
+_vault_writer = None
+_vault_syncer = None
+_vault_writer_loaded = False
+
+
+def _track_vault_commits(session) -> None:
+    """Commit files a store backend writes into a git vault, in batches.
+
+    Only applies when the store's root is a git repository. If it's also
+    the configured vault with auto-sync on, every commit requests a
+    background sync (overlapping requests coalesce).
+    """
+    global _vault_writer, _vault_syncer, _vault_writer_loaded
+    with _vault_writer_lock:
+        if _vault_writer_loaded:
+            return
+        _vault_writer_loaded = True
+        cfg = load_backend_config() or {}
+        if session.kind() != "store":
+            return
+        root = (cfg.get("store") or {}).get("path") or cfg.get("path")
+        if not root:
+            return
+        root = Path(root).expanduser().resolve()
+        if not is_vault(root):
+            return
+
+        from amperstand.config import get_section
+        from amperstand.vault import VaultSyncer, VaultWriter
+
+        git_cfg = get_section("vault_git")
+        vault = AppState().get_vault() or {}
+        if (
+            vault.get("auto_sync")
+            and Path(vault["path"]).expanduser().resolve() == root
+            and has_remote(root)
+        ):
+            _vault_syncer = VaultSyncer(root, timeout=float(git_cfg["sync_timeout_s"]))
+        writer = VaultWriter(
+            root,
+            max_files=int(git_cfg["commit_files"]),
+            max_delay=float(git_cfg["commit_delay_s"]),
+            on_commit=_vault_syncer.request if _vault_syncer else None,
+        )
+        _vault_writer = writer
+
+    def on_created(doc: dict) -> None:
+        if doc.get("path"):
+            writer.add(root / doc["path"])
+
+    session.subscribe(on_created)
+
+
+def _close_vault_writer() -> None:
+    """Commit what's left of the run and wait (bounded) for the last sync."""
+    global _vault_writer, _vault_syncer, _vault_writer_loaded
+    with _vault_writer_lock:
+        writer, syncer = _vault_writer, _vault_syncer
+        _vault_writer, _vault_syncer, _vault_writer_loaded = None, None, False
+    if writer is not None and not writer.close():
+        typer.echo(f"Vault: {writer.pending} file(s) left uncommitted; see the log.", err=True)
+    if syncer is not None:
+        from amperstand.config import get_section
+
+        if not syncer.wait(float(get_section("vault_git")["sync_wait_s"])):
+            typer.echo("Vault: sync still running at exit; run 'amperstand vault sync' to finish.", err=True)
+        elif syncer.last_error is not None:
+            typer.echo(f"Vault: sync failed: {syncer.last_error}", err=True)
+
+
+def _capture_url(url: str, *, refresh: bool = False):
+    """Extract content from a single URL (article or YouTube).
+
+    Served from the extraction cache when the same URL was extracted
+    recently — retries after a backend failure and cross-feed duplicates
+    skip the fetch/trafilatura/yt-dlp step entirely. With *refresh* the
+    cache is bypassed and the fresh extraction replaces the cached one.
+    """
+    from amperstand_core.extractor import is_youtube_url
+
+    from amperstand.capture_flow import CaptureJob, extract_job, fetch_job
+
+    cache = _get_extract_cache()
+    if cache is not None and not refresh:
+        cached = cache.get(url)
+        if cached is not None:
+            typer.echo("Using cached extraction...", err=True)
+            return cached
+
     if is_youtube_url(url):
         typer.echo("Extracting YouTube video...", err=True)
-        return extract_youtube(url)
     else:
-        typer.echo(f"Extracting article...", err=True)
-        return extract_article(url)
+        typer.echo("Extracting article...", err=True)
+    job = fetch_job(CaptureJob(url), browser=_use_browser_pool())
+    return extract_job(job, cache=cache).content
 
 
 def _save(content, *, quiet: bool = False) -> bool:
@@ -94,9 +339,38 @@ def _save(content, *, quiet: bool = False) -> bool:
     Errors out if no backend is configured — the CLI is HTTP-first now,
     no silent local-folder fallback. Run `amperstand vault backend set-http
     <url> --api-key-env KEY` (or `set-store <path>`) once to configure.
+
+    The backend comes from the command-wide `backend_session()`, so batch
+    commands reuse one connection pool; it's closed when the command exits.
     """
-    backend = get_backend()
-    if backend is None:
+    session = _require_backend()
+    body, fm = content_to_backend_args(content)
+    try:
+        doc = session.create(body, fm)
+    except Exception as exc:  # noqa: BLE001
+        outbox = _get_outbox()
+        if outbox is None:
+            typer.echo(f"  Error: backend create failed: {exc}", err=True)
+            return False
+        from amperstand.outbox import queued_doc
+
+        doc = queued_doc(outbox.put(body, fm, exc), fm, exc)
+        quiet = False  # always say when a write was deferred
+
+    if not quiet:
+        _echo_saved(doc, content)
+    return True
+
+
+def _require_backend():
+    """Return the command's backend session, or exit if no backend is configured.
+
+    The first call in a run also retries whatever is due in the outbox, so
+    documents parked by an earlier failed write land without extra steps.
+    """
+    global _outbox_drained
+    session = backend_session()
+    if session.get() is None:
         typer.echo(
             "Error: no vault backend configured. Run one of:\n"
             "  amperstand vault backend set-http <url> --api-key-env AMPERSTAND_API_KEY\n"
@@ -104,45 +378,261 @@ def _save(content, *, quiet: bool = False) -> bool:
             err=True,
         )
         raise typer.Exit(code=1)
-
-    body, fm = content_to_backend_args(content)
-    try:
-        doc = backend.create(body, fm)
-    except Exception as exc:  # noqa: BLE001
-        typer.echo(f"  Error: backend create failed: {exc}", err=True)
-        return False
-    finally:
+    _track_vault_commits(session)
+    with _outbox_lock:
+        drain, _outbox_drained = not _outbox_drained, True
+    if drain:
         try:
-            backend.close()
-        except Exception:  # noqa: BLE001
-            pass
+            _drain_outbox(session)
+        except Exception as exc:  # noqa: BLE001
+            typer.echo(f"Outbox: retry failed: {exc}", err=True)
+    return session
 
-    if not quiet:
-        label = doc.get("title") or content.title
-        typer.echo(f"  Saved: {doc.get('id')} — {label}", err=True)
-    return True
+
+def _echo_saved(doc: dict, content) -> None:
+    label = doc.get("title") or content.title
+    if doc.get("outbox_id") is not None:
+        typer.echo(
+            f"  Backend write failed ({doc['error']}); queued for retry as outbox #{doc['outbox_id']} — {label}",
+            err=True,
+        )
+        return
+    typer.echo(f"  Saved: {doc.get('id')} — {label}", err=True)
 
 
 @app.command()
 def capture(
-    url: str = typer.Argument(help="URL to capture."),
+    url: str | None = typer.Argument(None, help="URL to capture."),
     stdout: bool = typer.Option(
         False,
         "--stdout",
         help="Print markdown to stdout instead of saving to the vault.",
     ),
+    from_file: str | None = typer.Option(
+        None,
+        "--from-file",
+        "-f",
+        help="Capture every URL in this file (one per line; '-' reads stdin).",
+    ),
+    workers: int | None = typer.Option(
+        None,
+        "--workers",
+        "-w",
+        min=1,
+        help="Parallel page fetches for --from-file (default: pipeline.fetch_workers).",
+    ),
+    per_host: int = typer.Option(
+        2,
+        "--per-host",
+        min=1,
+        help="Max concurrent connections to any one host for --from-file.",
+    ),
+    skip_failed: bool = typer.Option(
+        False,
+        "--skip-failed",
+        help="With --from-file, don't retry URLs that failed in an earlier run of the same file.",
+    ),
+    no_daemon: bool = typer.Option(
+        False,
+        "--no-daemon",
+        help="Capture in this process even if a capture daemon is running.",
+    ),
+    refresh: bool = typer.Option(
+        False,
+        "--refresh",
+        help="Re-extract even if a cached extraction exists, and replace it.",
+    ),
 ) -> None:
-    """Capture a URL and save it to the configured vault."""
-    try:
-        content = _capture_url(url)
-    except Exception as e:
-        typer.echo(f"Error: {e}", err=True)
+    """Capture a URL (or a file of URLs) and save it to the configured vault.
+
+    If `amperstand daemon run` is running, a single URL is handed to it and
+    the command returns as soon as the job is queued (`--refresh` captures
+    in this process, since the daemon would serve its own cache).
+    """
+    if from_file is not None:
+        if url or stdout:
+            typer.echo("Error: --from-file can't be combined with a URL or --stdout.", err=True)
+            raise typer.Exit(code=1)
+        _capture_batch(
+            from_file, workers=workers, per_host=per_host, skip_failed=skip_failed, refresh=refresh
+        )
+        return
+    if not url:
+        typer.echo("Error: give a URL or --from-file <path>.", err=True)
         raise typer.Exit(code=1)
 
     if stdout:
+        try:
+            content = _capture_url(url, refresh=refresh)
+        except Exception as e:
+            typer.echo(f"Error: {e}", err=True)
+            raise typer.Exit(code=1)
+        from amperstand_core.converter import to_markdown
+
         typer.echo(to_markdown(content))
+        return
+
+    if not (no_daemon or refresh):
+        from amperstand.daemon import DaemonUnavailable, submit
+
+        try:
+            job_id = submit(url)
+        except DaemonUnavailable:
+            pass
+        else:
+            typer.echo(f"Queued for the capture daemon (job {job_id}).")
+            return
+
+    from amperstand.capture_flow import CaptureJob
+
+    failed = False
+
+    def on_done(job, doc, error) -> None:
+        nonlocal failed
+        if error is None:
+            _echo_saved(doc, job.content)
+        elif job.content is None:
+            failed = True
+            typer.echo(f"Error: {error}", err=True)
+        else:
+            typer.echo(f"  Error: backend create failed: {error}", err=True)
+
+    typer.echo("Extracting...", err=True)
+    _run_capture_pipeline([CaptureJob(url, refresh=refresh)], on_done)
+    if failed:
+        raise typer.Exit(code=1)
+
+
+_CSV_URL_COLUMNS = ("url", "link", "href", "given_url", "resolved_url")
+
+
+def _read_url_lines(lines):
+    """Yield URLs from a text stream, skipping blanks and '#' comments.
+
+    A CSV export with a header row naming a URL column (Pocket's
+    `url,title,...`) is read with the csv module and yields that column.
+    Anything else is a plain list: the first whitespace-separated token
+    of each line, so URLs containing commas survive intact (a single
+    trailing comma, as in `https://… , title`, is dropped).
+    """
+    import csv
+    import itertools
+
+    lines = (line for line in lines if line.strip() and not line.lstrip().startswith("#"))
+    first = next(lines, None)
+    if first is None:
+        return
+    header = [h.strip().lower() for h in next(csv.reader([first]))]
+    column = next((header.index(c) for c in _CSV_URL_COLUMNS if c in header), None)
+    if column is not None and "://" not in first:
+        for row in csv.reader(lines):
+            if len(row) > column:
+                token = row[column].strip()
+                if token.startswith(("http://", "https://")):
+                    yield token
+        return
+    for line in itertools.chain([first], lines):
+        token = line.split()[0].removesuffix(",")
+        if token.startswith(("http://", "https://")):
+            yield token
+
+
+def _capture_batch(
+    from_file: str,
+    *,
+    workers: int | None,
+    per_host: int,
+    skip_failed: bool,
+    refresh: bool = False,
+) -> None:
+    """Capture every URL in *from_file* on the pipeline, resumably.
+
+    Progress lives in AppState: each success is `mark_captured` (committed
+    in batches — see `AppState.batch`), so a re-run of the same file skips
+    straight past everything already in the vault; failures are recorded
+    per batch so `--skip-failed` can leave known-dead links alone. The
+    file is streamed, not loaded, so a 40k-line export starts capturing
+    immediately.
+    """
+    import sys
+    import time
+
+    from amperstand.capture_flow import CaptureJob
+    from amperstand.throttle import HostLimiter
+
+    if from_file == "-":
+        batch, stream = "stdin", sys.stdin
     else:
-        _save(content)
+        path = Path(from_file).expanduser()
+        if not path.exists():
+            typer.echo(f"File not found: {path}", err=True)
+            raise typer.Exit(code=1)
+        batch, stream = str(path.resolve()), path.open(encoding="utf-8")
+
+    state = AppState()
+    counts_lock = threading.Lock()  # on_done runs on several writer threads
+    previous_failures = state.batch_failures(batch)
+    counts = {"read": 0, "skipped": 0, "captured": 0, "failed": 0}
+    seen: set[str] = set()
+
+    def jobs():
+        for url in _read_url_lines(stream):
+            counts["read"] += 1
+            key = canonicalize(url)
+            done = key in seen or state.is_captured(url)
+            if done or (skip_failed and url in previous_failures):
+                counts["skipped"] += 1
+                continue
+            seen.add(key)
+            yield CaptureJob(url, refresh=refresh)
+
+    def on_done(job, doc, error) -> None:
+        if error is None:
+            state.mark_captured(job.url)
+            state.record_batch_item(batch, job.url, ok=True)
+        else:
+            state.record_batch_item(batch, job.url, ok=False, error=str(error))
+        with counts_lock:
+            counts["captured" if error is None else "failed"] += 1
+            n = counts["captured"] + counts["failed"]
+        if error is None and doc.get("outbox_id") is not None:
+            typer.echo(f"  [{n}] Queued for retry (outbox #{doc['outbox_id']}): {job.url}: {doc['error']}", err=True)
+        elif error is None:
+            typer.echo(f"  [{n}] Saved: {doc.get('id')} — {doc.get('title') or job.content.title}", err=True)
+        else:
+            typer.echo(f"  [{n}] Failed: {job.url}: {error}", err=True)
+
+    if previous_failures:
+        verb = "skipping" if skip_failed else "retrying"
+        typer.echo(f"Resuming batch: {verb} {len(previous_failures)} URL(s) that failed before.", err=True)
+
+    started = time.monotonic()
+    try:
+        with state.batch():
+            stats = _run_capture_pipeline(
+                jobs(), on_done, fetch_workers=workers, limiter=HostLimiter(per_host)
+            )
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+    elapsed = time.monotonic() - started
+
+    attempted = counts["captured"] + counts["failed"]
+    rate = attempted / elapsed if elapsed > 0 else 0.0
+    typer.echo(
+        f"\nDone: read {counts['read']}, captured {counts['captured']}, "
+        f"skipped {counts['skipped']}, failed {counts['failed']} "
+        f"in {elapsed:.1f}s ({rate:.2f} URLs/s).",
+        err=True,
+    )
+    for name, st in stats.items():
+        typer.echo(
+            f"  {name:<8} processed={st.processed} failed={st.failed} "
+            f"busy={st.busy_seconds:.1f}s max_queue={st.max_queue}",
+            err=True,
+        )
+    if counts["failed"] and not counts["captured"]:
+        raise typer.Exit(code=1)
 
 
 # ── Feed commands ─────────────────────────────────────────────────────
@@ -159,9 +649,13 @@ def capture(
 
 def _remote_backend():
     """Return the HTTPBackend instance if configured remotely, else None."""
+    session = backend_session()
+    # Check the config first so local-only setups never import the backends.
+    if session.kind() != "http":
+        return None
     from amperstand_core.backend.http_backend import HTTPBackend
 
-    backend = get_backend()
+    backend = session.get()
     return backend if isinstance(backend, HTTPBackend) else None
 
 
@@ -192,6 +686,8 @@ def feed_add(
         typer.echo(f"Already subscribed: {url}", err=True)
         raise typer.Exit(code=1)
 
+    from amperstand_core.feed import parse_feed
+
     try:
         info = parse_feed(url)
     except Exception as e:
@@ -266,10 +762,27 @@ def feed_list() -> None:
         typer.echo("No feeds subscribed. Use 'amperstand feed add <url>' to add one.")
         return
 
+    import time
+
+    now = time.time()
+    schedules = state.feed_schedules()
     for url, info in feeds.items():
         tags_str = f"  [{', '.join(info['tags'])}]" if info.get("tags") else ""
         typer.echo(f"  {info['name']}{tags_str}")
         typer.echo(f"    {url}")
+        schedule = schedules.get(url)
+        if schedule is not None:
+            wait = schedule.next_due - now
+            when = "due now" if wait <= 0 else f"next poll in {_fmt_duration(wait)}"
+            typer.echo(f"    {when} (every {_fmt_duration(schedule.interval)})")
+
+
+def _fmt_duration(seconds: float) -> str:
+    if seconds < 3600:
+        return f"{max(1, round(seconds / 60))}m"
+    if seconds < 2 * 86400:
+        return f"{seconds / 3600:.1f}h"
+    return f"{seconds / 86400:.1f}d"
 
 
 @feed_app.command("sync")
@@ -283,20 +796,47 @@ def feed_sync(
         0,
         "--limit",
         "-l",
-        help="Max items to capture per feed (0 = all).",
+        help="Max entries to consider per feed, counted from the newest unseen one (0 = all).",
     ),
     feed_url: str | None = typer.Option(
         None,
         "--feed",
         help="Sync only this specific feed URL.",
     ),
+    workers: int = typer.Option(
+        1,
+        "--workers",
+        "-w",
+        min=1,
+        help="Fetch feeds and capture entries with N parallel workers (1 = serial).",
+    ),
+    per_host: int = typer.Option(
+        2,
+        "--per-host",
+        min=1,
+        help="Max concurrent connections to any one host when --workers > 1.",
+    ),
+    force: bool = typer.Option(
+        False,
+        "--force",
+        help="Ignore cached validators and entry watermarks; re-parse and rescan every feed.",
+    ),
+    due_only: bool = typer.Option(
+        False,
+        "--due-only",
+        help="Only poll feeds whose adaptive schedule says they're due (for frequent cron runs).",
+    ),
 ) -> None:
-    """Sync all subscribed feeds and capture new items to the configured vault."""
+    """Sync all subscribed feeds and capture new items to the configured vault.
+
+    Every poll updates the feed's schedule, learned from how often it
+    publishes; `--due-only` skips feeds that aren't due yet.
+    """
     remote = _remote_backend()
     if remote is not None:
-        if dry_run or limit > 0 or feed_url:
+        if dry_run or limit > 0 or feed_url or workers > 1 or force or due_only:
             typer.echo(
-                "Note: --dry-run, --limit, and --feed aren't yet supported on "
+                "Note: --dry-run, --limit, --feed, --workers, --force and --due-only aren't yet supported on "
                 "remote sync. The server iterates every enabled feed with its "
                 "default limit. Run the older local sync (no AMPERSTAND_BASE_URL) "
                 "if you need these flags.",
@@ -343,46 +883,407 @@ def feed_sync(
         typer.echo("No feeds subscribed. Use 'amperstand feed add <url>' to add one.")
         return
 
+    if due_only:
+        import time
+
+        now = time.time()
+        schedules = state.feed_schedules()
+        due = {
+            url: info for url, info in feeds.items()
+            if url not in schedules or schedules[url].next_due <= now
+        }
+        if len(due) < len(feeds):
+            typer.echo(f"Skipping {len(feeds) - len(due)} feed(s) not due yet.", err=True)
+        feeds = due
+        if not feeds:
+            typer.echo("\nDone: no feeds due.", err=True)
+            return
+
+    from amperstand.feed_fetch import feed_client
+    from amperstand.feed_schedule import schedule_limits
+
+    # Dry runs don't touch the schedule.
+    limits = None if dry_run else schedule_limits()
+    with feed_client() as http, state.batch():
+        if workers > 1:
+            total_captured, total_skipped = _feed_sync_parallel(
+                state, feeds, http,
+                dry_run=dry_run, limit=limit, workers=workers, per_host=per_host, force=force,
+                limits=limits,
+            )
+        else:
+            total_captured, total_skipped = _feed_sync_serial(
+                state, feeds, http, dry_run=dry_run, limit=limit, force=force, limits=limits
+            )
+
+    action = "would capture" if dry_run else "captured"
+    typer.echo(f"\nDone: {action} {total_captured}, skipped {total_skipped} already captured.", err=True)
+
+
+def _fetch_changed_feed(state: AppState, url: str, http, *, force: bool):
+    """Conditionally fetch a feed. Returns (FeedInfo | None, validators).
+
+    None means unchanged since the last fully-processed fetch; the refreshed
+    validators are stored right away in that case since there's nothing
+    left to process.
+    """
+    from amperstand.feed_fetch import fetch_feed
+
+    feed_info, validators = fetch_feed(
+        url, None if force else state.get_feed_validators(url), client=http
+    )
+    if feed_info is None and validators:
+        state.set_feed_validators(url, **validators)
+    return feed_info, validators
+
+
+def _record_poll(state: AppState, url: str, entries, limits: tuple[float, float] | None) -> None:
+    """Fold a poll's entries (empty if unchanged or failed) into the feed's schedule."""
+    if limits is None:
+        return
+    import time
+
+    from amperstand.feed_schedule import plan_next_poll
+
+    min_interval, max_interval = limits
+    state.set_feed_schedule(
+        url,
+        plan_next_poll(
+            state.get_feed_schedule(url),
+            [entry.published for entry in entries or []],
+            now=time.time(),
+            min_interval=min_interval,
+            max_interval=max_interval,
+        ),
+    )
+
+
+def _feed_sync_serial(
+    state: AppState,
+    feeds: dict[str, dict],
+    http,
+    *,
+    dry_run: bool,
+    limit: int,
+    force: bool,
+    limits: tuple[float, float] | None = None,
+) -> tuple[int, int]:
+    """Walk feeds one at a time. Returns (captured, skipped).
+
+    Extracted entries are queued on a `BatchWriter` and written when the
+    batch fills or at the end of each feed, so the feed's validators are
+    only stored once its writes are known to have landed.
+    """
+    from amperstand.backend_bridge import BatchWriter
+
+    from amperstand.feed_watermark import advance, entries_after
+
     total_captured = 0
     total_skipped = 0
+    complete = False
+    unhandled: list = []
+    # Canonical keys taken this run, so a URL in two feeds counts once
+    # even when nothing is marked captured (dry runs, failed writes).
+    queued: set[str] = set()
+
+    def on_result(result) -> None:
+        nonlocal total_captured, complete
+        content, entry = result.item
+        if result.ok:
+            state.mark_captured(entry.url)
+            total_captured += 1
+            _echo_saved(result.doc, content)
+        else:
+            complete = False
+            unhandled.append(entry)
+            typer.echo(f"  Error: backend create failed: {result.error}", err=True)
+
+    session = None if dry_run else _require_backend()
+    writer = BatchWriter(
+        session, on_result, max_delay=None, outbox=None if dry_run else _get_outbox()
+    )
 
     for url, info in feeds.items():
         typer.echo(f"\nFeed: {info['name']}", err=True)
 
         try:
-            feed_info = parse_feed(url)
+            feed_info, validators = _fetch_changed_feed(state, url, http, force=force)
         except Exception as e:
             typer.echo(f"  Error: {e}", err=True)
+            _record_poll(state, url, None, limits)
+            continue
+        _record_poll(state, url, feed_info and feed_info.entries, limits)
+        if feed_info is None:
+            typer.echo("  Not modified.", err=True)
             continue
 
-        entries = feed_info.entries or []
-        if limit > 0:
+        previous_mark = state.get_feed_watermark(url)
+        scanned, below = entries_after(feed_info.entries or [], None if force else previous_mark)
+        total_skipped += below
+        # Only trust the validators once every entry in this body was
+        # handled; a truncated or failed pass must re-fetch next time.
+        complete = bool(not dry_run and validators)
+        entries = scanned
+        unhandled.clear()
+        if limit > 0 and len(entries) > limit:
             entries = entries[:limit]
+            unhandled.extend(scanned[limit:])
+            complete = False
 
         for entry in entries:
-            if state.is_captured(entry.url):
+            key = canonicalize(entry.url)
+            if key in queued or state.is_captured(entry.url):
                 total_skipped += 1
                 continue
 
+            queued.add(key)
             if dry_run:
                 date_str = entry.published.strftime("%Y-%m-%d") if entry.published else "no date"
                 typer.echo(f"  [new] {entry.title} ({date_str})")
                 total_captured += 1
                 continue
 
-            try:
-                content = _capture_url(entry.url)
-                # Use feed entry metadata as fallback
-                if entry.author and not content.author:
-                    content.author = entry.author
-                if _save(content, quiet=False):
-                    state.mark_captured(entry.url)
-                    total_captured += 1
-            except Exception as e:
-                typer.echo(f"  Error capturing {entry.url}: {e}", err=True)
+            content = _extract_entry(entry)
+            if content is None:
+                complete = False
+                unhandled.append(entry)
+                continue
+            writer.add(content, item=(content, entry))
 
-    action = "would capture" if dry_run else "captured"
-    typer.echo(f"\nDone: {action} {total_captured}, skipped {total_skipped} already captured.", err=True)
+        writer.flush()
+        if complete:
+            state.set_feed_validators(url, **validators)
+        if not dry_run:
+            state.set_feed_watermark(url, advance(previous_mark, scanned, unhandled))
+
+    return total_captured, total_skipped
+
+
+def _extract_entry(entry):
+    """Extract one feed entry's content, or None (after reporting) on failure."""
+    try:
+        content = _capture_url(entry.url)
+    except Exception as e:
+        typer.echo(f"  Error capturing {entry.url}: {e}", err=True)
+        return None
+    # Use feed entry metadata as fallback
+    if entry.author and not content.author:
+        content.author = entry.author
+    return content
+
+
+def _feed_sync_parallel(
+    state: AppState,
+    feeds: dict[str, dict],
+    http,
+    *,
+    dry_run: bool,
+    limit: int,
+    workers: int,
+    per_host: int,
+    force: bool,
+    limits: tuple[float, float] | None = None,
+) -> tuple[int, int]:
+    """Fetch feeds and capture their new entries on the capture pipeline.
+
+    A fan-out "feeds" stage fetches each feed and turns its new entries
+    into `CaptureJob`s, which flow on through the fetch / extract / convert /
+    save stages — so extraction of one entry overlaps with the download of
+    the next and the upload of the previous. `--workers` sets the feed and
+    page fetch concurrency; every request goes through a `HostLimiter` so a
+    wide pool can't hammer a single host.
+
+    Dedup is claimed by canonical key under `state_lock` before a job is
+    emitted: the same URL showing up in two feeds is captured once and
+    counted as skipped the second time, matching the serial loop's totals.
+    A feed's validators are stored once its last job settles, and only if
+    none of them failed.
+    """
+    from amperstand.capture_flow import CaptureJob
+    from amperstand.feed_fetch import fetch_feed
+    from amperstand.feed_watermark import advance, entries_after
+    from amperstand.throttle import HostLimiter
+
+    limiter = HostLimiter(per_host)
+    state_lock = threading.Lock()
+    claimed: set[str] = set()
+    total_captured = 0
+    total_skipped = 0
+
+    # feed url -> {"pending": in-flight jobs, "complete": bool, "validators": dict,
+    #             "mark": previous watermark, "scanned": entries, "unhandled": entries}
+    progress: dict[str, dict] = {}
+
+    def _finish(feed_url: str) -> None:
+        # Caller holds state_lock.
+        p = progress[feed_url]
+        if p["pending"] != 0:
+            return
+        if p["complete"]:
+            state.set_feed_validators(feed_url, **p["validators"])
+        if not dry_run:
+            state.set_feed_watermark(feed_url, advance(p["mark"], p["scanned"], p["unhandled"]))
+
+    def expand_feed(feed_url: str) -> list:
+        nonlocal total_captured, total_skipped
+        name = feeds[feed_url]["name"]
+        try:
+            with state_lock:
+                validators = None if force else state.get_feed_validators(feed_url)
+            with limiter.slot(feed_url):
+                feed_info, validators = fetch_feed(feed_url, validators, client=http)
+        except Exception as e:
+            typer.echo(f"  [{name}] Error: {e}", err=True)
+            with state_lock:
+                _record_poll(state, feed_url, None, limits)
+            return []
+        with state_lock:
+            _record_poll(state, feed_url, feed_info and feed_info.entries, limits)
+        if feed_info is None:
+            typer.echo(f"\nFeed: {name} (not modified)", err=True)
+            if validators:
+                with state_lock:
+                    state.set_feed_validators(feed_url, **validators)
+            return []
+
+        with state_lock:
+            previous_mark = state.get_feed_watermark(feed_url)
+        scanned, below = entries_after(feed_info.entries or [], None if force else previous_mark)
+        complete = bool(not dry_run and validators)
+        entries = scanned
+        if limit > 0 and len(entries) > limit:
+            entries = entries[:limit]
+            complete = False
+
+        new_entries = []
+        with state_lock:
+            total_skipped += below
+            for entry in entries:
+                key = canonicalize(entry.url)
+                if key in claimed or state.is_captured(entry.url):
+                    total_skipped += 1
+                    continue
+                claimed.add(key)
+                new_entries.append(entry)
+            progress[feed_url] = {
+                "pending": 0 if dry_run else len(new_entries),
+                "complete": complete,
+                "validators": validators,
+                "mark": previous_mark,
+                "scanned": scanned,
+                "unhandled": scanned[len(entries):],
+            }
+            _finish(feed_url)
+            if dry_run:
+                total_captured += len(new_entries)
+        typer.echo(f"\nFeed: {name} ({len(new_entries)} new)", err=True)
+
+        if dry_run:
+            for entry in new_entries:
+                date_str = entry.published.strftime("%Y-%m-%d") if entry.published else "no date"
+                typer.echo(f"  [new] {entry.title} ({date_str})")
+            return []
+        return [
+            CaptureJob(entry.url, context=(feed_url, entry), author=entry.author)
+            for entry in new_entries
+        ]
+
+    def on_done(job, doc, error) -> None:
+        nonlocal total_captured
+        feed_url, entry = job.context
+        ok = error is None
+        if ok:
+            _echo_saved(doc, job.content)
+        else:
+            typer.echo(f"  Error capturing {entry.url}: {error}", err=True)
+        with state_lock:
+            if ok:
+                state.mark_captured(entry.url)
+                total_captured += 1
+            else:
+                # Let a later run (or a later feed) retry it.
+                claimed.discard(canonicalize(entry.url))
+                progress[feed_url]["complete"] = False
+                progress[feed_url]["unhandled"].append(entry)
+            progress[feed_url]["pending"] -= 1
+            _finish(feed_url)
+
+    if dry_run:
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(pool.map(expand_feed, feeds))
+        return total_captured, total_skipped
+
+    _run_capture_pipeline(
+        list(feeds),
+        on_done,
+        front=("feeds", expand_feed),
+        fetch_workers=workers,
+        limiter=limiter,
+    )
+    return total_captured, total_skipped
+
+
+def _run_capture_pipeline(
+    source,
+    on_done,
+    *,
+    front: tuple | None = None,
+    fetch_workers: int | None = None,
+    limiter=None,
+    save_delay: float = 5.0,
+) -> dict:
+    """Run CaptureJobs through the fetch → extract → convert → save pipeline.
+
+    `on_done(job, doc, error)` is called exactly once per job: with the
+    created doc on success, or with the exception from whichever stage (or
+    the backend write) failed. `front` is an optional `(name, func)` fan-out
+    stage that turns each source item into CaptureJobs (feed sync uses it
+    to expand feeds into entries). Stage widths default to the `pipeline`
+    config section. Documents wait at most `save_delay` seconds in the
+    batch writer before they're written. Returns per-stage stats.
+    """
+    from amperstand.backend_bridge import BatchWriter
+    from amperstand.capture_flow import CaptureJob, capture_stages
+    from amperstand.config import get_section
+    from amperstand.pipeline import Pipeline, Stage
+
+    cfg = get_section("pipeline")
+    fetch_workers = fetch_workers or int(cfg["fetch_workers"])
+    save_workers = int(cfg["save_workers"])
+    session = _require_backend()
+    browser = _use_browser_pool()
+
+    def on_result(result) -> None:
+        on_done(result.item, result.doc, result.error)
+
+    def on_error(stage: str, item, exc: Exception) -> None:
+        if isinstance(item, CaptureJob):
+            on_done(item, None, exc)
+        else:
+            typer.echo(f"  Error ({stage}): {exc}", err=True)
+
+    with BatchWriter(
+        session,
+        on_result,
+        max_delay=save_delay,
+        concurrency=save_workers,
+        outbox=_get_outbox(),
+    ) as writer:
+        stages = capture_stages(
+            writer,
+            cache=_get_extract_cache(),
+            limiter=limiter,
+            browser=browser,
+            fetch_workers=fetch_workers,
+            extract_workers=int(cfg["extract_workers"]),
+            save_workers=save_workers,
+        )
+        if front is not None:
+            stages.insert(0, Stage(front[0], front[1], fetch_workers, fan_out=True))
+        pipeline = Pipeline(stages, queue_size=int(cfg["queue_size"]), on_error=on_error)
+        return pipeline.run(source)
 
 
 # ── Email commands ────────────────────────────────────────────────────
@@ -439,7 +1340,7 @@ def email_rm(
         raise typer.Exit(code=1)
 
 
-def _make_email_filter(state: AppState, state_lock=None):
+def _make_email_filter(state: AppState):
     """Build a filter callback that checks allowlist + newsletter heuristics.
 
     Two-tier admission:
@@ -455,13 +1356,12 @@ def _make_email_filter(state: AppState, state_lock=None):
     estate mailer meant every listing from them captured forever. The
     allowlist is now a deliberate-action set, not a passive log.
 
-    `state_lock` is optional — pass one (threading.Lock) when running
-    multiple accounts in parallel so the state file doesn't race.
+    Safe to call from several account threads at once; `AppState` handles
+    its own locking.
     """
-    from contextlib import nullcontext
     from email.message import EmailMessage
 
-    guard = state_lock if state_lock is not None else nullcontext()
+    from amperstand_core.newsletter_filter import get_sender_email, is_newsletter
 
     def email_filter(msg: EmailMessage) -> bool:
         try:
@@ -469,9 +1369,8 @@ def _make_email_filter(state: AppState, state_lock=None):
         except Exception:
             # Can't parse sender — capture aggressively rather than skip
             return True
-        with guard:
-            if state.is_sender_allowed(sender):
-                return True
+        if state.is_sender_allowed(sender):
+            return True
         if is_newsletter(msg):
             # Pass this email through, but do NOT auto-add the sender.
             # Whitelisting is now an explicit action via `email allow`.
@@ -484,7 +1383,7 @@ def _make_email_filter(state: AppState, state_lock=None):
 
 @email_app.command("allow")
 def email_allow(
-    sender: str = typer.Argument(help="Email address or @domain to allow."),
+    sender: str = typer.Argument(help="Email address or @domain (covers its subdomains) to allow."),
 ) -> None:
     """Add a sender to the newsletter allowlist."""
     state = AppState()
@@ -518,15 +1417,30 @@ def email_senders() -> None:
 
 
 @email_app.command("sync")
-def email_sync() -> None:
+def email_sync(
+    workers: int = typer.Option(
+        4,
+        "--workers",
+        "-w",
+        min=1,
+        help="Parse-and-upload workers shared by all accounts.",
+    ),
+) -> None:
     """Fetch and capture unread newsletters across every configured IMAP account.
 
-    Each account runs in its own thread — N inboxes fetch in parallel.
-    State writes (allowlist, captured-URL set) are serialized by a shared
-    lock so the per-account workers can't race on the JSON state file.
+    Each account gets its own fetcher thread; they all feed one bounded
+    queue drained by a shared pool of `--workers` upload workers, so a
+    single huge inbox isn't stuck uploading one email at a time. When
+    uploads fall behind, the fetchers pause until the queue has room.
     """
-    import threading
-    from concurrent.futures import ThreadPoolExecutor, as_completed
+    import time
+
+    from amperstand_core.imap import fetch_unseen
+
+    from amperstand.backend_bridge import BatchWriter
+    from amperstand.config import get_section
+    from amperstand.email_flow import AccountStats, email_stages, fetch_all
+    from amperstand.pipeline import Pipeline
 
     accounts = load_email_accounts()
     if not accounts:
@@ -534,43 +1448,97 @@ def email_sync() -> None:
         raise typer.Exit(code=1)
 
     state = AppState()
-    state_lock = threading.Lock()
+    lock = threading.Lock()  # guards `claimed` and `stats`; AppState locks itself
+    session = _require_backend()
     typer.echo(f"Checking {len(accounts)} account(s) for new emails...", err=True)
 
-    def _run_one(account: dict) -> tuple[str, int, str | None]:
-        label = account.get("name") or account.get("email") or "imap"
-        captured = 0
-        try:
-            for uid, content in fetch_unseen(account, email_filter=_make_email_filter(state, state_lock)):
-                with state_lock:
-                    if state.is_captured(content.url):
-                        continue
-                if _save(content, quiet=True):
-                    with state_lock:
-                        state.mark_captured(content.url)
-                    captured += 1
-                    typer.echo(f"  [{label}] [{captured}] {content.title}", err=True)
-        except Exception as exc:  # noqa: BLE001
-            return label, captured, str(exc)
-        return label, captured, None
+    labelled = []
+    for n, account in enumerate(accounts, 1):
+        label = account.get("name") or account.get("email") or f"imap{n}"
+        if any(label == other for other, _ in labelled):
+            label = f"{label}#{n}"
+        labelled.append((label, account))
+    stats = {label: AccountStats(label) for label, _ in labelled}
+    email_filter = _make_email_filter(state)
+    claimed: set[str] = set()
+
+    def fetch(account: dict):
+        return fetch_unseen(account, email_filter=email_filter)
+
+    def is_duplicate(job) -> bool:
+        key = canonicalize(job.content.url)
+        with lock:
+            fresh = key not in claimed
+            claimed.add(key)
+        if fresh and not state.is_captured(job.content.url):
+            return False
+        with lock:
+            stats[job.label].duplicates += 1
+        return True
+
+    def on_result(result) -> None:
+        job = result.item
+        st = stats[job.label]
+        if result.ok:
+            state.mark_captured(job.content.url)
+        with lock:
+            if result.ok:
+                if result.queued:
+                    st.queued += 1
+                else:
+                    st.saved += 1
+            else:
+                claimed.discard(canonicalize(job.content.url))
+                st.failed += 1
+        if result.queued:
+            typer.echo(f"  [{job.label}] queued for retry: {job.content.title}", err=True)
+        elif result.ok:
+            typer.echo(f"  [{job.label}] {job.content.title}", err=True)
+        else:
+            typer.echo(f"  [{job.label}] Error: backend create failed: {result.error}", err=True)
+
+    def on_error(stage: str, job, exc: Exception) -> None:
+        with lock:
+            stats[job.label].failed += 1
+        typer.echo(f"  [{job.label}] Error ({stage}): {exc}", err=True)
+
+    queue_size = int(get_section("pipeline")["queue_size"])
+    started = time.monotonic()
+    with state.batch(), BatchWriter(
+        session, on_result, concurrency=workers, outbox=_get_outbox()
+    ) as writer:
+        Pipeline(
+            email_stages(writer, is_duplicate=is_duplicate, workers=workers),
+            queue_size=queue_size,
+            on_error=on_error,
+        ).run(fetch_all(labelled, fetch, stats, queue_size=queue_size))
+    elapsed = time.monotonic() - started
 
     total = 0
-    errors: list[tuple[str, str]] = []
-    with ThreadPoolExecutor(max_workers=max(len(accounts), 1)) as pool:
-        futures = [pool.submit(_run_one, a) for a in accounts]
-        for fut in as_completed(futures):
-            label, captured, err = fut.result()
-            total += captured
-            if err:
-                errors.append((label, err))
-                typer.echo(f"  [{label}] error: {err}", err=True)
+    errors = 0
+    for st in stats.values():
+        total += st.saved + st.queued
+        line = (
+            f"  [{st.label}] fetched {st.fetched}, saved {st.saved}, "
+            f"duplicates {st.duplicates}, failed {st.failed}"
+        )
+        if st.queued:
+            line += f", queued for retry {st.queued}"
+        if st.error:
+            errors += 1
+            line += f" — error: {st.error}"
+        typer.echo(f"{line} (fetch {st.elapsed:.1f}s)", err=True)
 
     if errors and total == 0:
         raise typer.Exit(code=1)
     if total == 0:
         typer.echo("No new emails.", err=True)
     else:
-        typer.echo(f"Done: captured {total} newsletter(s) across {len(accounts)} account(s).", err=True)
+        typer.echo(
+            f"Done: captured {total} newsletter(s) across {len(accounts)} account(s) "
+            f"in {elapsed:.1f}s.",
+            err=True,
+        )
 
 
 @email_app.command("watch")
@@ -580,47 +1548,123 @@ def email_watch(
         "--interval",
         help="Poll interval in seconds (used when IDLE is not supported).",
     ),
+    metrics_port: int | None = typer.Option(
+        None,
+        "--metrics-port",
+        help="Serve Prometheus metrics at http://<metrics.host>:PORT/metrics.",
+    ),
+    metrics_file: Path | None = typer.Option(
+        None,
+        "--metrics-file",
+        help="Rewrite Prometheus metrics to this file every metrics.interval_s seconds "
+        "(for node_exporter's textfile collector).",
+    ),
 ) -> None:
     """Watch every configured mailbox in real-time (IMAP IDLE, one thread per account).
 
     Spawns N daemon threads — one per configured account — that each run
     the reconnect-forever IDLE/poll loop. Ctrl+C interrupts the main
-    thread and the daemons die on process exit. State mutations are
-    serialized by a shared lock.
+    thread and the daemons die on process exit. The threads share one
+    `AppState`, which is thread-safe: dedup lookups run concurrently and
+    capture marks are group-committed.
+
+    With `--metrics-port` or `--metrics-file` the watcher exports
+    per-account email and IMAP connection counts, backend and state-write
+    latency and the outbox depth in the Prometheus text format.
     """
-    import threading
+    import time
+
+    from amperstand.config import get_section
+    from amperstand.email_flow import WatchMetrics, watch_account
+    from amperstand.metrics import Registry, TextfileWriter, serve
 
     accounts = load_email_accounts()
     if not accounts:
         typer.echo("No email accounts configured. Run 'amperstand email setup' first.", err=True)
         raise typer.Exit(code=1)
 
+    # Retry the outbox now rather than inside the first timed `_save`, where
+    # it would show up as one very slow backend write.
+    _require_backend()
     state = AppState()
-    state_lock = threading.Lock()
     labels = [a.get("name") or a.get("email") for a in accounts]
+
+    def _outbox_depth() -> int | None:
+        outbox = _get_outbox()
+        return outbox.count() if outbox is not None else None
+
+    registry = Registry()
+    wm = WatchMetrics(registry, queue_depth=_outbox_depth)
+    for label in labels:
+        wm.add_account(label)
+    metrics_cfg = get_section("metrics")
+    server = writer = None
+    if metrics_port is not None:
+        try:
+            server = serve(registry, metrics_port, str(metrics_cfg["host"]))
+        except OSError as exc:
+            typer.echo(f"Error: cannot serve metrics on port {metrics_port}: {exc}", err=True)
+            raise typer.Exit(code=1)
+        host, port = server.server_address[:2]
+        typer.echo(f"Serving metrics at http://{host}:{port}/metrics", err=True)
+    if metrics_file is not None:
+        writer = TextfileWriter(registry, metrics_file, float(metrics_cfg["interval_s"]))
+
     typer.echo(f"Watching {len(accounts)} account(s): {', '.join(labels)} (Ctrl+C to stop)", err=True)
 
     def _make_on_email(label: str):
         def on_email(content):
-            with state_lock:
-                if state.is_captured(content.url):
-                    return
-            if _save(content):
-                with state_lock:
-                    state.mark_captured(content.url)
-                typer.echo(f"  [{label}] {content.title}", err=True)
+            if state.is_captured(content.url):
+                wm.duplicates.inc(label)
+                return
+            start = time.perf_counter()
+            saved = _save(content)
+            wm.backend_latency.observe(time.perf_counter() - start)
+            if not saved:
+                wm.failed.inc(label)
+                return
+            start = time.perf_counter()
+            state.mark_captured(content.url)
+            wm.state_latency.observe(time.perf_counter() - start)
+            wm.captured.inc(label)
+            typer.echo(f"  [{label}] {content.title}", err=True)
         return on_email
 
+    def _make_filter(label: str):
+        accept = _make_email_filter(state)
+
+        def email_filter(msg) -> bool:
+            wm.seen.inc(label)
+            wm.last_email.set(time.time(), label)
+            if accept(msg):
+                return True
+            wm.filtered.inc(label)
+            return False
+        return email_filter
+
     def _run_account(account: dict):
         label = account.get("name") or account.get("email")
+
+        def on_connect() -> None:
+            wm.connects.inc(label)
+            wm.connected.set(1, label)
+
+        def on_disconnect(exc: Exception) -> None:
+            wm.reconnects.inc(label)
+            wm.connected.set(0, label)
+            typer.echo(f"  [{label}] connection lost ({exc}); reconnecting", err=True)
+
         try:
-            watch(
+            watch_account(
                 account,
-                on_email=_make_on_email(label),
+                _make_on_email(label),
                 poll_interval=poll_interval,
-                email_filter=_make_email_filter(state, state_lock),
+                email_filter=_make_filter(label),
+                on_connect=on_connect,
+                on_disconnect=on_disconnect,
             )
         except Exception as exc:  # noqa: BLE001
+            wm.connected.set(0, label)
             typer.echo(f"  [{label}] watch crashed: {exc}", err=True)
 
     threads: list[threading.Thread] = []
@@ -636,6 +1680,12 @@ def email_watch(
                 t.join(timeout=1.0)
     except KeyboardInterrupt:
         typer.echo("\nStopped watching.", err=True)
+    finally:
+        if writer is not None:
+            writer.close()
+        if server is not None:
+            server.shutdown()
+            server.server_close()
 
 
 @email_app.command("parse")
@@ -652,6 +1702,9 @@ def email_parse(
         typer.echo(f"File not found: {file}", err=True)
         raise typer.Exit(code=1)
 
+    from amperstand_core.converter import to_markdown
+    from amperstand_core.email_parser import parse_eml_file
+
     try:
         content = parse_eml_file(file)
     except Exception as e:
@@ -690,6 +1743,181 @@ def config_set(
     typer.echo(f"Set {key} = {value}")
 
 
+# ── Cache commands ───────────────────────────────────────────────────
+
+
+@cache_app.command("stats")
+def cache_stats() -> None:
+    """Show how many extractions are cached and how much disk they use."""
+    from amperstand.extract_cache import ExtractCache
+
+    cache = ExtractCache()
+    try:
+        stats = cache.stats()
+    finally:
+        cache.close()
+    typer.echo(f"Entries: {stats['entries']}")
+    typer.echo(f"Size: {stats['bytes'] / (1024 * 1024):.1f} MB")
+
+
+@cache_app.command("clear")
+def cache_clear() -> None:
+    """Drop every cached extraction."""
+    from amperstand.extract_cache import ExtractCache
+
+    cache = ExtractCache()
+    try:
+        removed = cache.clear()
+    finally:
+        cache.close()
+    typer.echo(f"Cleared {removed} cached extraction(s).")
+
+
+# ── Outbox commands ──────────────────────────────────────────────────
+
+
+@outbox_app.command("list")
+def outbox_list() -> None:
+    """Show documents waiting to be written to the vault backend."""
+    import time
+
+    from amperstand.outbox import open_outbox
+
+    outbox = open_outbox()
+    if outbox is None:
+        typer.echo("The outbox is disabled (outbox.enabled = false).")
+        return
+    try:
+        entries = outbox.entries()
+        if not entries:
+            typer.echo("Outbox is empty.")
+            return
+        dead = sum(outbox.is_dead(entry) for entry in entries)
+        summary = f"{len(entries)} document(s) in the outbox"
+        if dead:
+            summary += f", {dead} dead (past outbox.max_attempts)"
+        typer.echo(summary + ":")
+        now = time.time()
+        for entry in entries:
+            if outbox.is_dead(entry):
+                when = "gave up; `outbox flush --all` to retry"
+            elif entry.next_attempt_at <= now:
+                when = "due now"
+            else:
+                when = f"next try in {entry.next_attempt_at - now:.0f}s"
+            typer.echo(f"  #{entry.id} {entry.title} ({entry.attempts} attempt(s), {when})")
+            typer.echo(f"      {entry.error}")
+    finally:
+        outbox.close()
+
+
+@outbox_app.command("flush")
+def outbox_flush(
+    retry_all: bool = typer.Option(
+        False,
+        "--all",
+        help="Retry every parked document now, ignoring backoff and the attempt limit.",
+    ),
+) -> None:
+    """Retry parked documents whose backoff has expired."""
+    global _outbox_drained
+    with _outbox_lock:
+        _outbox_drained = True  # don't let _require_backend drain it first
+    session = _require_backend()
+    sent, left = _drain_outbox(session, force=retry_all, quiet=True)
+    outbox = _get_outbox()
+    remaining = outbox.count() if outbox is not None else 0
+    dead = outbox.dead_count() if outbox is not None else 0
+    message = f"Delivered {sent}, still failing {left}, {remaining} left in the outbox"
+    if dead:
+        message += f" ({dead} dead; `outbox flush --all` retries them)"
+    typer.echo(message + ".")
+    if left and not sent:
+        raise typer.Exit(code=1)
+
+
+# ── Daemon commands ──────────────────────────────────────────────────
+
+
+@daemon_app.command("run")
+def daemon_run() -> None:
+    """Run the capture daemon in the foreground until stopped.
+
+    Listens on ~/.amperstand/daemon.sock; `amperstand capture <url>` queues
+    onto it automatically. Stop with Ctrl-C, SIGTERM or `daemon stop` —
+    queued jobs survive a restart.
+    """
+    import signal
+
+    from amperstand.config import get_section
+    from amperstand.daemon import Daemon, socket_path
+
+    cfg = get_section("daemon")
+    state = AppState()
+    session = _require_backend()
+
+    def run_jobs(source, on_done):
+        # Jobs trickle in one at a time; don't hold a finished capture back
+        # waiting for a batch to fill.
+        return _run_capture_pipeline(source, on_done, save_delay=0.5)
+
+    daemon = Daemon(
+        state,
+        run_jobs,
+        max_attempts=int(cfg["max_attempts"]),
+        backoff=float(cfg["backoff_s"]),
+        max_backoff=float(cfg["max_backoff_s"]),
+        on_idle=lambda: _drain_outbox(session),
+    )
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(signum, lambda *_: daemon.stop())
+    try:
+        typer.echo(f"Capture daemon listening on {socket_path()} (pid {os.getpid()}).")
+        daemon.serve()
+    except RuntimeError as e:
+        typer.echo(f"Error: {e}", err=True)
+        raise typer.Exit(code=1)
+    finally:
+        state.close()
+    typer.echo(f"Daemon stopped: captured {daemon.captured}, failed {daemon.failed}.")
+
+
+@daemon_app.command("status")
+def daemon_status() -> None:
+    """Show whether the daemon is running and what's in its queue."""
+    from amperstand.daemon import DaemonUnavailable, request
+
+    try:
+        reply = request({"op": "status"})
+    except DaemonUnavailable:
+        typer.echo("Daemon: not running")
+        state = AppState()
+        counts = state.job_counts()
+        failed = state.failed_jobs(limit=5)
+    else:
+        typer.echo(f"Daemon: running (pid {reply['pid']}, up {reply['uptime']:.0f}s)")
+        typer.echo(f"This run: captured {reply['captured']}, failed {reply['failed']}")
+        counts = reply["jobs"]
+        failed = AppState().failed_jobs(limit=5) if counts.get("failed") else []
+    for status in ("pending", "running", "done", "failed"):
+        typer.echo(f"  {status}: {counts.get(status, 0)}")
+    for job in failed:
+        typer.echo(f"  ✗ #{job['id']} {job['url']} ({job['attempts']} attempts): {job['error']}")
+
+
+@daemon_app.command("stop")
+def daemon_stop() -> None:
+    """Ask a running daemon to finish its in-flight jobs and exit."""
+    from amperstand.daemon import DaemonUnavailable, request
+
+    try:
+        request({"op": "stop"})
+    except DaemonUnavailable:
+        typer.echo("Daemon: not running")
+        return
+    typer.echo("Stop requested; in-flight jobs will finish first.")
+
+
 # ── Vault commands ───────────────────────────────────────────────────
 
 
@@ -702,6 +1930,11 @@ def vault_init(
         "-r",
         help="Git remote URL to add as origin.",
     ),
+    auto_sync: bool = typer.Option(
+        False,
+        "--auto-sync",
+        help="Pull and push in the background after captures are committed.",
+    ),
 ) -> None:
     """Initialize a new Git-backed vault and set it as default."""
     try:
@@ -711,7 +1944,7 @@ def vault_init(
         raise typer.Exit(code=1)
 
     state = AppState()
-    state.set_vault(str(path.resolve()))
+    state.set_vault(str(path.resolve()), auto_sync=auto_sync)
     typer.echo(f"Vault initialized: {path.resolve()}")
     if remote:
         typer.echo(f"Remote: {remote}")
@@ -756,24 +1989,43 @@ def vault_status() -> None:
         typer.echo("Warning: path is not a Git repository.", err=True)
         return
 
-    from amperstand.vault import _git
+    from amperstand.vault import read_status
 
-    # Uncommitted changes
-    result = _git(vault_path, "status", "--porcelain")
-    uncommitted = len([l for l in result.stdout.splitlines() if l.strip()])
-    typer.echo(f"Uncommitted files: {uncommitted}")
+    try:
+        status = read_status(vault_path)
+    except VaultError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo(f"Uncommitted files: {status.changed + status.untracked}")
 
     # Unpushed commits
-    if has_remote(vault_path):
-        try:
-            result = _git(vault_path, "rev-list", "--count", "@{u}..HEAD")
-            typer.echo(f"Unpushed commits: {result.stdout.strip()}")
-        except VaultError:
-            typer.echo("Unpushed commits: unknown (no upstream branch)")
+    if status.ahead is not None:
+        typer.echo(f"Unpushed commits: {status.ahead}")
+        if status.behind:
+            typer.echo(f"Unpulled commits: {status.behind}")
+    elif has_remote(vault_path):
+        typer.echo("Unpushed commits: unknown (no upstream branch)")
     else:
         typer.echo("Remote: none")
 
 
+@vault_app.command("tune")
+def vault_tune() -> None:
+    """Enable git's caches for large vaults (untracked cache, fsmonitor where supported)."""
+    from amperstand.vault import tune_vault
+
+    vault = AppState().get_vault()
+    if not vault:
+        typer.echo("No vault configured.", err=True)
+        raise typer.Exit(code=1)
+    try:
+        tune_vault(Path(vault["path"]))
+    except VaultError as exc:
+        typer.echo(f"Error: {exc}", err=True)
+        raise typer.Exit(code=1)
+    typer.echo("Vault tuned for large work trees.")
+
+
 @vault_app.command("unset")
 def vault_unset() -> None:
     """Remove vault from config (does not delete files)."""
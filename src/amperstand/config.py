@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import json
+import os
+import tempfile
 from pathlib import Path
 
 from amperstand.state import DEFAULT_STATE_DIR
@@ -14,6 +16,49 @@ DEFAULTS: dict[str, dict] = {
         "level": "INFO",
         "file": "~/.amperstand/amperstand.log",
     },
+    "pipeline": {
+        "fetch_workers": 8,
+        "extract_workers": 4,
+        "save_workers": 2,
+        "queue_size": 64,
+    },
+    "extract_cache": {
+        "enabled": True,
+        "ttl_hours": 168,
+        "max_mb": 256,
+    },
+    "browser": {
+        "pool": True,
+        "contexts": 4,  # concurrent pages in the one pooled Chromium
+        "page_uses": 20,
+        "page_timeout_s": 30,
+        "settle_ms": 3000,
+    },
+    "feed_schedule": {
+        "min_minutes": 15,
+        "max_hours": 24,
+    },
+    "outbox": {
+        "enabled": True,
+        "backoff_s": 60,
+        "max_backoff_s": 21600,
+        "max_attempts": 12,
+    },
+    "vault_git": {
+        "commit_files": 100,
+        "commit_delay_s": 30,
+        "sync_timeout_s": 300,
+        "sync_wait_s": 60,
+    },
+    "metrics": {
+        "host": "127.0.0.1",
+        "interval_s": 15,
+    },
+    "daemon": {
+        "max_attempts": 5,
+        "backoff_s": 30,
+        "max_backoff_s": 3600,
+    },
 }
 
 
@@ -33,10 +78,25 @@ def load_config(state_dir: Path = DEFAULT_STATE_DIR) -> dict:
 
 
 def save_config(config: dict, state_dir: Path = DEFAULT_STATE_DIR) -> None:
-    """Write the full config dict to config.json."""
+    """Write the full config dict to config.json.
+
+    The new contents go to a temporary file that replaces config.json in
+    one rename, so a crash mid-write leaves the old file intact rather
+    than a truncated one. The file holds IMAP passwords and API keys, so
+    it's created owner-only.
+    """
     state_dir.mkdir(parents=True, exist_ok=True)
     path = _config_path(state_dir)
-    path.write_text(json.dumps(config, indent=2), encoding="utf-8")
+    fd, tmp = tempfile.mkstemp(dir=state_dir, prefix=f".{CONFIG_FILE}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(json.dumps(config, indent=2))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
 
 
 def get_section(section: str, state_dir: Path = DEFAULT_STATE_DIR) -> dict:
@@ -46,6 +106,13 @@ def get_section(section: str, state_dir: Path = DEFAULT_STATE_DIR) -> dict:
     return {**defaults, **data}
 
 
+def as_bool(value: object) -> bool:
+    """Interpret a config value that may have been stored as a string by `set_value`."""
+    if isinstance(value, str):
+        return value.strip().lower() not in {"", "0", "false", "no", "off"}
+    return bool(value)
+
+
 def set_value(dotted_key: str, value: str, state_dir: Path = DEFAULT_STATE_DIR) -> None:
     """Set a config value using a dotted key, e.g. 'logging.level'."""
     parts = dotted_key.split(".", 1)
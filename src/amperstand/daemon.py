@@ -0,0 +1,278 @@
+"""A long-running capture daemon with a persistent job queue.
+
+Cron jobs and share-sheet hooks call `amperstand capture` thousands of
+times a day, and each call pays for interpreter start-up, config parsing,
+backend construction and (for JS-heavy pages) a browser launch.
+`amperstand daemon run` pays for those once: it keeps the backend session,
+extraction cache and browser pool open and runs queued URLs through the
+usual capture pipeline.
+
+Clients talk to the daemon over a Unix socket in the state directory
+(`~/.amperstand/daemon.sock`) using one JSON object per line, one
+request per connection:
+
+    {"op": "capture", "url": "https://…"}  →  {"ok": true, "job": 42}
+    {"op": "status"}                        →  {"ok": true, "pid": …, "jobs": {…}}
+    {"op": "stop"}                          →  {"ok": true}
+
+Jobs live in the `jobs` table of state.db, so nothing queued is lost if
+the daemon stops or crashes — jobs it was working on are requeued on the
+next start. A failed capture is retried with exponential backoff and
+marked failed once it runs out of attempts.
+
+The client side (`request`, `submit`) is deliberately cheap to import:
+`capture` checks for a running daemon on every call.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator
+
+from amperstand.state import DEFAULT_STATE_DIR, AppState
+
+logger = logging.getLogger(__name__)
+
+SOCKET_FILE = "daemon.sock"
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is listening (or it didn't answer)."""
+
+
+def socket_path(state_dir: Path = DEFAULT_STATE_DIR) -> Path:
+    return state_dir / SOCKET_FILE
+
+
+# --- Client ---
+
+
+def request(
+    message: dict[str, Any],
+    *,
+    state_dir: Path = DEFAULT_STATE_DIR,
+    timeout: float = 5.0,
+) -> dict[str, Any]:
+    """Send one request to the daemon and return its reply."""
+    path = socket_path(state_dir)
+    if not hasattr(socket, "AF_UNIX") or not path.exists():
+        raise DaemonUnavailable("no capture daemon is running")
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect(str(path))
+            sock.sendall(json.dumps(message).encode("utf-8") + b"\n")
+            with sock.makefile("rb") as reader:
+                line = reader.readline()
+    except OSError as exc:
+        raise DaemonUnavailable(f"capture daemon not reachable: {exc}") from exc
+    if not line:
+        raise DaemonUnavailable("capture daemon closed the connection")
+    return json.loads(line)
+
+
+def submit(url: str, *, state_dir: Path = DEFAULT_STATE_DIR) -> int:
+    """Queue *url* on the running daemon. Returns the job id."""
+    reply = request({"op": "capture", "url": url}, state_dir=state_dir)
+    if not reply.get("ok"):
+        raise DaemonUnavailable(reply.get("error") or "capture daemon rejected the job")
+    return int(reply["job"])
+
+
+def is_running(state_dir: Path = DEFAULT_STATE_DIR) -> bool:
+    try:
+        return bool(request({"op": "ping"}, state_dir=state_dir, timeout=1.0).get("ok"))
+    except DaemonUnavailable:
+        return False
+
+
+# --- Server ---
+
+
+class Daemon:
+    """Serve the job socket and feed queued jobs to *run_jobs*.
+
+    `run_jobs(source, on_done)` is the CLI's capture pipeline runner: it
+    drains *source* (an endless iterator of CaptureJobs that only ends once
+    `stop()` is called) and calls `on_done(job, doc, error)` once per job.
+    `on_idle` runs at most every `poll_interval` seconds while the queue is
+    empty (the CLI retries its outbox there).
+    """
+
+    def __init__(
+        self,
+        state: AppState,
+        run_jobs: Callable[[Iterable[Any], Callable[..., None]], Any],
+        *,
+        state_dir: Path = DEFAULT_STATE_DIR,
+        max_attempts: int = 5,
+        backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        poll_interval: float = 60.0,
+        on_idle: Callable[[], Any] | None = None,
+    ) -> None:
+        self._state = state
+        self._run_jobs = run_jobs
+        self._state_dir = state_dir
+        self._max_attempts = max(1, max_attempts)
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._poll_interval = poll_interval
+        self._on_idle = on_idle
+        self._last_idle = 0.0
+        self._count_lock = threading.Lock()  # captured/failed; AppState locks itself
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._started = time.time()
+        self._server: socket.socket | None = None
+        self.captured = 0
+        self.failed = 0
+
+    # Lifecycle
+
+    def serve(self) -> None:
+        """Run until `stop()`; jobs in flight are finished before returning."""
+        self._listen()
+        requeued = self._state.requeue_running_jobs()
+        self._state.prune_jobs()
+        if requeued:
+            logger.info("daemon requeued %d interrupted job(s)", requeued)
+        acceptor = threading.Thread(target=self._accept_loop, name="daemon-accept", daemon=True)
+        acceptor.start()
+        try:
+            self._run_jobs(self._jobs(), self._on_done)
+        finally:
+            self.stop()
+            self._close_socket()
+            acceptor.join(timeout=5)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    def _listen(self) -> None:
+        path = socket_path(self._state_dir)
+        if path.exists():
+            if is_running(self._state_dir):
+                raise RuntimeError(f"a capture daemon is already listening on {path}")
+            path.unlink()  # stale socket from a daemon that didn't exit cleanly
+        server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        server.bind(str(path))
+        os.chmod(path, 0o600)
+        server.listen(16)
+        server.settimeout(0.5)
+        self._server = server
+
+    def _close_socket(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+            socket_path(self._state_dir).unlink(missing_ok=True)
+
+    # Requests
+
+    def _accept_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                conn, _ = self._server.accept()
+            except socket.timeout:
+                continue
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn: socket.socket) -> None:
+        with conn:
+            conn.settimeout(10)
+            try:
+                with conn.makefile("rb") as reader:
+                    line = reader.readline()
+                reply = self._dispatch(json.loads(line))
+            except Exception as exc:  # noqa: BLE001
+                reply = {"ok": False, "error": str(exc)}
+            try:
+                conn.sendall(json.dumps(reply).encode("utf-8") + b"\n")
+            except OSError:
+                pass
+
+    def _dispatch(self, message: dict[str, Any]) -> dict[str, Any]:
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "capture":
+            url = str(message.get("url") or "").strip()
+            if not url.startswith(("http://", "https://")):
+                return {"ok": False, "error": f"not a URL: {url!r}"}
+            job_id = self._state.enqueue_job(url)
+            self._wake.set()
+            return {"ok": True, "job": job_id}
+        if op == "status":
+            counts = self._state.job_counts()
+            return {
+                "ok": True,
+                "pid": os.getpid(),
+                "uptime": round(time.time() - self._started, 1),
+                "captured": self.captured,
+                "failed": self.failed,
+                "jobs": counts,
+            }
+        if op == "stop":
+            self.stop()
+            return {"ok": True}
+        return {"ok": False, "error": f"unknown op: {op!r}"}
+
+    # Jobs
+
+    def _jobs(self) -> Iterator[Any]:
+        from amperstand.capture_flow import CaptureJob
+
+        while not self._stopping.is_set():
+            claimed = self._state.claim_job()
+            due = None if claimed else self._state.next_job_due()
+            if claimed is not None:
+                job_id, url, attempts = claimed
+                logger.info("daemon job %d (attempt %d): %s", job_id, attempts, url)
+                yield CaptureJob(url, context=(job_id, attempts))
+                continue
+            self._idle()
+            wait = self._poll_interval if due is None else max(0.0, due - time.time())
+            self._wake.wait(min(wait, self._poll_interval))
+            self._wake.clear()
+
+    def _idle(self) -> None:
+        if self._on_idle is None or time.monotonic() - self._last_idle < self._poll_interval:
+            return
+        self._last_idle = time.monotonic()
+        try:
+            self._on_idle()
+        except Exception:  # noqa: BLE001
+            logger.exception("daemon idle task failed")
+
+    def _on_done(self, job, doc, error: Exception | None) -> None:
+        job_id, attempts = job.context
+        if error is None:
+            self._state.finish_job(job_id)
+            with self._count_lock:
+                self.captured += 1
+            logger.info("daemon job %d saved: %s", job_id, job.url)
+            return
+        delay = self._retry_delay(attempts)
+        self._state.retry_job(job_id, str(error), delay=delay)
+        if delay is None:
+            with self._count_lock:
+                self.failed += 1
+            logger.warning("daemon job %d failed for good: %s: %s", job_id, job.url, error)
+        else:
+            logger.info("daemon job %d failed, retrying in %.0fs: %s", job_id, delay, error)
+        self._wake.set()
+
+    def _retry_delay(self, attempts: int) -> float | None:
+        if attempts >= self._max_attempts:
+            return None
+        return min(self._backoff * 2 ** (attempts - 1), self._max_backoff)
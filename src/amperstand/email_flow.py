@@ -0,0 +1,334 @@
+"""Producer/consumer plumbing for `email sync`.
+
+Each IMAP account is a producer: one thread per account walks
+`fetch_unseen` (fetch, filter, parse — all bound to that account's
+connection) and pushes parsed emails into one bounded queue shared by
+every account. The consumers are pipeline stages — dedup, convert and a
+`BatchWriter`-backed save — whose worker counts don't depend on how many
+accounts there are, so a single inbox with thousands of unseen
+newsletters uploads as fast as several small ones. When uploads fall
+behind, the queue fills and the fetchers block, so memory stays bounded.
+
+`AccountStats` keeps a per-account tally for the end-of-run summary.
+
+`watch_account` is `email watch`'s reconnect-forever loop for one
+account, built on imaplib and core's public email parser, with hooks for
+each connect and each dropped connection so the watcher can export
+reconnect counts; `WatchMetrics` holds the metrics `email watch` exports.
+"""
+
+from __future__ import annotations
+
+import imaplib
+import logging
+import queue
+import select
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import date
+from email.message import EmailMessage
+from typing import Any, Callable, Iterable, Iterator
+
+from amperstand_core.models import CapturedContent
+
+from amperstand.backend_bridge import BatchWriter, content_to_backend_args
+from amperstand.metrics import Registry
+from amperstand.pipeline import Stage
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class AccountStats:
+    """What one account contributed to a sync run."""
+
+    label: str
+    fetched: int = 0
+    duplicates: int = 0
+    saved: int = 0
+    queued: int = 0  # parked in the outbox after a failed write
+    failed: int = 0
+    error: str | None = None
+    started: float = field(default_factory=time.monotonic)
+    finished: float | None = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+
+@dataclass
+class EmailJob:
+    """One parsed email on its way to the backend."""
+
+    label: str
+    uid: bytes
+    content: CapturedContent
+    body: str | None = None
+    frontmatter: dict[str, Any] | None = None
+
+
+def fetch_all(
+    accounts: list[tuple[str, dict]],
+    fetch: Callable[[dict], Iterable[tuple[bytes, CapturedContent]]],
+    stats: dict[str, AccountStats],
+    *,
+    queue_size: int = 64,
+) -> Iterator[EmailJob]:
+    """Run one fetcher thread per `(label, account)` and yield their emails as they arrive.
+
+    A fetcher that raises records the error in its `AccountStats`; the
+    others keep going.
+    """
+    inbox: queue.Queue = queue.Queue(maxsize=queue_size)
+
+    def produce(label: str, account: dict) -> None:
+        st = stats[label]
+        try:
+            for uid, content in fetch(account):
+                st.fetched += 1
+                inbox.put(EmailJob(label, uid, content))
+        except Exception as exc:  # noqa: BLE001
+            st.error = str(exc)
+        finally:
+            st.finished = time.monotonic()
+            inbox.put(_DONE)
+
+    for label, account in accounts:
+        threading.Thread(
+            target=produce, args=(label, account), name=f"imap-{label}", daemon=True
+        ).start()
+
+    remaining = len(accounts)
+    while remaining:
+        item = inbox.get()
+        if item is _DONE:
+            remaining -= 1
+            continue
+        yield item
+
+
+def email_stages(
+    writer: BatchWriter,
+    *,
+    is_duplicate: Callable[[EmailJob], bool],
+    workers: int = 4,
+) -> list[Stage]:
+    """Dedup → convert → save stages for `EmailJob`s, ending in *writer*."""
+
+    def dedup(job: EmailJob) -> EmailJob | None:
+        return None if is_duplicate(job) else job
+
+    def convert(job: EmailJob) -> EmailJob:
+        job.body, job.frontmatter = content_to_backend_args(job.content)
+        return job
+
+    def save(job: EmailJob) -> EmailJob:
+        writer.add_doc(job.body, job.frontmatter, item=job)
+        return job
+
+    return [
+        Stage("dedup", dedup, 1),
+        Stage("convert", convert, max(1, workers // 2)),
+        Stage("save", save, workers),
+    ]
+
+
+RECONNECT_DELAY_S = 5.0
+IDLE_RENEW_S = 29 * 60  # RFC 2177: re-issue IDLE before the server's 30-minute cutoff
+
+
+def _connect(account: dict) -> imaplib.IMAP4_SSL:
+    conn = imaplib.IMAP4_SSL(account["server"], account["port"])
+    conn.login(account["email"], account["password"])
+    conn.select(account["mailbox"])
+    return conn
+
+
+def _search_criterion(account: dict) -> str:
+    """The SEARCH for new mail: the account's `search_criterion`, else UNSEEN (SINCE `since`)."""
+    if account.get("search_criterion"):
+        return account["search_criterion"]
+    since = account.get("since")
+    if not since:
+        return "UNSEEN"
+    try:
+        since = date.fromisoformat(since).strftime("%d-%b-%Y")
+    except ValueError:
+        pass  # already dd-Mmm-YYYY, or a typo the server will reject
+    return f'(UNSEEN SINCE "{since}")'
+
+
+def _supports_idle(conn: imaplib.IMAP4_SSL) -> bool:
+    _, caps = conn.capability()
+    return bool(caps and caps[0]) and b"IDLE" in caps[0].upper().split()
+
+
+def _read_line(conn: imaplib.IMAP4_SSL) -> bytes:
+    line = conn.readline()
+    if not line:
+        raise imaplib.IMAP4.abort("socket error: EOF")
+    return line
+
+
+def _idle(conn: imaplib.IMAP4_SSL) -> bool:
+    """Block in IMAP IDLE until the server reports new mail or IDLE_RENEW_S passes."""
+    tag = conn._new_tag().decode()
+    conn.send(f"{tag} IDLE\r\n".encode())
+    _read_line(conn)  # "+ idling"
+    # select() rather than a socket timeout: a timed-out socket file can't be read again.
+    ready = conn.sock.pending() or select.select([conn.sock], [], [], IDLE_RENEW_S)[0]
+    lines = [_read_line(conn)] if ready else []
+    conn.send(b"DONE\r\n")
+    # Anything untagged up to "<tag> OK" is part of this IDLE.
+    while not (lines and lines[-1].startswith(tag.encode())):
+        lines.append(_read_line(conn))
+    return any(b"EXISTS" in line for line in lines)
+
+
+def _deliver_unseen(
+    conn: imaplib.IMAP4_SSL,
+    account: dict,
+    on_email: Callable[[CapturedContent], None],
+    email_filter: Callable[[EmailMessage], bool] | None,
+) -> None:
+    """Hand every new email to *on_email*, then mark it seen.
+
+    Rejected emails stay unseen. An email that fails to parse or save is
+    logged and left unseen for the next pass; a connection error ends
+    the pass.
+    """
+    from amperstand_core.email_parser import extract_from_message, parse_raw_to_message
+
+    _, ids = conn.search(None, _search_criterion(account))
+    for uid in ids[0].split() if ids and ids[0] else []:
+        try:
+            _, data = conn.fetch(uid, "(RFC822)")
+            if not (data and data[0] and isinstance(data[0], tuple)):
+                continue
+            msg = parse_raw_to_message(data[0][1])
+            if email_filter is not None and not email_filter(msg):
+                continue
+            on_email(extract_from_message(msg))
+            conn.store(uid, "+FLAGS", "\\Seen")
+        except (imaplib.IMAP4.abort, OSError):
+            raise
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to process UID %s: %s", uid, exc)
+
+
+def watch_account(
+    account: dict,
+    on_email: Callable[[CapturedContent], None],
+    *,
+    poll_interval: int = 30,
+    email_filter: Callable[[EmailMessage], bool] | None = None,
+    on_connect: Callable[[], None] | None = None,
+    on_disconnect: Callable[[Exception], None] | None = None,
+) -> None:
+    """Watch one mailbox forever: IMAP IDLE where supported, polling otherwise.
+
+    Every connection starts with a pass over the unseen mail, so nothing
+    that arrived while disconnected is missed. A dropped connection (an
+    IMAP or socket error) is reported to *on_disconnect* and retried
+    after `RECONNECT_DELAY_S`. The first connect must succeed — bad
+    credentials should fail loudly, not retry forever — but once the
+    account has worked, failing to reconnect counts as one more dropped
+    connection. Anything else propagates.
+    """
+    conn: imaplib.IMAP4_SSL | None = _connect(account)
+    while True:
+        try:
+            if conn is None:
+                conn = _connect(account)
+            if on_connect is not None:
+                on_connect()
+            idle = _supports_idle(conn)
+            while True:
+                _deliver_unseen(conn, account, on_email, email_filter)
+                if idle:
+                    while not _idle(conn):
+                        pass
+                else:
+                    time.sleep(poll_interval)
+                    conn.noop()
+        except (imaplib.IMAP4.error, OSError) as exc:
+            if on_disconnect is not None:
+                on_disconnect(exc)
+            time.sleep(RECONNECT_DELAY_S)
+        finally:
+            if conn is not None:
+                try:
+                    conn.logout()
+                except Exception:  # noqa: BLE001
+                    pass
+            conn = None
+
+
+class WatchMetrics:
+    """The metrics `email watch` exports, labelled by account where it makes sense."""
+
+    def __init__(
+        self,
+        registry: Registry,
+        *,
+        queue_depth: Callable[[], float | None] | None = None,
+    ) -> None:
+        account = ("account",)
+        self.seen = registry.counter(
+            "amperstand_email_seen_total",
+            "Emails the sender filter examined (rejected emails stay unseen and are re-examined).",
+            account,
+        )
+        self.filtered = registry.counter(
+            "amperstand_email_filtered_total", "Emails the sender filter rejected.", account
+        )
+        self.duplicates = registry.counter(
+            "amperstand_email_duplicates_total", "Emails skipped as already captured.", account
+        )
+        self.captured = registry.counter(
+            "amperstand_email_captured_total",
+            "Emails saved to the vault or parked in the outbox.",
+            account,
+        )
+        self.failed = registry.counter(
+            "amperstand_email_failed_total", "Emails whose save failed outright.", account
+        )
+        self.connects = registry.counter(
+            "amperstand_imap_connects_total", "IMAP connections opened.", account
+        )
+        self.reconnects = registry.counter(
+            "amperstand_imap_reconnects_total", "IMAP connections lost and retried.", account
+        )
+        self.connected = registry.gauge(
+            "amperstand_imap_connected", "1 while the account holds an IMAP connection.", account
+        )
+        self.last_email = registry.gauge(
+            "amperstand_email_last_seen_timestamp_seconds",
+            "Unix time the account last handed an email to the sender filter.",
+            account,
+        )
+        self.backend_latency = registry.histogram(
+            "amperstand_backend_write_seconds", "Time to save one email through the vault backend."
+        )
+        self.state_latency = registry.histogram(
+            "amperstand_state_write_seconds", "Time to record one capture in state.db."
+        )
+        if queue_depth is not None:
+            registry.gauge(
+                "amperstand_outbox_depth",
+                "Documents waiting in the outbox for another write attempt.",
+                callback=queue_depth,
+            )
+
+    def add_account(self, label: str) -> None:
+        """Export zeroes for *label* up front, so rate() and absence alerts work from the start."""
+        for counter in (
+            self.seen, self.filtered, self.duplicates, self.captured,
+            self.failed, self.connects, self.reconnects,
+        ):
+            counter.inc(label, amount=0)
+        self.connected.set(0, label)
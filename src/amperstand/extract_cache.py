@@ -0,0 +1,192 @@
+"""On-disk cache of extracted content, keyed by normalized URL.
+
+Extraction is the expensive step of every capture — trafilatura, a
+possible Playwright launch, yt-dlp transcript downloads. When a capture is
+retried after a backend failure, or the same URL turns up in several
+feeds, we'd rather not pay for it twice. `ExtractCache` keeps each
+`CapturedContent` in `~/.amperstand/extract_cache.db` (a throwaway SQLite
+file, separate from state.db) with a TTL and a total-size cap; the least
+recently used entries are evicted first once the cap is exceeded.
+"""
+
+from __future__ import annotations
+
+import json
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from amperstand_core.models import CapturedContent, ContentType
+
+from amperstand.config import as_bool, get_section
+from amperstand.state import DEFAULT_STATE_DIR
+from amperstand.urls import canonicalize
+
+CACHE_FILE = "extract_cache.db"
+# Bump on any schema change: the cache is disposable, so an old file is
+# dropped and refilled rather than migrated.
+CACHE_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extract_cache (
+    key          TEXT PRIMARY KEY,
+    url          TEXT NOT NULL,
+    payload      TEXT NOT NULL,
+    size         INTEGER NOT NULL,
+    created_at   REAL NOT NULL,
+    accessed_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS extract_cache_accessed ON extract_cache (accessed_at);
+"""
+
+
+def cache_key(url: str) -> str:
+    """Cache lookups share the captured-URL index's canonical key."""
+    return canonicalize(url)
+
+
+def _to_payload(content: CapturedContent) -> dict:
+    return {
+        "url": content.url,
+        "title": content.title,
+        "content_markdown": content.content_markdown,
+        "content_type": content.content_type.value,
+        "author": content.author,
+        "sender_email": content.sender_email,
+        "captured_at": content.captured_at.isoformat(),
+        "tags": list(content.tags),
+    }
+
+
+def _from_payload(data: dict) -> CapturedContent:
+    return CapturedContent(
+        url=data["url"],
+        title=data["title"],
+        content_markdown=data["content_markdown"],
+        content_type=ContentType(data["content_type"]),
+        author=data.get("author"),
+        sender_email=data.get("sender_email"),
+        captured_at=datetime.fromisoformat(data["captured_at"]),
+        tags=list(data.get("tags") or []),
+    )
+
+
+class ExtractCache:
+    """TTL + size-bounded LRU cache of `CapturedContent`, safe to share across threads."""
+
+    def __init__(
+        self,
+        state_dir: Path = DEFAULT_STATE_DIR,
+        *,
+        ttl: float = 7 * 24 * 3600,
+        max_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        self._ttl = ttl
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            state_dir / CACHE_FILE,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            self._conn.execute("DROP TABLE IF EXISTS extract_cache")
+            self._conn.execute(f"PRAGMA user_version = {CACHE_VERSION}")
+        self._conn.executescript(_SCHEMA)
+
+    def get(self, url: str) -> CapturedContent | None:
+        """Return the cached content for *url*, or None if missing or expired."""
+        key = cache_key(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created_at FROM extract_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            payload, created_at = row
+            if now - created_at > self._ttl:
+                self._conn.execute("DELETE FROM extract_cache WHERE key = ?", (key,))
+                return None
+            self._conn.execute(
+                "UPDATE extract_cache SET accessed_at = ? WHERE key = ?", (now, key)
+            )
+        return _from_payload(json.loads(payload))
+
+    def put(self, content: CapturedContent, url: str | None = None) -> None:
+        """Cache *content* under *url* (defaults to `content.url`), then evict."""
+        payload = json.dumps(_to_payload(content), ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO extract_cache "
+                "(key, url, payload, size, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET url = excluded.url, payload = excluded.payload, "
+                "size = excluded.size, created_at = excluded.created_at, "
+                "accessed_at = excluded.accessed_at",
+                (
+                    cache_key(url or content.url),
+                    content.url,
+                    payload,
+                    len(payload.encode("utf-8")),
+                    now,
+                    now,
+                ),
+            )
+            self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        # Caller holds self._lock.
+        self._conn.execute(
+            "DELETE FROM extract_cache WHERE created_at < ?", (now - self._ttl,)
+        )
+        total = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM extract_cache"
+        ).fetchone()[0]
+        if total <= self._max_bytes:
+            return
+        rows = self._conn.execute(
+            "SELECT key, size FROM extract_cache ORDER BY accessed_at"
+        ).fetchall()
+        doomed = []
+        for key, size in rows:
+            if total <= self._max_bytes:
+                break
+            doomed.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM extract_cache WHERE key = ?", doomed)
+
+    def stats(self) -> dict:
+        """Return `{"entries": n, "bytes": total}`."""
+        with self._lock:
+            entries, total = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extract_cache"
+            ).fetchone()
+        return {"entries": entries, "bytes": total}
+
+    def clear(self) -> int:
+        """Drop every entry. Returns how many were removed."""
+        with self._lock:
+            return self._conn.execute("DELETE FROM extract_cache").rowcount
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_extract_cache(state_dir: Path = DEFAULT_STATE_DIR) -> ExtractCache | None:
+    """Build the cache from the `extract_cache` config section (None if disabled)."""
+    cfg = get_section("extract_cache", state_dir)
+    if not as_bool(cfg.get("enabled", True)):
+        return None
+    return ExtractCache(
+        state_dir,
+        ttl=float(cfg["ttl_hours"]) * 3600,
+        max_bytes=int(float(cfg["max_mb"]) * 1024 * 1024),
+    )
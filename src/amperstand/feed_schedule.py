@@ -0,0 +1,89 @@
+"""Adaptive per-feed polling for `feed sync --due-only`.
+
+Subscriptions post at wildly different rates — a news wire every few
+minutes, a personal blog twice a year — so polling all of them on one
+timer either hammers the cold feeds or misses the hot ones. After every
+poll we record the publish timestamps of the feed's newest entries in
+`AppState`, estimate its cadence as the median gap between consecutive
+posts, and plan the next poll for half a cadence later (so a post waits at
+most ~half its feed's usual gap to be picked up). A poll that finds
+nothing new stretches the interval by half again, so feeds that went
+quiet — or that keep failing — drift towards the maximum instead of being
+retried on every run. Intervals stay within `[min_interval, max_interval]`.
+"""
+
+from __future__ import annotations
+
+import statistics
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+from amperstand.config import get_section
+from amperstand.state import DEFAULT_STATE_DIR
+
+HISTORY = 20  # publish timestamps kept per feed
+DEFAULT_INTERVAL = 3600.0  # until a feed has at least two dated entries
+BACKOFF = 1.5
+
+
+@dataclass
+class FeedSchedule:
+    """When a feed was last polled, when it's next due, and what it's seen."""
+
+    interval: float
+    last_checked: float
+    next_due: float
+    recent: list[float] = field(default_factory=list)  # newest first
+
+    @property
+    def cadence(self) -> float | None:
+        """Median seconds between posts, or None with fewer than two dated entries."""
+        if len(self.recent) < 2:
+            return None
+        gaps = [a - b for a, b in zip(self.recent, self.recent[1:]) if a > b]
+        return statistics.median(gaps) if gaps else None
+
+
+def _timestamp(published: datetime) -> float:
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.timestamp()
+
+
+def plan_next_poll(
+    previous: FeedSchedule | None,
+    published: Iterable[datetime | None],
+    *,
+    now: float,
+    min_interval: float,
+    max_interval: float,
+) -> FeedSchedule:
+    """Fold one poll's entry dates into *previous* and schedule the next poll.
+
+    *published* is empty when the feed was unchanged (304) or the poll failed.
+    """
+    old = previous.recent if previous else []
+    # Skip future-dated entries (bad clocks, scheduled posts): clamped to now
+    # they would look newer than everything on every poll. A scheduled post
+    # is picked up by the first poll after its date.
+    stamps = (_timestamp(p) for p in published if p is not None)
+    fresh = {t for t in stamps if t <= now}
+    recent = sorted(set(old) | fresh, reverse=True)[:HISTORY]
+    found_new = bool(recent) and (not old or recent[0] > old[0])
+
+    schedule = FeedSchedule(interval=0.0, last_checked=now, next_due=now, recent=recent)
+    cadence = schedule.cadence
+    interval = cadence / 2 if cadence else DEFAULT_INTERVAL
+    if previous and not found_new:
+        interval = max(interval, previous.interval * BACKOFF)
+    schedule.interval = min(max(interval, min_interval), max_interval)
+    schedule.next_due = now + schedule.interval
+    return schedule
+
+
+def schedule_limits(state_dir: Path = DEFAULT_STATE_DIR) -> tuple[float, float]:
+    """`(min_interval, max_interval)` in seconds from the `feed_schedule` config section."""
+    cfg = get_section("feed_schedule", state_dir)
+    return float(cfg["min_minutes"]) * 60, float(cfg["max_hours"]) * 3600
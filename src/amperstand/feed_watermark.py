@@ -0,0 +1,85 @@
+"""Per-feed high-water marks so `feed sync` only looks at new entries.
+
+Feeds keep years of entries, and without a watermark every sync runs a
+dedup lookup for each of them. After each pass we record the newest
+publish time below which every entry is known to be handled (captured
+now or earlier); the next pass drops entries older than that before any
+dedup work, so its cost follows the number of new entries rather than
+the feed's length.
+
+The mark only moves past entries that were actually handled: a failed
+capture, or one cut off by `--limit`, caps it at that entry's publish
+time so it's retried next run. Entries published *at* the mark are
+still checked against the captured index (several posts can share a
+timestamp). Feeds without any entry dates fall back to the canonical
+URL of the newest entry and stop scanning when they reach it. An entry
+that shows up later with a date below the mark is missed; `feed sync
+--force` ignores the marks and rescans everything.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Iterable, Sequence
+
+from amperstand.urls import canonicalize
+
+
+@dataclass
+class Watermark:
+    published: float | None = None  # epoch seconds
+    entry_key: str | None = None  # canonical URL of the newest entry, for undated feeds
+
+
+def _ts(published: datetime) -> float:
+    if published.tzinfo is None:
+        published = published.replace(tzinfo=timezone.utc)
+    return published.timestamp()
+
+
+def entries_after(entries: Sequence, mark: Watermark | None) -> tuple[list, int]:
+    """Split *entries* at *mark*. Returns `(entries to check, count skipped)`."""
+    if mark is None or not entries:
+        return list(entries), 0
+    if any(entry.published for entry in entries):
+        if mark.published is None:
+            return list(entries), 0
+        fresh = [
+            entry for entry in entries
+            if entry.published is None or _ts(entry.published) >= mark.published
+        ]
+        return fresh, len(entries) - len(fresh)
+    if mark.entry_key:
+        for i, entry in enumerate(entries):
+            if canonicalize(entry.url) == mark.entry_key:
+                return list(entries[:i]), len(entries) - i
+    return list(entries), 0
+
+
+def advance(
+    previous: Watermark | None,
+    scanned: Sequence,
+    unhandled: Iterable,
+) -> Watermark:
+    """The new mark after a pass over *scanned*, given the entries it didn't handle."""
+    previous = previous or Watermark()
+    unhandled = list(unhandled)
+    pending = {canonicalize(entry.url) for entry in unhandled}
+    ceiling = min(
+        (_ts(entry.published) for entry in unhandled if entry.published),
+        default=float("inf"),
+    )
+    handled = [
+        _ts(entry.published) for entry in scanned
+        if entry.published and canonicalize(entry.url) not in pending
+        and _ts(entry.published) < ceiling
+    ]
+    published = max([*handled, previous.published or float("-inf")])
+    entry_key = previous.entry_key
+    if scanned and not pending:
+        entry_key = canonicalize(scanned[0].url)
+    return Watermark(
+        published=None if published == float("-inf") else published,
+        entry_key=entry_key,
+    )
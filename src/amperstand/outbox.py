@@ -0,0 +1,283 @@
+"""Durable outbox for documents the vault backend failed to accept.
+
+A capture is two expensive halves: fetching and extracting the content,
+then writing it to the backend. When only the write fails — the server is
+restarting, the network blipped — throwing the document away means the
+next run has to fetch and extract it all over again. Instead the converted
+`(body, frontmatter)` pair is parked in `~/.amperstand/outbox.db` and
+retried with exponential backoff, either by `amperstand outbox flush` or
+automatically the next time a command writes to the backend.
+
+A parked document counts as captured: callers get a stand-in doc back
+(`queued_doc`) and mark the URL as done, so feeds and batches don't
+re-extract it while it waits. Entries that keep failing past
+`max_attempts` are dead: they are kept (and listed) but no longer retried
+automatically.
+
+Several processes may drain the same outbox (`email watch` alongside a
+`capture` run, say), so `drain` first claims the rows it is about to send
+in one `BEGIN IMMEDIATE` transaction, leasing them for `lease` seconds.
+Another drainer skips leased rows, and a crashed one's lease simply
+expires.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any
+
+from amperstand.config import as_bool, get_section
+from amperstand.state import DEFAULT_STATE_DIR
+
+if TYPE_CHECKING:
+    from amperstand.backend_bridge import BackendSession
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_FILE = "outbox.db"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    body            TEXT NOT NULL,
+    frontmatter     TEXT NOT NULL,
+    attempts        INTEGER NOT NULL DEFAULT 1,
+    next_attempt_at REAL NOT NULL,
+    error           TEXT,
+    created_at      REAL NOT NULL,
+    leased_until    REAL NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (next_attempt_at);
+"""
+
+
+@dataclass
+class OutboxEntry:
+    id: int
+    body: str
+    frontmatter: dict[str, Any]
+    attempts: int
+    next_attempt_at: float
+    error: str | None
+    created_at: float
+
+    @property
+    def title(self) -> str:
+        return self.frontmatter.get("title") or self.frontmatter.get("source") or f"#{self.id}"
+
+
+def queued_doc(entry_id: int, frontmatter: dict[str, Any], error: Exception) -> dict[str, Any]:
+    """Stand-in for `backend.create()`'s result when a document was parked instead."""
+    return {
+        "id": None,
+        "title": frontmatter.get("title"),
+        "outbox_id": entry_id,
+        "error": str(error),
+    }
+
+
+class Outbox:
+    """SQLite-backed retry queue of `(body, frontmatter)` documents; thread-safe."""
+
+    def __init__(
+        self,
+        state_dir: Path = DEFAULT_STATE_DIR,
+        *,
+        backoff: float = 60.0,
+        max_backoff: float = 6 * 3600.0,
+        max_attempts: int = 12,
+        lease: float = 600.0,
+    ) -> None:
+        self._backoff = backoff
+        self._max_backoff = max_backoff
+        self._max_attempts = max(1, max_attempts)
+        self._lease = lease
+        self._lock = threading.Lock()
+        state_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(
+            state_dir / OUTBOX_FILE,
+            timeout=30.0,
+            isolation_level=None,
+            check_same_thread=False,
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # The whole point is surviving a crash, so pay for a full sync.
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+
+    def _delay(self, attempts: int) -> float:
+        return min(self._backoff * 2 ** (attempts - 1), self._max_backoff)
+
+    def put(self, body: str, frontmatter: dict[str, Any], error: Exception | str) -> int:
+        """Park a document after its first failed write. Returns the entry id."""
+        now = time.time()
+        with self._lock:
+            cur = self._conn.execute(
+                "INSERT INTO outbox (body, frontmatter, attempts, next_attempt_at, error, created_at) "
+                "VALUES (?, ?, 1, ?, ?, ?)",
+                (
+                    body,
+                    json.dumps(frontmatter, ensure_ascii=False),
+                    now + self._delay(1),
+                    str(error),
+                    now,
+                ),
+            )
+            return cur.lastrowid
+
+    def entries(self, *, due_only: bool = False, limit: int | None = None) -> list[OutboxEntry]:
+        """Parked documents, oldest first. `due_only` skips those still backing off or dead."""
+        sql = (
+            "SELECT id, body, frontmatter, attempts, next_attempt_at, error, created_at FROM outbox"
+        )
+        params: list[Any] = []
+        if due_only:
+            sql += " WHERE next_attempt_at <= ? AND attempts < ?"
+            params += [time.time(), self._max_attempts]
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            OutboxEntry(i, body, json.loads(fm), attempts, due, error, created)
+            for i, body, fm, attempts, due, error, created in rows
+        ]
+
+    def delivered(self, entry_id: int) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM outbox WHERE id = ?", (entry_id,))
+
+    def failed(self, entry_id: int, error: Exception | str) -> bool:
+        """Record another failed attempt and push the next one back.
+
+        Releases the entry's lease. Returns True if the entry is now dead.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts FROM outbox WHERE id = ?", (entry_id,)
+            ).fetchone()
+            if row is None:
+                return False
+            attempts = row[0] + 1
+            self._conn.execute(
+                "UPDATE outbox SET attempts = ?, next_attempt_at = ?, error = ?, leased_until = 0 "
+                "WHERE id = ?",
+                (attempts, time.time() + self._delay(attempts), str(error), entry_id),
+            )
+        return attempts >= self._max_attempts
+
+    def is_dead(self, entry: OutboxEntry) -> bool:
+        return entry.attempts >= self._max_attempts
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def dead_count(self) -> int:
+        """Entries past `max_attempts`, which only `drain(force=True)` retries."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM outbox WHERE attempts >= ?", (self._max_attempts,)
+            ).fetchone()[0]
+
+    def claim(self, *, force: bool = False, limit: int | None = None) -> list[OutboxEntry]:
+        """Lease the entries to send next, so no other drainer sends them too.
+
+        Selecting and leasing happen in one `BEGIN IMMEDIATE` transaction,
+        which holds the database's write lock, so two processes can never
+        claim the same row. Entries already leased are skipped even with
+        *force*; otherwise *force* claims everything, like `entries()`
+        without `due_only`.
+        """
+        now = time.time()
+        sql = (
+            "SELECT id, body, frontmatter, attempts, next_attempt_at, error, created_at "
+            "FROM outbox WHERE leased_until <= ?"
+        )
+        params: list[Any] = [now]
+        if not force:
+            sql += " AND next_attempt_at <= ? AND attempts < ?"
+            params += [now, self._max_attempts]
+        sql += " ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+                self._conn.executemany(
+                    "UPDATE outbox SET leased_until = ? WHERE id = ?",
+                    [(now + self._lease, row[0]) for row in rows],
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                raise
+        return [
+            OutboxEntry(i, body, json.loads(fm), attempts, due, error, created)
+            for i, body, fm, attempts, due, error, created in rows
+        ]
+
+    def drain(
+        self,
+        session: BackendSession,
+        *,
+        force: bool = False,
+        limit: int | None = None,
+        concurrency: int = 4,
+    ) -> tuple[int, int]:
+        """Retry parked documents. Returns `(delivered, still_failing)`.
+
+        Only entries whose backoff has expired are tried unless *force*,
+        which retries everything — including entries past `max_attempts`.
+        Entries another process has claimed are left to it. An entry that
+        fails for the last time is logged as dead.
+        """
+        from amperstand.backend_bridge import create_many
+
+        entries = self.claim(force=force, limit=limit)
+        if not entries:
+            return 0, 0
+        results = create_many(
+            session,
+            [(entry.body, entry.frontmatter) for entry in entries],
+            concurrency=concurrency,
+        )
+        sent = 0
+        for entry, res in zip(entries, results):
+            if isinstance(res, Exception):
+                if self.failed(entry.id, res) and not self.is_dead(entry):
+                    logger.warning(
+                        "outbox: giving up on #%d %s after %d attempts: %s",
+                        entry.id, entry.title, entry.attempts + 1, res,
+                    )
+            else:
+                self.delivered(entry.id)
+                sent += 1
+        return sent, len(entries) - sent
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+def open_outbox(state_dir: Path = DEFAULT_STATE_DIR) -> Outbox | None:
+    """Build the outbox from the `outbox` config section (None if disabled)."""
+    cfg = get_section("outbox", state_dir)
+    if not as_bool(cfg.get("enabled", True)):
+        return None
+    return Outbox(
+        state_dir,
+        backoff=float(cfg["backoff_s"]),
+        max_backoff=float(cfg["max_backoff_s"]),
+        max_attempts=int(cfg["max_attempts"]),
+    )
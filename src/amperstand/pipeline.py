@@ -0,0 +1,169 @@
+"""A small asyncio pipeline of concurrent stages joined by bounded queues.
+
+Capture work is a chain of very different steps: network-bound fetches,
+CPU-bound extraction, cheap conversion, and network-bound uploads. Run in
+sequence, each item waits for the previous item's upload before its own
+fetch starts. `Pipeline` runs every stage at once instead: each stage has
+its own worker count and thread pool, and the bounded queue in front of it
+applies backpressure so a fast stage can't buffer the whole run in memory.
+
+Stage functions are plain callables (run in the stage's thread pool) or
+coroutine functions (awaited on the loop). A stage returns the item to pass
+downstream, or None to drop it; a `fan_out` stage returns an iterable and
+each element continues separately. An exception drops that item and is
+reported to `on_error` — one bad item never stops the run.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import inspect
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One step of a pipeline: `concurrency` workers applying `func`."""
+
+    name: str
+    func: Callable[[Any], Any]
+    concurrency: int = 1
+    fan_out: bool = False
+
+
+@dataclass
+class StageStats:
+    """What a stage did during one run."""
+
+    processed: int = 0
+    dropped: int = 0
+    failed: int = 0
+    busy_seconds: float = 0.0
+    max_queue: int = 0
+
+
+class Pipeline:
+    """Run items through `stages` concurrently. See the module docstring."""
+
+    def __init__(
+        self,
+        stages: list[Stage],
+        *,
+        queue_size: int = 64,
+        on_error: Callable[[str, Any, Exception], None] | None = None,
+    ) -> None:
+        if not stages:
+            raise ValueError("a pipeline needs at least one stage")
+        self._stages = stages
+        self._queue_size = queue_size
+        self._on_error = on_error
+
+    def run(self, source: Iterable[Any] | AsyncIterable[Any]) -> dict[str, StageStats]:
+        """Drive *source* through the pipeline from synchronous code."""
+        return asyncio.run(self.run_async(source))
+
+    async def run_async(
+        self, source: Iterable[Any] | AsyncIterable[Any]
+    ) -> dict[str, StageStats]:
+        """Drive *source* through the pipeline; returns per-stage stats."""
+        loop = asyncio.get_running_loop()
+        stages = self._stages
+        queues = [asyncio.Queue(maxsize=self._queue_size) for _ in stages]
+        stats = {stage.name: StageStats() for stage in stages}
+        executors = [
+            ThreadPoolExecutor(max_workers=stage.concurrency, thread_name_prefix=f"pipeline-{stage.name}")
+            for stage in stages
+        ]
+        # Pulling from a blocking iterator (an IMAP fetch, a file) gets its
+        # own thread so it never stalls the loop or a stage's workers.
+        source_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pipeline-source")
+
+        async def put(index: int, item: Any) -> None:
+            await queues[index].put(item)
+            st = stats[stages[index].name]
+            st.max_queue = max(st.max_queue, queues[index].qsize())
+
+        async def close(index: int) -> None:
+            for _ in range(stages[index].concurrency):
+                await queues[index].put(_DONE)
+
+        async def feed() -> None:
+            try:
+                if hasattr(source, "__aiter__"):
+                    async for item in source:  # type: ignore[union-attr]
+                        await put(0, item)
+                else:
+                    iterator = iter(source)  # type: ignore[arg-type]
+                    while True:
+                        item = await loop.run_in_executor(source_executor, next, iterator, _DONE)
+                        if item is _DONE:
+                            break
+                        await put(0, item)
+            except Exception as exc:  # noqa: BLE001
+                self._report("source", None, exc)
+            finally:
+                await close(0)
+
+        async def call(index: int, item: Any) -> Any:
+            stage = stages[index]
+            if inspect.iscoroutinefunction(stage.func):
+                result = await stage.func(item)
+                return list(result) if stage.fan_out and result is not None else result
+            if stage.fan_out:
+                return await loop.run_in_executor(
+                    executors[index], lambda: list(stage.func(item) or ())
+                )
+            return await loop.run_in_executor(executors[index], stage.func, item)
+
+        async def worker(index: int) -> None:
+            st = stats[stages[index].name]
+            last = index + 1 == len(stages)
+            while True:
+                item = await queues[index].get()
+                if item is _DONE:
+                    return
+                started = time.perf_counter()
+                try:
+                    result = await call(index, item)
+                except Exception as exc:  # noqa: BLE001
+                    st.failed += 1
+                    self._report(stages[index].name, item, exc)
+                    continue
+                finally:
+                    st.busy_seconds += time.perf_counter() - started
+                st.processed += 1
+                outputs = result if stages[index].fan_out else [result]
+                for out in outputs:
+                    if out is None:
+                        st.dropped += 1
+                    elif not last:
+                        await put(index + 1, out)
+
+        async def run_stage(index: int) -> None:
+            await asyncio.gather(*(worker(index) for _ in range(stages[index].concurrency)))
+            if index + 1 < len(stages):
+                await close(index + 1)
+
+        try:
+            await asyncio.gather(feed(), *(run_stage(i) for i in range(len(stages))))
+        finally:
+            for executor in (*executors, source_executor):
+                executor.shutdown(wait=False)
+        return stats
+
+    def _report(self, stage: str, item: Any, exc: Exception) -> None:
+        if self._on_error is None:
+            logger.warning("pipeline stage %s failed on %r: %s", stage, item, exc)
+            return
+        try:
+            self._on_error(stage, item, exc)
+        except Exception:  # noqa: BLE001
+            logger.exception("pipeline on_error callback failed")
@@ -0,0 +1,144 @@
+"""Opt-in per-stage timing for `amperstand --profile`.
+
+The capture path is instrumented with named spans — `feed.fetch`,
+`feed.parse`, `fetch`, `extract`, `convert`, `backend.create`,
+`state.lookup`, `state.commit` — that cost one global lookup while
+profiling is off. With `--profile` every span records its wall time and
+the CPU time of the thread it ran on, so a slow run shows whether it was
+waiting (wall ≫ CPU: network, locks) or working (parsing, extraction).
+
+At exit the CLI prints one row per span name (count, total, mean and max
+wall time, CPU time), and with `--profile-trace out.json` also writes
+every span as a Chrome trace event; load the file in `chrome://tracing`
+or https://ui.perfetto.dev to see stages overlap thread by thread.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, ContextManager, Iterator
+
+_NOOP = nullcontext()
+
+
+@dataclass
+class SpanStats:
+    count: int = 0
+    wall: float = 0.0
+    cpu: float = 0.0
+    max_wall: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.wall / self.count if self.count else 0.0
+
+
+class Profiler:
+    """Collects spans from any thread."""
+
+    def __init__(self) -> None:
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        # (name, thread id, start offset, wall, cpu, args)
+        self._spans: list[tuple[str, int, float, float, float, dict[str, Any] | None]] = []
+        self._threads: dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, args: dict[str, Any] | None = None) -> Iterator[None]:
+        thread = threading.current_thread()
+        start, cpu_start = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            wall = time.perf_counter() - start
+            cpu = time.thread_time() - cpu_start
+            tid = thread.native_id or thread.ident or 0
+            with self._lock:
+                self._spans.append((name, tid, start - self._origin, wall, cpu, args))
+                self._threads.setdefault(tid, thread.name)
+
+    def stats(self) -> dict[str, SpanStats]:
+        """Per-name totals, slowest total wall time first."""
+        out: dict[str, SpanStats] = {}
+        with self._lock:
+            spans = list(self._spans)
+        for name, _, _, wall, cpu, _ in spans:
+            st = out.setdefault(name, SpanStats())
+            st.count += 1
+            st.wall += wall
+            st.cpu += cpu
+            st.max_wall = max(st.max_wall, wall)
+        return dict(sorted(out.items(), key=lambda kv: kv[1].wall, reverse=True))
+
+    def summary(self) -> list[str]:
+        """The summary table as lines of text."""
+        elapsed = time.perf_counter() - self._origin
+        lines = [
+            f"Profile ({elapsed:.2f}s wall; span times overlap across threads):",
+            f"  {'span':<16} {'count':>7} {'total s':>9} {'mean ms':>9} {'max ms':>9} {'cpu s':>8}",
+        ]
+        for name, st in self.stats().items():
+            lines.append(
+                f"  {name:<16} {st.count:>7} {st.wall:>9.2f} {st.mean * 1000:>9.1f} "
+                f"{st.max_wall * 1000:>9.1f} {st.cpu:>8.2f}"
+            )
+        if len(lines) == 2:
+            lines.append("  (no spans recorded)")
+        return lines
+
+    def write_trace(self, path: Path) -> None:
+        """Write every span as Chrome trace-event JSON ("X" complete events)."""
+        pid = os.getpid()
+        with self._lock:
+            spans = list(self._spans)
+            threads = dict(self._threads)
+        events: list[dict[str, Any]] = [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in threads.items()
+        ]
+        for name, tid, start, wall, cpu, args in spans:
+            events.append({
+                "name": name,
+                "cat": name.split(".", 1)[0],
+                "ph": "X",
+                "ts": round(start * 1e6, 3),
+                "dur": round(wall * 1e6, 3),
+                "pid": pid,
+                "tid": tid,
+                "args": {**(args or {}), "cpu_ms": round(cpu * 1000, 3)},
+            })
+        path.write_text(
+            json.dumps({"traceEvents": events, "displayTimeUnit": "ms"}), encoding="utf-8"
+        )
+
+
+_active: Profiler | None = None
+
+
+def start() -> Profiler:
+    """Start collecting spans process-wide."""
+    global _active
+    _active = Profiler()
+    return _active
+
+
+def stop() -> Profiler | None:
+    """Stop collecting; returns the profiler that was running."""
+    global _active
+    profiler, _active = _active, None
+    return profiler
+
+
+def span(name: str, **args: Any) -> ContextManager[None]:
+    """Time the enclosed block as *name* (a no-op unless profiling)."""
+    profiler = _active
+    if profiler is None:
+        return _NOOP
+    return profiler.span(name, args or None)
+
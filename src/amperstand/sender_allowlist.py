@@ -0,0 +1,54 @@
+"""Compiled form of the email sender allowlist.
+
+`email sync` and `email watch` check the sender of every incoming message
+against the allowlist, which can grow to thousands of addresses and
+`@domain` entries. Scanning the list per message makes that check linear
+in its size; `SenderAllowlist` compiles it once into a set of exact
+addresses and a set of domains, so a lookup costs one hash probe for the
+address plus one per label of the sender's domain.
+
+Domain entries also cover subdomains: `@substack.com` allows
+`news@news.substack.com` as well as `news@substack.com`. The domain index
+is keyed by reversed labels (`("com", "substack")`), and a sender matches
+if any prefix of its own reversed domain is in it.
+
+`AppState` keeps the compiled allowlist and rebuilds it only when the
+senders table changes.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+
+def _reversed_labels(domain: str) -> tuple[str, ...]:
+    return tuple(reversed(domain.strip(".").split(".")))
+
+
+class SenderAllowlist:
+    """Exact-address set plus reversed-domain suffix index."""
+
+    def __init__(self, entries: Iterable[str] = ()) -> None:
+        self._addresses: set[str] = set()
+        self._domains: set[tuple[str, ...]] = set()
+        for entry in entries:
+            entry = entry.strip().lower()
+            if entry.startswith("@"):
+                if entry[1:]:
+                    self._domains.add(_reversed_labels(entry[1:]))
+            elif entry:
+                self._addresses.add(entry)
+
+    def __len__(self) -> int:
+        return len(self._addresses) + len(self._domains)
+
+    def matches(self, sender: str) -> bool:
+        """True if *sender* is allowlisted by address, domain or parent domain."""
+        sender = sender.strip().lower()
+        if sender in self._addresses:
+            return True
+        _, at, domain = sender.rpartition("@")
+        if not at or not domain or not self._domains:
+            return False
+        labels = _reversed_labels(domain)
+        return any(labels[:n] in self._domains for n in range(1, len(labels) + 1))
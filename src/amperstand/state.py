@@ -1,121 +1,810 @@
-"""Persistent state for feed subscriptions and captured items."""
+"""Persistent state for feed subscriptions and captured items.
+
+State lives in a SQLite database (`state.db`) in WAL mode so several CLI
+processes — cron'd `feed sync`, a long-running `email watch`, an ad-hoc
+`capture` — can read and write it at the same time. Captured URLs are a
+primary-keyed table, so dedup checks are an index lookup and marking a URL
+is a single-row insert instead of a rewrite of the whole history.
+
+Dedup goes through a canonical-key index (`amperstand.urls.canonicalize`),
+so `utm_*`-tagged, AMP, `http://` and trailing-slash spellings of an
+already-captured URL all count as captured. Lookups go through a
+memory-mapped fingerprint index kept next to the database
+(`amperstand.captured_index`), so the common "not captured yet" answer
+doesn't touch SQLite at all.
+
+`AppState` is safe to share between threads. Each thread reads through its
+own connection, so lookups from many threads run concurrently under WAL.
+Writes from all threads funnel into one writer connection with group
+commit: whichever thread finds the writer idle commits every write queued
+so far in a single transaction, while the others wait for that commit
+instead of queuing for the database lock one by one. A write returns only
+once it's durable, so a thread always reads its own writes.
+
+Long runs can go further with `AppState.batch()`: inside it, the
+per-item bookkeeping writes (capture marks, feed validators, schedules
+and watermarks, batch progress) are buffered and committed together when
+the block exits, every `BATCH_LIMIT` statements, or on `flush()`. Any
+other write flushes the buffer first, in the same transaction, so writes
+still land in order. `is_captured` sees buffered marks straight away;
+other reads see buffered writes once they're flushed.
+
+Older installs kept everything in `state.json`. The first `AppState()` that
+finds that file imports it into the database and renames it to
+`state.json.migrated` so the import only ever runs once.
+"""
 
 from __future__ import annotations
 
 import json
+import sqlite3
+import threading
+import time
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
 from pathlib import Path
-from typing import Any
+from typing import TYPE_CHECKING, Any, Iterator
+
+from amperstand import profiling
+from amperstand.captured_index import CapturedIndex
+from amperstand.sender_allowlist import SenderAllowlist
+from amperstand.urls import CANONICAL_VERSION, canonicalize
+
+if TYPE_CHECKING:
+    from amperstand.feed_schedule import FeedSchedule
+    from amperstand.feed_watermark import Watermark
 
 DEFAULT_STATE_DIR = Path.home() / ".amperstand"
 STATE_FILE = "state.json"
+STATE_DB = "state.db"
+BATCH_LIMIT = 500  # buffered statements before `batch()` flushes on its own
+
+# Each entry upgrades the schema by one version; `PRAGMA user_version`
+# records how many have been applied. Append, never edit, so existing
+# databases upgrade in place.
+_MIGRATIONS: list[str] = [
+    """
+    CREATE TABLE feeds (
+        url   TEXT PRIMARY KEY,
+        name  TEXT NOT NULL,
+        tags  TEXT NOT NULL DEFAULT '[]',
+        added TEXT NOT NULL
+    );
+    CREATE TABLE captured (
+        url         TEXT PRIMARY KEY,
+        captured_at TEXT NOT NULL
+    );
+    CREATE TABLE senders (
+        sender TEXT PRIMARY KEY,
+        added  TEXT NOT NULL
+    );
+    CREATE TABLE settings (
+        key   TEXT PRIMARY KEY,
+        value TEXT NOT NULL
+    );
+    """,
+    # HTTP validators from the last fully-processed fetch of each feed.
+    """
+    CREATE TABLE feed_validators (
+        url           TEXT PRIMARY KEY,
+        etag          TEXT,
+        last_modified TEXT,
+        content_hash  TEXT,
+        checked_at    TEXT NOT NULL
+    );
+    """,
+    # Canonical dedup key (see amperstand.urls); filled in by `_rekey_captured`.
+    """
+    ALTER TABLE captured ADD COLUMN canonical TEXT;
+    CREATE INDEX captured_canonical ON captured (canonical);
+    """,
+    # Per-URL outcome of `capture --from-file` runs, so a resumed batch
+    # can report and optionally skip what failed last time.
+    """
+    CREATE TABLE batch_items (
+        batch      TEXT NOT NULL,
+        url        TEXT NOT NULL,
+        status     TEXT NOT NULL,
+        attempts   INTEGER NOT NULL DEFAULT 0,
+        error      TEXT,
+        updated_at TEXT NOT NULL,
+        PRIMARY KEY (batch, url)
+    );
+    """,
+    # Work queue of the capture daemon (`amperstand daemon run`).
+    """
+    CREATE TABLE jobs (
+        id              INTEGER PRIMARY KEY AUTOINCREMENT,
+        url             TEXT NOT NULL,
+        status          TEXT NOT NULL DEFAULT 'pending',
+        attempts        INTEGER NOT NULL DEFAULT 0,
+        next_attempt_at REAL NOT NULL,
+        error           TEXT,
+        created_at      TEXT NOT NULL,
+        updated_at      TEXT NOT NULL
+    );
+    CREATE INDEX jobs_due ON jobs (status, next_attempt_at);
+    """,
+    # Adaptive polling plan per feed (see amperstand.feed_schedule).
+    """
+    CREATE TABLE feed_schedule (
+        url          TEXT PRIMARY KEY,
+        recent       TEXT NOT NULL DEFAULT '[]',
+        interval     REAL NOT NULL,
+        last_checked REAL NOT NULL,
+        next_due     REAL NOT NULL
+    );
+    """,
+    # Newest fully-handled entry per feed (see amperstand.feed_watermark).
+    """
+    CREATE TABLE feed_watermarks (
+        url        TEXT PRIMARY KEY,
+        published  REAL,
+        entry_key  TEXT,
+        updated_at TEXT NOT NULL
+    );
+    """,
+]
+SCHEMA_VERSION = len(_MIGRATIONS)
 
 
 def _now_iso() -> str:
     return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
 
 
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open the state database with the pragmas every connection needs.
+
+    `isolation_level=None` puts the connection in autocommit mode: single
+    statements commit immediately and multi-statement writes use an
+    explicit BEGIN IMMEDIATE so they take the write lock up front instead
+    of failing halfway with SQLITE_BUSY.
+    """
+    conn = sqlite3.connect(
+        db_path,
+        timeout=30.0,
+        isolation_level=None,
+        check_same_thread=False,
+    )
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("PRAGMA busy_timeout=30000")
+    return conn
+
+
+class _Reader:
+    """A thread's read connection, closed when the thread's locals are freed.
+
+    sqlite3 connections can't be weakly referenced; this holder can.
+    """
+
+    __slots__ = ("conn", "__weakref__")
+
+    def __init__(self, conn: sqlite3.Connection) -> None:
+        self.conn = conn
+        weakref.finalize(self, conn.close)
+
+
+@dataclass
+class _Write:
+    """One caller's statements, waiting for a group commit."""
+
+    statements: list[tuple[str, tuple]]
+    results: list[sqlite3.Cursor] = field(default_factory=list)
+    error: BaseException | None = None
+    done: bool = False
+
+
 class AppState:
-    """Manages feed subscriptions and capture history."""
+    """Manages feed subscriptions and capture history. Thread-safe."""
 
     def __init__(self, state_dir: Path = DEFAULT_STATE_DIR) -> None:
         self._state_dir = state_dir
         self._state_file = state_dir / STATE_FILE
-        self._data = self._load()
+        self._db_path = state_dir / STATE_DB
+        self._state_dir.mkdir(parents=True, exist_ok=True)
+        # The writer connection; only used under _write_lock once __init__ is done.
+        self._conn = _connect(self._db_path)
+        self._write_lock = threading.Lock()
+        self._commit_cond = threading.Condition()
+        self._pending: list[_Write] = []
+        self._committing = False
+        self._local = threading.local()
+        # Live per-thread readers, so close() can reach them. A reader dies
+        # with its thread's locals, and its finalizer closes the connection.
+        self._readers: weakref.WeakSet[_Reader] = weakref.WeakSet()
+        self._readers_lock = threading.Lock()
+        # Write buffer while a batch() is open, the canonical keys of the
+        # capture marks in it, and those keys plus any still committing.
+        self._batch: list[tuple[str, tuple]] | None = None
+        self._batch_depth = 0
+        self._buffer_keys: set[str] = set()
+        self._batch_keys: set[str] = set()
+        self._batch_lock = threading.Lock()
+        self._captured: CapturedIndex | None = None  # opened on first is_captured
+        self._captured_lock = threading.Lock()
+        # (senders_rev, compiled allowlist); see is_sender_allowed.
+        self._allowlist: tuple[Any, SenderAllowlist] | None = None
+        self._migrate_schema()
+        self._import_legacy_json()
+        self._rekey_captured()
 
-    def _load(self) -> dict[str, Any]:
-        if self._state_file.exists():
-            return json.loads(self._state_file.read_text(encoding="utf-8"))
-        return {"feeds": {}, "captured": []}
+    # --- Storage ---
 
-    def _save(self) -> None:
-        self._state_dir.mkdir(parents=True, exist_ok=True)
-        self._state_file.write_text(
-            json.dumps(self._data, indent=2, ensure_ascii=False),
-            encoding="utf-8",
-        )
+    def _migrate_schema(self) -> None:
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Re-read under the write lock: another process may have just migrated.
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+            for script in _MIGRATIONS[version:]:
+                for statement in script.split(";"):
+                    if statement.strip():
+                        self._conn.execute(statement)
+            self._conn.execute(f"PRAGMA user_version={SCHEMA_VERSION}")
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _import_legacy_json(self) -> None:
+        """One-shot import of a pre-SQLite `state.json`.
+
+        Runs inside a write transaction and re-checks for the file once the
+        lock is held, so two processes starting at the same time rarely both
+        import (the loser usually finds the file already renamed). The file
+        is only renamed once the import has committed; if the commit fails
+        it stays put and the next run retries, and since every insert is
+        OR IGNORE a repeated import is harmless.
+        """
+        if not self._state_file.exists():
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if not self._state_file.exists():
+                self._conn.execute("ROLLBACK")
+                return
+            data = json.loads(self._state_file.read_text(encoding="utf-8"))
+            now = _now_iso()
+            for url, info in (data.get("feeds") or {}).items():
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO feeds (url, name, tags, added) VALUES (?, ?, ?, ?)",
+                    (
+                        url,
+                        info.get("name") or url,
+                        json.dumps(info.get("tags") or []),
+                        info.get("added") or now,
+                    ),
+                )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO captured (url, canonical, captured_at) VALUES (?, ?, ?)",
+                ((url, canonicalize(url), now) for url in data.get("captured") or []),
+            )
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO senders (sender, added) VALUES (?, ?)",
+                ((s, now) for s in data.get("email_senders") or []),
+            )
+            if data.get("vault"):
+                self._conn.execute(*_setting_statement("vault", data["vault"]))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            if self._conn.in_transaction:
+                self._conn.execute("ROLLBACK")
+            raise
+        try:
+            self._state_file.rename(self._state_file.with_name(STATE_FILE + ".migrated"))
+        except FileNotFoundError:
+            pass  # another process imported it and renamed it first
+
+    def _rekey_captured(self) -> None:
+        """Recompute every canonical key when the canonicalization rules change.
+
+        Runs once after the upgrade that added the column and again whenever
+        `CANONICAL_VERSION` is bumped; otherwise it's one settings lookup.
+        """
+        if self._get_setting("canonical_version") == CANONICAL_VERSION:
+            return
+        self._conn.execute("BEGIN IMMEDIATE")
+        try:
+            if self._get_setting("canonical_version") != CANONICAL_VERSION:
+                rows = self._conn.execute("SELECT url FROM captured").fetchall()
+                self._conn.executemany(
+                    "UPDATE captured SET canonical = ? WHERE url = ?",
+                    ((canonicalize(url), url) for (url,) in rows),
+                )
+                self._conn.execute(*_setting_statement("canonical_version", CANONICAL_VERSION))
+            self._conn.execute("COMMIT")
+        except BaseException:
+            self._conn.execute("ROLLBACK")
+            raise
+
+    def _read(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run a query on this thread's own connection."""
+        reader = getattr(self._local, "reader", None)
+        if reader is None:
+            reader = _Reader(_connect(self._db_path))
+            self._local.reader = reader
+            with self._readers_lock:
+                self._readers.add(reader)
+        return reader.conn.execute(sql, params)
+
+    def _write(self, sql: str, params: tuple = ()) -> sqlite3.Cursor:
+        """Run one write statement; returns its cursor once committed."""
+        return self._write_many([(sql, params)])[0]
+
+    def _write_many(self, statements: list[tuple[str, tuple]]) -> list[sqlite3.Cursor]:
+        """Run *statements* atomically, after anything buffered by `batch()`."""
+        with self._batch_lock:
+            buffered, keys = self._take_batch()
+        return self._commit_buffered(buffered, keys, statements)
+
+    def _defer(self, statements: list[tuple[str, tuple]], *, captured: str | None = None) -> None:
+        """Buffer *statements* if a batch is open, else write them now.
+
+        *captured* is the canonical key of a capture mark among them, so
+        `is_captured` can answer for it before the flush.
+        """
+        keys = set() if captured is None else {captured}
+        with self._batch_lock:
+            if self._batch is None:
+                full = None
+            else:
+                self._batch.extend(statements)
+                if captured is not None:
+                    self._buffer_keys.add(captured)
+                    self._batch_keys.add(captured)
+                full = len(self._batch) >= BATCH_LIMIT
+        if full is None:
+            self._commit_buffered([], keys, statements)
+        elif full:
+            self.flush()
+
+    def _take_batch(self) -> tuple[list[tuple[str, tuple]], set[str]]:
+        """Caller holds _batch_lock."""
+        if not self._batch:
+            return [], set()
+        buffered, self._batch = self._batch, []
+        keys, self._buffer_keys = self._buffer_keys, set()
+        return buffered, keys
+
+    def _commit_buffered(
+        self,
+        buffered: list[tuple[str, tuple]],
+        keys: set[str],
+        statements: list[tuple[str, tuple]] = (),
+    ) -> list[sqlite3.Cursor]:
+        if not buffered and not statements:
+            return []
+        try:
+            results = self._group_commit([*buffered, *statements])
+            if keys:
+                # Under the lock is_captured opens the index with: an index
+                # loaded before this commit must not miss the keys.
+                with self._captured_lock:
+                    if self._captured is not None:
+                        self._captured.add(keys)
+        finally:
+            if keys:
+                with self._batch_lock:
+                    self._batch_keys -= keys
+        return results[len(buffered):]
+
+    @contextmanager
+    def batch(self) -> Iterator[AppState]:
+        """Buffer bookkeeping writes until the block exits; nests.
+
+        The buffer is flushed even when the block raises: the marks record
+        work that already happened (a saved document), and dropping them
+        would only make the next run redo it.
+        """
+        with self._batch_lock:
+            self._batch_depth += 1
+            if self._batch is None:
+                self._batch = []
+        try:
+            yield self
+        finally:
+            with self._batch_lock:
+                self._batch_depth -= 1
+                buffered, keys = [], set()
+                if self._batch_depth == 0:
+                    buffered, keys = self._take_batch()
+                    self._batch = None
+            self._commit_buffered(buffered, keys)
+
+    def flush(self) -> None:
+        """Commit whatever `batch()` has buffered so far."""
+        self._write_many([])
+
+    def _group_commit(self, statements: list[tuple[str, tuple]]) -> list[sqlite3.Cursor]:
+        """Run *statements* atomically as part of the next group commit."""
+        op = _Write(statements)
+        with self._commit_cond:
+            self._pending.append(op)
+            while not op.done and self._committing:
+                self._commit_cond.wait()
+            if not op.done:
+                # Writer is idle: lead a commit of everything queued so far.
+                self._committing = True
+                batch, self._pending = self._pending, []
+        if not op.done:
+            try:
+                self._commit(batch)
+            finally:
+                with self._commit_cond:
+                    self._committing = False
+                    self._commit_cond.notify_all()
+        if op.error is not None:
+            raise op.error
+        return op.results
+
+    def _commit(self, batch: list[_Write]) -> None:
+        """Apply *batch* in one transaction; each write gets its own savepoint."""
+        with self._write_lock, profiling.span("state.commit", writes=len(batch)):
+            try:
+                self._conn.execute("BEGIN IMMEDIATE")
+                for op in batch:
+                    self._conn.execute("SAVEPOINT write")
+                    try:
+                        op.results = [self._conn.execute(sql, params) for sql, params in op.statements]
+                    except sqlite3.Error as exc:
+                        self._conn.execute("ROLLBACK TO write")
+                        op.error = exc
+                    self._conn.execute("RELEASE write")
+                self._conn.execute("COMMIT")
+            except BaseException as exc:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+                for op in batch:
+                    op.error = op.error or exc
+            finally:
+                for op in batch:
+                    op.done = True
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive read-modify-write on the writer connection."""
+        with self._write_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _get_setting(self, key: str) -> Any:
+        row = self._read("SELECT value FROM settings WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def _set_setting(self, key: str, value: Any) -> None:
+        self._write(*_setting_statement(key, value))
+
+    def close(self) -> None:
+        """Flush buffered writes and close every connection. Safe to call more than once."""
+        with self._batch_lock:
+            buffered, keys = self._take_batch()
+        if buffered:
+            self._commit_buffered(buffered, keys)
+        with self._captured_lock:
+            if self._captured is not None:
+                self._captured.close()
+                self._captured = None
+        with self._write_lock:
+            self._conn.close()
+        with self._readers_lock:
+            for reader in list(self._readers):
+                reader.conn.close()
+            self._readers.clear()
 
     # --- Feed subscriptions ---
 
     def add_feed(self, url: str, name: str | None = None, tags: list[str] | None = None) -> None:
-        self._data["feeds"][url] = {
-            "name": name or url,
-            "tags": tags or [],
-            "added": _now_iso(),
-        }
-        self._save()
+        self._write(
+            "INSERT INTO feeds (url, name, tags, added) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET name = excluded.name, "
+            "tags = excluded.tags, added = excluded.added",
+            (url, name or url, json.dumps(tags or []), _now_iso()),
+        )
 
     def remove_feed(self, url: str) -> bool:
-        if url in self._data["feeds"]:
-            del self._data["feeds"][url]
-            self._save()
-            return True
-        return False
+        cur, *_ = self._write_many([
+            ("DELETE FROM feeds WHERE url = ?", (url,)),
+            ("DELETE FROM feed_validators WHERE url = ?", (url,)),
+            ("DELETE FROM feed_schedule WHERE url = ?", (url,)),
+            ("DELETE FROM feed_watermarks WHERE url = ?", (url,)),
+        ])
+        return cur.rowcount > 0
 
     def list_feeds(self) -> dict[str, dict]:
-        return dict(self._data["feeds"])
+        rows = self._read("SELECT url, name, tags, added FROM feeds ORDER BY rowid")
+        return {url: _feed_row(name, tags, added) for url, name, tags, added in rows}
 
     def get_feed(self, url: str) -> dict | None:
-        return self._data["feeds"].get(url)
+        row = self._read(
+            "SELECT name, tags, added FROM feeds WHERE url = ?", (url,)
+        ).fetchone()
+        return _feed_row(*row) if row else None
+
+    def get_feed_validators(self, url: str) -> dict | None:
+        """Return the stored ETag / Last-Modified / content hash for a feed."""
+        row = self._read(
+            "SELECT etag, last_modified, content_hash FROM feed_validators WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        etag, last_modified, content_hash = row
+        return {"etag": etag, "last_modified": last_modified, "content_hash": content_hash}
+
+    def set_feed_validators(
+        self,
+        url: str,
+        *,
+        etag: str | None = None,
+        last_modified: str | None = None,
+        content_hash: str | None = None,
+    ) -> None:
+        """Record validators once every entry of a fetched feed body is handled."""
+        self._defer([(
+            "INSERT INTO feed_validators (url, etag, last_modified, content_hash, checked_at) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET etag = excluded.etag, "
+            "last_modified = excluded.last_modified, "
+            "content_hash = excluded.content_hash, checked_at = excluded.checked_at",
+            (url, etag, last_modified, content_hash, _now_iso()),
+        )])
+
+    def get_feed_schedule(self, url: str) -> FeedSchedule | None:
+        """Return the feed's polling plan, or None if it was never polled."""
+        row = self._read(
+            "SELECT recent, interval, last_checked, next_due FROM feed_schedule WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return _schedule_row(*row) if row else None
+
+    def feed_schedules(self) -> dict[str, FeedSchedule]:
+        rows = self._read(
+            "SELECT url, recent, interval, last_checked, next_due FROM feed_schedule"
+        )
+        return {url: _schedule_row(*rest) for url, *rest in rows}
+
+    def set_feed_schedule(self, url: str, schedule: FeedSchedule) -> None:
+        self._defer([(
+            "INSERT INTO feed_schedule (url, recent, interval, last_checked, next_due) "
+            "VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET recent = excluded.recent, "
+            "interval = excluded.interval, last_checked = excluded.last_checked, "
+            "next_due = excluded.next_due",
+            (
+                url,
+                json.dumps(schedule.recent),
+                schedule.interval,
+                schedule.last_checked,
+                schedule.next_due,
+            ),
+        )])
+
+    def get_feed_watermark(self, url: str) -> Watermark | None:
+        row = self._read(
+            "SELECT published, entry_key FROM feed_watermarks WHERE url = ?", (url,)
+        ).fetchone()
+        if row is None:
+            return None
+        from amperstand.feed_watermark import Watermark
+
+        return Watermark(published=row[0], entry_key=row[1])
+
+    def set_feed_watermark(self, url: str, mark: Watermark) -> None:
+        self._defer([(
+            "INSERT INTO feed_watermarks (url, published, entry_key, updated_at) "
+            "VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(url) DO UPDATE SET published = excluded.published, "
+            "entry_key = excluded.entry_key, updated_at = excluded.updated_at",
+            (url, mark.published, mark.entry_key, _now_iso()),
+        )])
 
     # --- Capture tracking ---
 
     def is_captured(self, url: str) -> bool:
-        return url in self._data["captured"]
+        """True if *url*, or any spelling with the same canonical key, was captured."""
+        with profiling.span("state.lookup"):
+            key = canonicalize(url)
+            if key in self._batch_keys:
+                return True
+            if self._captured is None:
+                with self._captured_lock:
+                    if self._captured is None:
+                        self._captured = CapturedIndex(self._db_path, version=CANONICAL_VERSION)
+            return key in self._captured
 
     def mark_captured(self, url: str) -> None:
-        if url not in self._data["captured"]:
-            self._data["captured"].append(url)
-            self._save()
+        key = canonicalize(url)
+        self._defer([(
+            "INSERT OR IGNORE INTO captured (url, canonical, captured_at) VALUES (?, ?, ?)",
+            (url, key, _now_iso()),
+        )], captured=key)
 
     @property
     def captured_count(self) -> int:
-        return len(self._data["captured"])
+        return self._read("SELECT COUNT(*) FROM captured").fetchone()[0]
+
+    # --- Batch capture progress ---
+
+    def record_batch_item(self, batch: str, url: str, *, ok: bool, error: str | None = None) -> None:
+        """Record one URL's outcome in a `capture --from-file` batch."""
+        self._defer([(
+            "INSERT INTO batch_items (batch, url, status, attempts, error, updated_at) "
+            "VALUES (?, ?, ?, 1, ?, ?) "
+            "ON CONFLICT(batch, url) DO UPDATE SET status = excluded.status, "
+            "attempts = attempts + 1, error = excluded.error, updated_at = excluded.updated_at",
+            (batch, url, "done" if ok else "failed", error, _now_iso()),
+        )])
+
+    def batch_failures(self, batch: str) -> dict[str, int]:
+        """Return `{url: attempts}` for URLs that failed in *batch* and haven't succeeded since."""
+        rows = self._read(
+            "SELECT url, attempts FROM batch_items WHERE batch = ? AND status = 'failed'",
+            (batch,),
+        )
+        return dict(rows.fetchall())
+
+    # --- Daemon job queue ---
+
+    def enqueue_job(self, url: str) -> int:
+        """Queue *url* for the capture daemon. Returns the job id."""
+        now = _now_iso()
+        cur = self._write(
+            "INSERT INTO jobs (url, next_attempt_at, created_at, updated_at) VALUES (?, ?, ?, ?)",
+            (url, time.time(), now, now),
+        )
+        return cur.lastrowid
+
+    def claim_job(self) -> tuple[int, str, int] | None:
+        """Mark the oldest due pending job running; return `(id, url, attempts)`."""
+        with self._transaction() as conn:
+            row = conn.execute(
+                "SELECT id, url, attempts FROM jobs "
+                "WHERE status = 'pending' AND next_attempt_at <= ? "
+                "ORDER BY next_attempt_at, id LIMIT 1",
+                (time.time(),),
+            ).fetchone()
+            if row is not None:
+                conn.execute(
+                    "UPDATE jobs SET status = 'running', attempts = attempts + 1, "
+                    "updated_at = ? WHERE id = ?",
+                    (_now_iso(), row[0]),
+                )
+        if row is None:
+            return None
+        job_id, url, attempts = row
+        return job_id, url, attempts + 1
+
+    def next_job_due(self) -> float | None:
+        """Epoch time at which the next pending job becomes due, if any."""
+        row = self._read(
+            "SELECT MIN(next_attempt_at) FROM jobs WHERE status = 'pending'"
+        ).fetchone()
+        return row[0]
+
+    def finish_job(self, job_id: int) -> None:
+        self._write(
+            "UPDATE jobs SET status = 'done', error = NULL, updated_at = ? WHERE id = ?",
+            (_now_iso(), job_id),
+        )
+
+    def retry_job(self, job_id: int, error: str, *, delay: float | None) -> None:
+        """Put a failed job back in the queue after *delay* seconds, or fail it for good (None)."""
+        if delay is None:
+            self._write(
+                "UPDATE jobs SET status = 'failed', error = ?, updated_at = ? WHERE id = ?",
+                (error, _now_iso(), job_id),
+            )
+            return
+        self._write(
+            "UPDATE jobs SET status = 'pending', error = ?, next_attempt_at = ?, "
+            "updated_at = ? WHERE id = ?",
+            (error, time.time() + delay, _now_iso(), job_id),
+        )
+
+    def requeue_running_jobs(self) -> int:
+        """Return jobs left running by a daemon that died to the queue."""
+        return self._write(
+            "UPDATE jobs SET status = 'pending', updated_at = ? WHERE status = 'running'",
+            (_now_iso(),),
+        ).rowcount
+
+    def job_counts(self) -> dict[str, int]:
+        """Return `{status: count}` over the daemon queue."""
+        rows = self._read("SELECT status, COUNT(*) FROM jobs GROUP BY status")
+        return dict(rows.fetchall())
+
+    def failed_jobs(self, limit: int = 20) -> list[dict]:
+        """Most recently failed jobs, newest first."""
+        rows = self._read(
+            "SELECT id, url, attempts, error, updated_at FROM jobs WHERE status = 'failed' "
+            "ORDER BY updated_at DESC, id DESC LIMIT ?",
+            (limit,),
+        )
+        return [
+            {"id": i, "url": u, "attempts": a, "error": e, "updated_at": t}
+            for i, u, a, e, t in rows
+        ]
+
+    def prune_jobs(self, older_than_days: float = 7) -> int:
+        """Delete finished jobs last touched more than *older_than_days* ago."""
+        cutoff = datetime.fromtimestamp(
+            time.time() - older_than_days * 86400, timezone.utc
+        ).strftime("%Y-%m-%dT%H:%M:%SZ")
+        return self._write(
+            "DELETE FROM jobs WHERE status = 'done' AND updated_at < ?", (cutoff,)
+        ).rowcount
 
     # --- Vault config ---
 
     def set_vault(self, path: str, auto_sync: bool = False) -> None:
-        self._data["vault"] = {"path": path, "auto_sync": auto_sync}
-        self._save()
+        self._set_setting("vault", {"path": path, "auto_sync": auto_sync})
 
     def get_vault(self) -> dict | None:
-        return self._data.get("vault")
+        return self._get_setting("vault")
 
     def clear_vault(self) -> None:
-        self._data.pop("vault", None)
-        self._save()
+        self._write("DELETE FROM settings WHERE key = 'vault'")
 
     # --- Email sender allowlist ---
 
     def add_sender(self, sender: str) -> None:
         """Add an email address or @domain to the allowlist."""
-        senders = self._data.setdefault("email_senders", [])
-        if sender not in senders:
-            senders.append(sender)
-            self._save()
+        self._write_many([
+            ("INSERT OR IGNORE INTO senders (sender, added) VALUES (?, ?)", (sender, _now_iso())),
+            _setting_statement("senders_rev", time.time_ns()),
+        ])
 
     def remove_sender(self, sender: str) -> bool:
         """Remove a sender from the allowlist. Returns True if found."""
-        senders = self._data.get("email_senders", [])
-        if sender in senders:
-            senders.remove(sender)
-            self._save()
-            return True
-        return False
+        cur, _ = self._write_many([
+            ("DELETE FROM senders WHERE sender = ?", (sender,)),
+            _setting_statement("senders_rev", time.time_ns()),
+        ])
+        return cur.rowcount > 0
 
     def list_senders(self) -> list[str]:
         """Return the sender allowlist."""
-        return list(self._data.get("email_senders", []))
+        rows = self._read("SELECT sender FROM senders ORDER BY rowid")
+        return [sender for (sender,) in rows]
 
     def is_sender_allowed(self, sender: str) -> bool:
-        """Check if a sender matches the allowlist (full address or @domain)."""
-        senders = self._data.get("email_senders", [])
-        sender_lower = sender.lower()
-        for entry in senders:
-            entry_lower = entry.lower()
-            if entry_lower == sender_lower:
-                return True
-            # Domain match: entry is "@domain.com", check sender ends with it
-            if entry_lower.startswith("@") and sender_lower.endswith(entry_lower):
-                return True
-        return False
+        """Check if a sender matches the allowlist (full address, @domain or a subdomain).
+
+        The allowlist is compiled once and reused until `senders_rev`
+        changes, which `add_sender`/`remove_sender` bump in any process.
+        """
+        rev = self._get_setting("senders_rev")
+        cached = self._allowlist
+        if cached is None or cached[0] != rev:
+            cached = (rev, SenderAllowlist(self.list_senders()))
+            self._allowlist = cached
+        return cached[1].matches(sender)
+
+
+def _setting_statement(key: str, value: Any) -> tuple[str, tuple]:
+    return (
+        "INSERT INTO settings (key, value) VALUES (?, ?) "
+        "ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, json.dumps(value, ensure_ascii=False)),
+    )
+
+
+def _feed_row(name: str, tags: str, added: str) -> dict:
+    return {"name": name, "tags": json.loads(tags), "added": added}
+
+
+def _schedule_row(recent: str, interval: float, last_checked: float, next_due: float) -> FeedSchedule:
+    from amperstand.feed_schedule import FeedSchedule
+
+    return FeedSchedule(
+        interval=interval, last_checked=last_checked, next_due=next_due, recent=json.loads(recent)
+    )
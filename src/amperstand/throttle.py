@@ -0,0 +1,48 @@
+"""Per-host concurrency limits for parallel fetches.
+
+Parallel sync fans out across hundreds of URLs, but a lot of them live on
+the same few hosts (substack.com, medium.com, youtube.com). Without a cap a
+wide worker pool looks like a small flood to those hosts and gets us
+rate-limited or walled. `HostLimiter` hands out at most `per_host`
+concurrent slots per hostname; other hosts are unaffected.
+"""
+
+from __future__ import annotations
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+from urllib.parse import urlsplit
+
+
+def host_of(url: str) -> str:
+    """Return the lowercased hostname of *url* ('' if it has none)."""
+    return (urlsplit(url).hostname or "").lower()
+
+
+class HostLimiter:
+    """Hands out at most `per_host` concurrent slots per hostname."""
+
+    def __init__(self, per_host: int = 2) -> None:
+        if per_host < 1:
+            raise ValueError(f"per_host must be >= 1, got {per_host}")
+        self._per_host = per_host
+        self._lock = threading.Lock()
+        self._slots: dict[str, threading.BoundedSemaphore] = {}
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            sem = self._slots.get(host)
+            if sem is None:
+                sem = self._slots[host] = threading.BoundedSemaphore(self._per_host)
+            return sem
+
+    @contextmanager
+    def slot(self, url: str) -> Iterator[None]:
+        """Block until a slot for *url*'s host is free, hold it for the body."""
+        sem = self._semaphore(host_of(url))
+        sem.acquire()
+        try:
+            yield
+        finally:
+            sem.release()
@@ -0,0 +1,122 @@
+"""Canonical URL keys for dedup.
+
+The same article reaches us in many spellings: with `utm_*` campaign tags
+from a newsletter, with or without a trailing slash, over `http` and
+`https`, on `www.` or the bare domain, as an AMP page, or via a `youtu.be`
+short link. `canonicalize()` folds all of those onto one key so the
+captured-URL index treats them as a single item.
+
+The key is only for comparison — we always capture and store the URL as
+it was given. Bump `CANONICAL_VERSION` whenever the rules change so
+`AppState` re-keys its existing history.
+"""
+
+from __future__ import annotations
+
+import re
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+CANONICAL_VERSION = 3
+
+# Query parameters that only say where a click came from or ask for an AMP render.
+_NOISE_PARAMS = frozenset({
+    "fbclid", "gclid", "dclid", "msclkid", "yclid", "igshid", "twclid",
+    "mc_cid", "mc_eid", "_hsenc", "_hsmi", "mkt_tok", "oly_anon_id",
+    "oly_enc_id", "vero_id", "wt_mc", "ref_src", "ref_url", "cmpid",
+    "s_cid", "sr_share", "amp", "outputtype", "si",
+})
+_TRACKING_PREFIXES = ("utm_", "pk_", "hsa_", "mtm_")
+
+_AMP_CACHE_RE = re.compile(r"^[\w-]+\.cdn\.ampproject\.org$")
+_YOUTUBE_HOSTS = frozenset({"youtube.com", "m.youtube.com", "music.youtube.com"})
+
+
+def _is_tracking(key: str) -> bool:
+    k = key.lower()
+    return k in _NOISE_PARAMS or k.startswith(_TRACKING_PREFIXES)
+
+
+def _is_article_path(path: str) -> bool:
+    """True if *path* looks like an article: nested, or ending in a slug or id."""
+    segments = [seg for seg in path.split("/") if seg]
+    if len(segments) >= 2:
+        return True
+    return bool(segments) and any(c == "-" or c.isdigit() for c in segments[-1])
+
+
+def _strip_amp_path(path: str) -> str:
+    """Map AMP path variants back to the article path.
+
+    A bare `/amp` segment is only dropped around an article-looking path:
+    `/blog/my-post/amp` is an AMP render, `/tags/amp` is a page about AMP.
+    """
+    if path.startswith("/amp/") and _is_article_path(path[4:]):
+        path = path[4:]
+    for suffix in ("/amp/", "/amp"):
+        if path.endswith(suffix):
+            if _is_article_path(path[: -len(suffix)]):
+                path = path[: -len(suffix)]
+            break
+    if path.endswith(".amp.html"):
+        path = path[: -len(".amp.html")] + ".html"
+    elif path.endswith(".amp"):
+        path = path[: -len(".amp")]
+    return path
+
+
+def canonicalize(url: str) -> str:
+    """Return the dedup key for *url*.
+
+    Non-web URLs, and URLs too malformed to parse (`http://[bad/x`, a
+    non-numeric port), come back stripped but otherwise unchanged.
+    """
+    url = url.strip()
+    try:
+        return _canonicalize(url)
+    except ValueError:
+        return url
+
+
+def _canonicalize(url: str) -> str:
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in {"http", "https"} or not parts.hostname:
+        return url
+
+    host = parts.hostname.lower().rstrip(".")
+    path = parts.path or "/"
+    query = parts.query
+
+    # Google AMP cache: https://example-com.cdn.ampproject.org/c/s/example.com/a
+    if _AMP_CACHE_RE.match(host):
+        m = re.match(r"^/[cv]/(?:s/)?([^/]+)(/.*)?$", path)
+        if m:
+            host, path = m.group(1).lower(), m.group(2) or "/"
+
+    # Only when a registrable domain remains: amp.example.com is an AMP
+    # mirror, amp.dev is a site of its own.
+    for prefix in ("www.", "amp."):
+        if host.startswith(prefix) and host.count(".") >= 2:
+            host = host[len(prefix):]
+
+    params = [(k, v) for k, v in parse_qsl(query, keep_blank_values=True) if not _is_tracking(k)]
+
+    # YouTube: youtu.be/<id>, /shorts/<id>, /embed/<id> → watch?v=<id>, and
+    # drop the playback-position / playlist noise.
+    if host == "youtu.be" and len(path) > 1:
+        host, params, path = "youtube.com", [("v", path.strip("/").split("/")[0])], "/watch"
+    elif host in _YOUTUBE_HOSTS:
+        host = "youtube.com"
+        m = re.match(r"^/(?:shorts|embed|live)/([\w-]{11})", path)
+        if m:
+            path, params = "/watch", [("v", m.group(1))]
+        elif path == "/watch":
+            params = [(k, v) for k, v in params if k == "v"]
+
+    path = _strip_amp_path(path)
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+
+    port = parts.port
+    netloc = host if port in (None, 80, 443) else f"{host}:{port}"
+    return urlunsplit(("https", netloc, path, urlencode(sorted(params)), ""))
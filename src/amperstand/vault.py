@@ -1,15 +1,57 @@
-"""Git-backed vault operations for collaborative markdown storage."""
+"""Git-backed vault operations for collaborative markdown storage.
+
+A capture run can write thousands of files, so they aren't committed one
+by one: `VaultWriter` queues paths and commits them together once enough
+have piled up, after a delay, or when the command ends. Pushing and
+pulling go through `VaultSyncer`, which runs `sync()` on a background
+thread and folds requests that arrive mid-sync into a single follow-up
+run. Every git call has a timeout, so a hung remote can't wedge a command.
+
+Vaults grow to tens of thousands of notes, where the cost of git is
+mostly re-scanning the work tree. New vaults are tuned for that
+(`tune_vault`: untracked cache, the many-files index, and the fsmonitor
+daemon where git ships one), and read-side commands get everything they
+need from a single `git status --porcelain=v2 --branch` instead of a git
+process per question.
+"""
 
 from __future__ import annotations
 
+import functools
+import logging
+import re
 import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Iterable
+
+logger = logging.getLogger(__name__)
+
+GIT_TIMEOUT = 60.0  # seconds, for local git commands
+SYNC_TIMEOUT = 300.0  # seconds, for each network step of `sync()`
+_ADD_CHUNK = 200  # paths per `git add`, to stay well under ARG_MAX
+FSMONITOR_MIN_GIT = (2, 36)  # first release with the builtin fsmonitor daemon
+
+# One lock per vault: git commands that touch the index or HEAD must not
+# overlap (index.lock), so commits and syncs in one process take turns.
+_locks: dict[Path, threading.Lock] = {}
+_locks_guard = threading.Lock()
+
+
+def _vault_lock(vault_path: Path) -> threading.Lock:
+    key = Path(vault_path).resolve()
+    with _locks_guard:
+        return _locks.setdefault(key, threading.Lock())
 
 GITIGNORE_TEMPLATE = """\
 .DS_Store
 .obsidian/workspace.json
 .obsidian/workspace-mobile.json
 .obsidian/cache/
+.store/
 """
 
 
@@ -17,13 +59,19 @@ class VaultError(Exception):
     """Raised when a Git operation fails."""
 
 
-def _git(vault_path: Path, *args: str) -> subprocess.CompletedProcess:
+def _git(
+    vault_path: Path, *args: str, timeout: float | None = GIT_TIMEOUT
+) -> subprocess.CompletedProcess:
     """Run a git command inside the vault directory."""
-    result = subprocess.run(
-        ["git", "-C", str(vault_path), *args],
-        capture_output=True,
-        text=True,
-    )
+    try:
+        result = subprocess.run(
+            ["git", "-C", str(vault_path), *args],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired as exc:
+        raise VaultError(f"git {args[0]} timed out after {timeout:.0f}s") from exc
     if result.returncode != 0:
         raise VaultError(result.stderr.strip() or result.stdout.strip())
     return result
@@ -42,15 +90,44 @@ def init_vault(path: Path, remote: str | None = None) -> None:
 
     _git(path, "add", ".gitignore")
     _git(path, "commit", "-m", "Init vault")
+    tune_vault(path)
 
 
-def is_vault(path: Path) -> bool:
-    """Return True if *path* is inside a Git repository."""
+def tune_vault(vault_path: Path) -> None:
+    """Turn on git's caches for big work trees. Safe to run again.
+
+    `feature.manyFiles` switches to the compact v4 index and enables the
+    untracked cache, so `status` and `add` only re-read directories whose
+    mtime changed. The builtin fsmonitor daemon (macOS and Windows, git
+    2.36 and later) lets git skip the stat of every tracked file as well;
+    older gits would read `core.fsmonitor=true` as a hook to run.
+    """
+    _git(vault_path, "config", "feature.manyFiles", "true")
+    _git(vault_path, "config", "core.untrackedCache", "true")
+    if sys.platform in ("darwin", "win32") and git_version() >= FSMONITOR_MIN_GIT:
+        _git(vault_path, "config", "core.fsmonitor", "true")
+
+
+@functools.lru_cache(maxsize=None)
+def git_version() -> tuple[int, int]:
+    """`(major, minor)` of the installed git, or `(0, 0)` if it can't be read."""
     try:
-        _git(path, "rev-parse", "--git-dir")
-        return True
-    except (VaultError, FileNotFoundError):
-        return False
+        out = _git(Path.cwd(), "--version").stdout
+    except (VaultError, OSError):
+        return (0, 0)
+    match = re.search(r"(\d+)\.(\d+)", out)
+    return (int(match[1]), int(match[2])) if match else (0, 0)
+
+
+def is_vault(path: Path) -> bool:
+    """Return True if *path* is inside a Git repository.
+
+    Walks up from *path* looking for a `.git` entry (directory, or file
+    for worktrees and submodules) instead of asking git, since this runs
+    on every command that writes into a vault.
+    """
+    path = Path(path).expanduser().resolve()
+    return any((p / ".git").exists() for p in (path, *path.parents))
 
 
 def has_remote(vault_path: Path) -> bool:
@@ -59,24 +136,248 @@ def has_remote(vault_path: Path) -> bool:
     return bool(result.stdout.strip())
 
 
+@dataclass
+class VaultStatus:
+    branch: str | None  # None when HEAD is detached
+    upstream: str | None
+    ahead: int | None  # None without an upstream
+    behind: int | None
+    changed: int  # tracked files with staged or unstaged changes
+    untracked: int
+
+
+def read_status(vault_path: Path) -> VaultStatus:
+    """Branch, upstream and work-tree state from one `git status` call."""
+    out = _git(vault_path, "status", "--porcelain=v2", "--branch", "-z").stdout
+    status = VaultStatus(None, None, None, None, 0, 0)
+    records = iter(out.split("\0"))
+    for record in records:
+        if record.startswith("# branch.head "):
+            head = record[len("# branch.head "):]
+            status.branch = None if head == "(detached)" else head
+        elif record.startswith("# branch.upstream "):
+            status.upstream = record[len("# branch.upstream "):]
+        elif record.startswith("# branch.ab "):
+            ahead, behind = record[len("# branch.ab "):].split()
+            status.ahead, status.behind = int(ahead), abs(int(behind))
+        elif record.startswith(("1 ", "u ")):
+            status.changed += 1
+        elif record.startswith("2 "):
+            status.changed += 1
+            next(records, None)  # a rename's original path is its own field
+        elif record.startswith("? "):
+            status.untracked += 1
+    return status
+
+
 def commit_file(vault_path: Path, filepath: Path) -> None:
     """Stage and commit a single file inside the vault."""
-    relative = filepath.relative_to(vault_path)
-    _git(vault_path, "add", str(relative))
-    _git(vault_path, "commit", "-m", f"Add: {filepath.name}")
+    commit_files(vault_path, [filepath])
+
+
+def commit_files(vault_path: Path, filepaths: Iterable[Path]) -> bool:
+    """Stage and commit *filepaths* as one commit. Returns False if nothing changed."""
+    with _vault_lock(vault_path):
+        return _commit_files(vault_path, filepaths)
+
+
+def _commit_files(vault_path: Path, filepaths: Iterable[Path]) -> bool:
+    relative = sorted({str(Path(p).relative_to(vault_path)) for p in filepaths})
+    if not relative:
+        return False
+    for i in range(0, len(relative), _ADD_CHUNK):
+        _git(vault_path, "add", "--", *relative[i:i + _ADD_CHUNK])
+    names = [Path(p).name for p in relative]
+    if len(names) == 1:
+        message = f"Add: {names[0]}"
+    else:
+        message = f"Add {len(names)} files\n\n" + "\n".join(names)
+    try:
+        _git(vault_path, "commit", "-m", message)
+    except VaultError as exc:
+        if "nothing to commit" in str(exc) or "no changes added" in str(exc):
+            return False
+        raise
+    return True
 
 
-def sync(vault_path: Path) -> None:
+def sync(vault_path: Path, *, timeout: float | None = SYNC_TIMEOUT) -> None:
     """Pull (rebase) then push to the remote."""
+    with _vault_lock(vault_path):
+        _sync(vault_path, timeout)
+
+
+def _sync(vault_path: Path, timeout: float | None) -> None:
     result = _git(vault_path, "branch", "--show-current")
     branch = result.stdout.strip() or "main"
 
     try:
-        _git(vault_path, "pull", "--rebase", "origin", branch)
+        _git(vault_path, "pull", "--rebase", "--autostash", "origin", branch, timeout=timeout)
     except VaultError as exc:
         raise VaultError(
             f"Merge conflict during pull. Resolve manually in {vault_path} "
             "then run 'amperstand vault sync' again."
         ) from exc
 
-    _git(vault_path, "push", "origin", branch)
+    _git(vault_path, "push", "origin", branch, timeout=timeout)
+
+
+class VaultWriter:
+    """Queue files written into the vault and commit them in batches.
+
+    A batch is committed once `max_files` paths are queued, when its oldest
+    path has waited `max_delay` seconds (checked by a background thread;
+    `None` commits only on size and on `flush()` / `close()`), or on
+    `close()`. Size- and time-triggered commits don't wait while a sync
+    holds the vault — the paths stay queued and go in the next batch. A
+    failed commit is logged and its paths stay queued for the next
+    attempt. `on_commit` runs after every successful commit — the CLI uses
+    it to request a sync.
+    """
+
+    def __init__(
+        self,
+        vault_path: Path,
+        *,
+        max_files: int = 100,
+        max_delay: float | None = 30.0,
+        on_commit: Callable[[], Any] | None = None,
+    ) -> None:
+        self._vault_path = vault_path
+        self._max_files = max(1, max_files)
+        self._max_delay = max_delay
+        self._on_commit = on_commit
+        self._cond = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._queue: list[Path] = []
+        self._oldest: float | None = None
+        self._closed = False
+        self.commits = 0
+        self._timer: threading.Thread | None = None
+        if max_delay is not None:
+            self._timer = threading.Thread(target=self._run_timer, name="vault-commit", daemon=True)
+            self._timer.start()
+
+    def add(self, filepath: Path) -> None:
+        with self._cond:
+            self._queue.append(Path(filepath))
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify()
+            full = len(self._queue) >= self._max_files
+        if full:
+            self.flush(wait=False)
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def flush(self, *, wait: bool = True) -> bool:
+        """Commit everything queued now. Returns False if nothing could be committed.
+
+        With `wait=False`, gives up straight away if the vault is busy.
+        """
+        lock = _vault_lock(self._vault_path)
+        with self._flush_lock:
+            if not lock.acquire(blocking=wait):
+                with self._cond:
+                    self._oldest = time.monotonic()  # try again a full delay from now
+                return False
+            try:
+                with self._cond:
+                    batch, self._queue = self._queue, []
+                    self._oldest = None
+                if not batch:
+                    return True
+                try:
+                    committed = _commit_files(self._vault_path, batch)
+                except VaultError as exc:
+                    logger.warning("vault commit of %d file(s) failed: %s", len(batch), exc)
+                    with self._cond:
+                        self._queue[:0] = batch
+                        self._oldest = time.monotonic()
+                    return False
+            finally:
+                lock.release()
+        if committed:
+            self.commits += 1
+            if self._on_commit is not None:
+                self._on_commit()
+        return True
+
+    def _run_timer(self) -> None:
+        while True:
+            with self._cond:
+                while not self._closed and self._oldest is None:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                remaining = self._oldest + self._max_delay - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+            self.flush(wait=False)
+
+    def close(self) -> bool:
+        """Commit what's left and stop the timer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if self._timer is not None:
+            self._timer.join()
+        return self.flush()
+
+    def __enter__(self) -> VaultWriter:
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class VaultSyncer:
+    """Run `sync()` on a background thread, coalescing overlapping requests.
+
+    `request()` returns immediately. If a sync is already running, the
+    request is folded into one more run after it (however many arrive),
+    since that run will push everything committed by then anyway.
+    """
+
+    def __init__(self, vault_path: Path, *, timeout: float | None = SYNC_TIMEOUT) -> None:
+        self._vault_path = vault_path
+        self._timeout = timeout
+        self._cond = threading.Condition()
+        self._running = False
+        self._again = False
+        self.runs = 0
+        self.last_error: VaultError | None = None
+
+    def request(self) -> None:
+        with self._cond:
+            if self._running:
+                self._again = True
+                return
+            self._running = True
+        threading.Thread(target=self._run, name="vault-sync", daemon=True).start()
+
+    def _run(self) -> None:
+        while True:
+            try:
+                sync(self._vault_path, timeout=self._timeout)
+                error = None
+            except VaultError as exc:
+                logger.warning("vault sync failed: %s", exc)
+                error = exc
+            with self._cond:
+                self.runs += 1
+                self.last_error = error
+                if not self._again:
+                    self._running = False
+                    self._cond.notify_all()
+                    return
+                self._again = False
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """Block until no sync is running or queued. False if *timeout* ran out."""
+        with self._cond:
+            return self._cond.wait_for(lambda: not self._running, timeout)
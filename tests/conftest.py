@@ -0,0 +1,25 @@
+"""Point HOME at a throwaway directory before amperstand is imported.
+
+Modules bind `~/.amperstand` as a default argument at import time, so a
+fixture would be too late to redirect it.
+"""
+
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import pytest
+
+_HOME = tempfile.mkdtemp(prefix="amperstand-home-")
+os.environ["HOME"] = _HOME
+
+
+@pytest.fixture
+def state_home():
+    """An empty `~/.amperstand` for tests that go through the CLI."""
+    state_dir = Path(_HOME) / ".amperstand"
+    shutil.rmtree(state_dir, ignore_errors=True)
+    state_dir.mkdir()
+    yield state_dir
+    shutil.rmtree(state_dir, ignore_errors=True)
@@ -0,0 +1,163 @@
+import threading
+import time
+
+import amperstand_core.backend
+import pytest
+from amperstand_core.models import CapturedContent
+
+from amperstand import backend_bridge
+from amperstand.backend_bridge import BackendSession, BatchWriter, create_many
+from amperstand.outbox import Outbox
+
+
+class FakeBackend:
+    """Records creates; titles starting with "bad" fail."""
+
+    def __init__(self, delay: float = 0.0) -> None:
+        self.delay = delay
+        self.created: list[str] = []
+        self.active = self.peak = 0
+        self.closed = False
+        self._lock = threading.Lock()
+
+    def create(self, body, frontmatter):
+        with self._lock:
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+        try:
+            time.sleep(self.delay)
+            if frontmatter["title"].startswith("bad"):
+                raise RuntimeError(f"rejected {frontmatter['title']}")
+            with self._lock:
+                self.created.append(frontmatter["title"])
+            return {"id": frontmatter["title"], "title": frontmatter["title"]}
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = FakeBackend()
+    monkeypatch.setattr(backend_bridge, "get_backend", lambda: backend)
+    return backend
+
+
+@pytest.fixture
+def session(backend):
+    session = BackendSession()
+    yield session
+    session.close()
+
+
+def doc(title: str, body: str = "body\n") -> tuple[str, dict]:
+    return body, {"title": title}
+
+
+def test_create_many_keeps_order_and_isolates_failures(session):
+    results = create_many(session, [doc("a"), doc("bad-b"), doc("c")])
+    assert results[0]["id"] == "a"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2]["id"] == "c"
+
+
+def test_create_many_fans_out_only_on_a_concurrent_session(session, backend, monkeypatch):
+    backend.delay = 0.02
+    create_many(session, [doc(str(i)) for i in range(8)], concurrency=4)
+    assert backend.peak == 1  # not an HTTPBackend: writes are serialized
+
+    # An HTTPBackend's pooled client takes concurrent requests.
+    monkeypatch.setattr(amperstand_core.backend, "HTTPBackend", FakeBackend)
+    backend.peak = 0
+    http = BackendSession()
+    results = create_many(http, [doc(str(i)) for i in range(8)], concurrency=4)
+    assert [r["id"] for r in results] == [str(i) for i in range(8)]
+    assert backend.peak == 4
+    http.close()
+
+
+def test_session_notifies_listeners_and_closes_the_backend(session, backend):
+    seen = []
+    session.subscribe(seen.append)
+    session.create(*doc("a"))
+    assert seen == [{"id": "a", "title": "a"}]
+    session.close()
+    assert backend.closed
+
+
+def test_session_without_a_backend_raises(monkeypatch):
+    from amperstand_core.backend import BackendError
+
+    monkeypatch.setattr(backend_bridge, "get_backend", lambda: None)
+    with pytest.raises(BackendError):
+        BackendSession().create(*doc("a"))
+
+
+def test_flushes_when_max_items_is_reached(session, backend):
+    results = []
+    writer = BatchWriter(session, results.append, max_items=3, max_delay=None)
+    for title in "ab":
+        writer.add_doc(*doc(title), item=title)
+    assert backend.created == []
+    writer.add_doc(*doc("c"), item="c")
+    assert backend.created == ["a", "b", "c"]
+    assert [r.item for r in results] == ["a", "b", "c"]
+    writer.close()
+
+
+def test_flushes_when_max_bytes_is_reached(session, backend):
+    writer = BatchWriter(session, lambda r: None, max_bytes=10, max_delay=None)
+    writer.add_doc(*doc("a", "12345"))
+    assert backend.created == []
+    writer.add_doc(*doc("b", "67890"))
+    assert backend.created == ["a", "b"]
+    writer.close()
+
+
+def test_flushes_after_max_delay(session, backend):
+    done = threading.Event()
+    writer = BatchWriter(session, lambda r: done.set(), max_delay=0.05)
+    writer.add_doc(*doc("a"))
+    assert done.wait(2)
+    assert backend.created == ["a"]
+    writer.close()
+
+
+def test_close_flushes_the_rest(session, backend):
+    with BatchWriter(session, lambda r: None, max_delay=None) as writer:
+        writer.add(CapturedContent(url="https://example.com/a", title="a", content_markdown="x"))
+        assert backend.created == []
+    assert backend.created == ["a"]
+
+
+def test_failed_writes_are_reported_or_parked(session, tmp_path):
+    results = []
+    with BatchWriter(session, results.append, max_delay=None) as writer:
+        writer.add_doc(*doc("bad-a"), item="a")
+    assert not results[0].ok
+    assert "rejected" in str(results[0].error)
+
+    outbox = Outbox(tmp_path)
+    results.clear()
+    with BatchWriter(session, results.append, max_delay=None, outbox=outbox) as writer:
+        writer.add_doc(*doc("bad-b"), item="b")
+    assert results[0].ok and results[0].queued
+    assert outbox.count() == 1
+    outbox.close()
+
+
+def test_a_raising_callback_does_not_lose_the_batch(session, backend):
+    calls = []
+
+    def on_result(result):
+        calls.append(result.item)
+        raise RuntimeError("callback bug")
+
+    with BatchWriter(session, on_result, max_delay=None) as writer:
+        for title in "abc":
+            writer.add_doc(*doc(title), item=title)
+    assert calls == ["a", "b", "c"]
+    assert backend.created == ["a", "b", "c"]
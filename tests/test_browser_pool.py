@@ -0,0 +1,192 @@
+import asyncio
+import threading
+
+import pytest
+
+from amperstand import browser_pool
+from amperstand.browser_pool import BrowserPool, BrowserPoolError
+
+
+class FakePage:
+    def __init__(self, browser):
+        self.browser = browser
+        self.url = None
+        self.closed = False
+
+    def set_default_timeout(self, ms):
+        pass
+
+    async def goto(self, url, **kwargs):
+        self.browser.active += 1
+        self.browser.peak = max(self.browser.peak, self.browser.active)
+        try:
+            await asyncio.sleep(self.browser.delay)
+            if "hang" in url:
+                # Playwright bounds navigation by the timeout it was given.
+                await asyncio.wait_for(asyncio.sleep(3600), kwargs["timeout"] / 1000)
+            if "boom" in url:
+                raise RuntimeError("net::ERR_FAILED")
+            self.url = url
+        finally:
+            self.browser.active -= 1
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def content(self):
+        return f"<html>{self.url}</html>"
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages = []
+        self.closed = False
+
+    async def new_page(self):
+        page = FakePage(self.browser)
+        self.pages.append(page)
+        return page
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowser:
+    def __init__(self, delay):
+        self.delay = delay
+        self.contexts = []
+        self.connected = True
+        self.closed = False
+        self.active = 0
+        self.peak = 0
+
+    def is_connected(self):
+        return self.connected
+
+    async def new_context(self):
+        ctx = FakeContext(self)
+        self.contexts.append(ctx)
+        return ctx
+
+    async def close(self):
+        self.closed = True
+
+
+class FakePlaywright:
+    stopped = False
+
+    async def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def browsers(monkeypatch):
+    launched = []
+
+    async def launch():
+        browser = FakeBrowser(delay=0.02)
+        launched.append(browser)
+        return FakePlaywright(), browser
+
+    monkeypatch.setattr(browser_pool, "_launch_browser", launch)
+    return launched
+
+
+def test_nothing_launches_until_the_first_fetch(browsers):
+    with BrowserPool(2) as pool:
+        assert browsers == []
+    assert pool.launches == 0
+
+
+def test_fetch_returns_the_rendered_html(browsers):
+    with BrowserPool(2, settle_ms=0) as pool:
+        assert pool.fetch("https://a.example/1") == "<html>https://a.example/1</html>"
+        assert pool.fetch("https://a.example/2") == "<html>https://a.example/2</html>"
+    assert (pool.launches, pool.fetches) == (1, 2)
+    # Sequential fetches reuse the first context.
+    assert len(browsers[0].contexts) == 1
+    assert browsers[0].closed
+
+
+def test_concurrent_fetches_share_one_browser_up_to_the_context_limit(browsers):
+    urls = [f"https://a.example/{i}" for i in range(12)]
+    results = {}
+
+    with BrowserPool(3, settle_ms=0) as pool:
+        def worker(url):
+            results[url] = pool.fetch(url)
+
+        threads = [threading.Thread(target=worker, args=(u,)) for u in urls]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    assert results == {u: f"<html>{u}</html>" for u in urls}
+    assert len(browsers) == 1
+    assert len(browsers[0].contexts) == 3
+    assert browsers[0].peak == 3
+    assert all(ctx.closed for ctx in browsers[0].contexts)
+
+
+def test_page_is_replaced_after_page_uses(browsers):
+    with BrowserPool(1, page_uses=2, settle_ms=0) as pool:
+        for i in range(5):
+            pool.fetch(f"https://a.example/{i}")
+    pages = browsers[0].contexts[0].pages
+    assert len(pages) == 3
+    assert [p.closed for p in pages] == [True, True, True]
+
+
+def test_failed_page_is_discarded_and_the_context_kept(browsers):
+    with BrowserPool(1, settle_ms=0) as pool:
+        with pytest.raises(RuntimeError, match="ERR_FAILED"):
+            pool.fetch("https://a.example/boom")
+        assert pool.fetch("https://a.example/ok") == "<html>https://a.example/ok</html>"
+    ctx = browsers[0].contexts[0]
+    assert len(browsers[0].contexts) == 1
+    assert ctx.pages[0].closed
+
+
+def test_dead_browser_is_relaunched(browsers):
+    with BrowserPool(1, settle_ms=0) as pool:
+        pool.fetch("https://a.example/1")
+        browsers[0].connected = False
+        assert pool.fetch("https://a.example/2") == "<html>https://a.example/2</html>"
+    assert pool.launches == 2
+    assert len(browsers[1].contexts) == 1
+
+
+def test_hung_page_times_out_without_blocking_the_pool(browsers):
+    with BrowserPool(1, page_timeout=0.1, settle_ms=0) as pool:
+        with pytest.raises(asyncio.TimeoutError):
+            pool.fetch("https://a.example/hang")
+        assert pool.fetch("https://a.example/ok") == "<html>https://a.example/ok</html>"
+    assert browsers[0].contexts[0].pages[0].closed
+
+
+def test_closed_pool_refuses_fetches(browsers):
+    pool = BrowserPool(1)
+    pool.close()
+    pool.close()
+    with pytest.raises(BrowserPoolError, match="closed"):
+        pool.fetch("https://a.example/1")
+
+
+def test_needs_at_least_one_context():
+    with pytest.raises(ValueError):
+        BrowserPool(0)
+
+
+def test_open_browser_pool_reads_config(tmp_path):
+    from amperstand.config import set_value
+
+    set_value("browser.contexts", "6", tmp_path)
+    pool = browser_pool.open_browser_pool(tmp_path)
+    assert pool.contexts == 6
+    set_value("browser.pool", "false", tmp_path)
+    assert browser_pool.open_browser_pool(tmp_path) is None
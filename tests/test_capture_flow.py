@@ -0,0 +1,178 @@
+import httpx
+import pytest
+from amperstand_core.models import CapturedContent
+
+from amperstand import capture_flow
+from amperstand.backend_bridge import BatchWriter
+from amperstand.capture_flow import (
+    CaptureJob,
+    capture_stages,
+    extract_html,
+    extract_job,
+    fetch_html,
+    fetch_job,
+)
+from amperstand.pipeline import Pipeline
+
+PAGE = "<html><body>" + "article text " * 40 + "</body></html>"
+URL = "https://example.com/post"
+
+
+@pytest.fixture(autouse=True)
+def no_trafilatura_fetch(monkeypatch):
+    import trafilatura
+
+    monkeypatch.setattr(trafilatura, "fetch_url", lambda url: None)
+
+
+@pytest.fixture
+def no_proxy(monkeypatch):
+    monkeypatch.delenv("AMPERSTAND_HTTP_PROXY", raising=False)
+    monkeypatch.delenv("AMPERSTAND_YOUTUBE_PROXY", raising=False)
+
+
+@pytest.fixture
+def proxy(monkeypatch):
+    monkeypatch.setenv("AMPERSTAND_HTTP_PROXY", "http://proxy.test:3128")
+
+
+class FakeBrowser:
+    def __init__(self, html: str = PAGE) -> None:
+        self.html = html
+        self.urls: list[str] = []
+
+    def fetch(self, url: str) -> str:
+        self.urls.append(url)
+        return self.html
+
+
+def article(url: str, text: str) -> CapturedContent:
+    return CapturedContent(url=url, title="Post", content_markdown=text)
+
+
+def test_fetch_html_returns_a_direct_page(httpx_mock, no_proxy):
+    httpx_mock.add_response(url=URL, text=PAGE)
+    browser = FakeBrowser()
+    assert fetch_html(URL, browser=browser) == PAGE
+    assert browser.urls == []
+
+
+def test_fetch_html_falls_back_to_the_proxy(httpx_mock, proxy):
+    httpx_mock.add_response(url=URL, status_code=403)
+    httpx_mock.add_response(url=URL, text=PAGE)
+    assert fetch_html(URL, browser=FakeBrowser()) == PAGE
+    assert len(httpx_mock.get_requests()) == 2
+
+
+def test_fetch_html_renders_thin_pages_in_the_browser(httpx_mock, no_proxy):
+    httpx_mock.add_response(url=URL, text="<html>Loading…</html>")
+    browser = FakeBrowser()
+    assert fetch_html(URL, browser=browser) == PAGE
+    assert browser.urls == [URL]
+
+
+def test_fetch_job_serves_cached_content_without_fetching(tmp_path, monkeypatch):
+    from amperstand.extract_cache import ExtractCache
+
+    cache = ExtractCache(tmp_path)
+    cache.put(article(URL, "cached"), URL)
+    monkeypatch.setattr(capture_flow, "fetch_html", pytest.fail)
+    job = fetch_job(CaptureJob(URL), cache=cache)
+    assert job.cached and job.content.content_markdown == "cached"
+    cache.close()
+
+
+def test_refresh_job_skips_the_cache(tmp_path, monkeypatch):
+    from amperstand.extract_cache import ExtractCache
+
+    cache = ExtractCache(tmp_path)
+    cache.put(article(URL, "cached"), URL)
+    monkeypatch.setattr(capture_flow, "fetch_html", lambda url, **_: PAGE)
+    job = fetch_job(CaptureJob(URL, refresh=True), cache=cache)
+    assert not job.cached and job.html == PAGE
+    cache.close()
+
+
+def test_extract_html_keeps_a_good_article(monkeypatch, proxy):
+    monkeypatch.setattr(
+        capture_flow, "extract_article_from_html", lambda url, html: article(url, "x" * 500)
+    )
+    monkeypatch.setattr(capture_flow, "fetch_via_proxy", pytest.fail)
+    assert extract_html(URL, PAGE).content_markdown == "x" * 500
+
+
+def test_extract_html_retries_a_challenge_page_through_the_proxy(monkeypatch):
+    def extract(url, html):
+        if html == "wall":
+            raise ValueError("looks like a wall/challenge page")
+        return article(url, "real article " * 30)
+
+    monkeypatch.setattr(capture_flow, "extract_article_from_html", extract)
+    monkeypatch.setattr(capture_flow, "fetch_via_proxy", lambda url: "real page")
+    assert extract_html(URL, "wall").content_markdown.startswith("real article")
+
+
+def test_extract_html_keeps_the_direct_copy_when_the_proxy_is_no_better(monkeypatch):
+    pages = {"direct": "short", "proxied": "tiny"}
+    monkeypatch.setattr(
+        capture_flow, "extract_article_from_html", lambda url, html: article(url, pages[html])
+    )
+    monkeypatch.setattr(capture_flow, "fetch_via_proxy", lambda url: "proxied")
+    assert extract_html(URL, "direct").content_markdown == "short"
+
+
+def test_extract_html_raises_when_nothing_is_usable(monkeypatch, no_proxy):
+    def extract(url, html):
+        raise ValueError("looks like a wall/challenge page")
+
+    monkeypatch.setattr(capture_flow, "extract_article_from_html", extract)
+    with pytest.raises(ValueError, match="wall"):
+        extract_html(URL, "wall")
+    with pytest.raises(ValueError, match="Failed to fetch"):
+        extract_html(URL, None)
+
+
+def test_extract_job_uses_the_feed_author_as_a_fallback(monkeypatch):
+    monkeypatch.setattr(capture_flow, "extract_html", lambda url, html, **_: article(url, "text"))
+    job = extract_job(CaptureJob(URL, author="Feed Author", html=PAGE))
+    assert job.content.author == "Feed Author"
+    assert job.html is None
+
+
+class FakeSession:
+    concurrent = True
+
+    def __init__(self) -> None:
+        self.created: list[dict] = []
+
+    def create(self, body, frontmatter):
+        self.created.append(frontmatter)
+        return {"id": len(self.created), "title": frontmatter["title"]}
+
+
+def test_capture_stages_end_to_end(monkeypatch):
+    monkeypatch.setattr(capture_flow, "fetch_html", lambda url, **_: f"<p>{url}</p>")
+
+    def extract(url, html, **_):
+        if url.endswith("/bad"):
+            raise ValueError("no article")
+        return CapturedContent(url=url, title=url.rsplit("/", 1)[1], content_markdown=html)
+
+    monkeypatch.setattr(capture_flow, "extract_html", extract)
+    session = FakeSession()
+    results, errors = [], []
+    with BatchWriter(session, results.append, max_delay=None) as writer:
+        stages = capture_stages(writer, fetch_workers=4, extract_workers=2)
+        urls = [f"https://example.com/{name}" for name in ("a", "b", "bad", "c")]
+        Pipeline(stages, on_error=lambda stage, job, exc: errors.append((stage, job.url))).run(
+            CaptureJob(url) for url in urls
+        )
+    assert sorted(r.item.url for r in results if r.ok) == [urls[0], urls[1], urls[3]]
+    assert sorted(fm["title"] for fm in session.created) == ["a", "b", "c"]
+    assert errors == [("extract", urls[2])]
+
+
+def test_httpx_errors_do_not_escape_the_fetch_tiers(httpx_mock, no_proxy):
+    httpx_mock.add_exception(httpx.ConnectError("refused"), url=URL)
+    browser = FakeBrowser()
+    assert fetch_html(URL, browser=browser) == PAGE
@@ -0,0 +1,115 @@
+import subprocess
+import sys
+import textwrap
+import threading
+
+import pytest
+
+from amperstand import captured_index, state as state_module
+from amperstand.captured_index import INDEX_FILE
+from amperstand.state import AppState
+
+
+@pytest.fixture(autouse=True)
+def no_refresh_delay(monkeypatch):
+    monkeypatch.setattr(captured_index, "REFRESH_S", 0.0)
+
+
+def capture_in_subprocess(state_dir, url: str) -> None:
+    script = textwrap.dedent(f"""
+        from pathlib import Path
+        from amperstand.state import AppState
+
+        state = AppState(Path({str(state_dir)!r}))
+        state.mark_captured({url!r})
+        state.close()
+    """)
+    subprocess.run([sys.executable, "-c", script], check=True)
+
+
+def test_sees_captures_from_another_process(tmp_path):
+    state = AppState(tmp_path)
+    try:
+        assert not state.is_captured("https://example.com/post")  # opens the index
+        capture_in_subprocess(tmp_path, "https://example.com/post?utm_source=x")
+        assert state.is_captured("https://www.example.com/post")
+    finally:
+        state.close()
+
+
+def test_reopened_index_includes_earlier_captures(tmp_path):
+    state = AppState(tmp_path)
+    state.mark_captured("https://example.com/a")
+    assert state.is_captured("https://example.com/a")
+    state.close()
+    assert (tmp_path / INDEX_FILE).exists()
+
+    state = AppState(tmp_path)
+    try:
+        assert state.is_captured("https://example.com/a")
+        assert not state.is_captured("https://example.com/b")
+    finally:
+        state.close()
+
+
+def test_rebuilds_after_a_large_backlog(tmp_path, monkeypatch):
+    monkeypatch.setattr(captured_index, "REBUILD_AT", 10)
+    state = AppState(tmp_path)
+    try:
+        assert not state.is_captured("https://example.com/0")
+        with state.batch():
+            for i in range(50):
+                state.mark_captured(f"https://example.com/{i}")
+        capture_in_subprocess(tmp_path, "https://example.com/from-elsewhere")
+        assert state.is_captured("https://example.com/from-elsewhere")
+        assert state._captured._snapshot.count == 51
+        assert all(state.is_captured(f"https://example.com/{i}") for i in range(50))
+    finally:
+        state.close()
+
+
+def test_rules_change_rekeys_history_and_index(tmp_path, monkeypatch):
+    with monkeypatch.context() as old_rules:
+        # An older release that only stripped whitespace.
+        old_rules.setattr(state_module, "CANONICAL_VERSION", 1)
+        old_rules.setattr(state_module, "canonicalize", str.strip)
+        state = AppState(tmp_path)
+        state.mark_captured("https://example.com/blog/my-post/amp")
+        assert not state.is_captured("https://example.com/blog/my-post")
+        state.close()
+
+    state = AppState(tmp_path)
+    try:
+        assert state._get_setting("canonical_version") == state_module.CANONICAL_VERSION
+        assert state.is_captured("https://example.com/blog/my-post")
+        assert state._captured._snapshot.version == state_module.CANONICAL_VERSION
+    finally:
+        state.close()
+
+
+def test_commit_racing_the_index_open_is_not_lost(tmp_path, monkeypatch):
+    monkeypatch.setattr(captured_index, "REFRESH_S", 3600.0)  # only add() can teach it
+    loaded, release = threading.Event(), threading.Event()
+
+    class SlowIndex(captured_index.CapturedIndex):
+        def __init__(self, *args, **kwargs):
+            super().__init__(*args, **kwargs)
+            "https://example.com/" in self  # spend the top-up that follows a load
+            loaded.set()  # snapshot taken, not yet published on the AppState
+            release.wait(5)
+
+    monkeypatch.setattr(state_module, "CapturedIndex", SlowIndex)
+    state = AppState(tmp_path)
+    try:
+        opener = threading.Thread(target=state.is_captured, args=("https://example.com/a",))
+        opener.start()
+        assert loaded.wait(5)
+        writer = threading.Thread(target=state.mark_captured, args=("https://example.com/b",))
+        writer.start()
+        writer.join(0.2)  # commits, then waits for the open to finish
+        release.set()
+        opener.join()
+        writer.join()
+        assert state.is_captured("https://example.com/b")
+    finally:
+        state.close()
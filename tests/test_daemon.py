@@ -0,0 +1,150 @@
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from amperstand.daemon import Daemon, DaemonUnavailable, is_running, request, socket_path, submit
+from amperstand.state import AppState
+
+
+@pytest.fixture
+def state_dir():
+    # Short path: Unix socket paths are limited to ~100 bytes.
+    path = Path(tempfile.mkdtemp(prefix="ampd"))
+    yield path
+    shutil.rmtree(path, ignore_errors=True)
+
+
+@pytest.fixture
+def state(state_dir):
+    state = AppState(state_dir)
+    yield state
+    state.close()
+
+
+def fake_run_jobs(seen: list):
+    """Stands in for the capture pipeline: URLs containing "bad" fail."""
+
+    def run(source, on_done):
+        for job in source:
+            seen.append(job.url)
+            if "bad" in job.url:
+                on_done(job, None, RuntimeError("wall"))
+            else:
+                on_done(job, {"id": job.url}, None)
+
+    return run
+
+
+def start(daemon: Daemon, state_dir: Path) -> threading.Thread:
+    thread = threading.Thread(target=daemon.serve, daemon=True)
+    thread.start()
+    for _ in range(100):
+        if is_running(state_dir):
+            return thread
+        time.sleep(0.02)
+    raise AssertionError("daemon did not start")
+
+
+def wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def test_runs_submitted_and_previously_queued_jobs(state, state_dir):
+    state.enqueue_job("https://example.com/queued")
+    seen = []
+    daemon = Daemon(state, fake_run_jobs(seen), state_dir=state_dir, poll_interval=1)
+    thread = start(daemon, state_dir)
+
+    job = submit("https://example.com/new", state_dir=state_dir)
+    assert isinstance(job, int)
+    wait_for(lambda: daemon.captured == 2)
+    status = request({"op": "status"}, state_dir=state_dir)
+    assert status["ok"] and status["captured"] == 2
+    assert status["jobs"] == {"done": 2}
+
+    assert request({"op": "stop"}, state_dir=state_dir) == {"ok": True}
+    thread.join(5)
+    assert not thread.is_alive()
+    assert not socket_path(state_dir).exists()
+    assert seen == ["https://example.com/queued", "https://example.com/new"]
+
+
+def test_failed_jobs_back_off_then_fail(state, state_dir):
+    seen = []
+    daemon = Daemon(
+        state, fake_run_jobs(seen), state_dir=state_dir, max_attempts=3, backoff=0.05,
+        poll_interval=0.2,
+    )
+    thread = start(daemon, state_dir)
+    submit("https://example.com/bad", state_dir=state_dir)
+    wait_for(lambda: daemon.failed == 1)
+    daemon.stop()
+    thread.join(5)
+
+    assert seen == ["https://example.com/bad"] * 3
+    [failed] = state.failed_jobs()
+    assert failed["attempts"] == 3 and failed["error"] == "wall"
+
+
+def test_running_jobs_are_requeued_on_start(state, state_dir):
+    state.enqueue_job("https://example.com/interrupted")
+    assert state.claim_job() is not None  # a daemon died holding it
+    seen = []
+    daemon = Daemon(state, fake_run_jobs(seen), state_dir=state_dir, poll_interval=1)
+    thread = start(daemon, state_dir)
+    wait_for(lambda: daemon.captured == 1)
+    daemon.stop()
+    thread.join(5)
+    assert seen == ["https://example.com/interrupted"]
+
+
+def test_rejects_bad_requests(state, state_dir):
+    daemon = Daemon(state, fake_run_jobs([]), state_dir=state_dir, poll_interval=1)
+    thread = start(daemon, state_dir)
+    try:
+        reply = request({"op": "capture", "url": "ftp://example.com"}, state_dir=state_dir)
+        assert not reply["ok"] and "not a URL" in reply["error"]
+        reply = request({"op": "explode"}, state_dir=state_dir)
+        assert not reply["ok"] and "unknown op" in reply["error"]
+        with pytest.raises(DaemonUnavailable, match="not a URL"):
+            submit("not a url", state_dir=state_dir)
+    finally:
+        daemon.stop()
+        thread.join(5)
+
+
+def test_client_without_a_daemon(state_dir):
+    assert not is_running(state_dir)
+    with pytest.raises(DaemonUnavailable):
+        submit("https://example.com/", state_dir=state_dir)
+
+
+def test_stale_socket_is_replaced(state, state_dir):
+    stale = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    stale.bind(str(socket_path(state_dir)))
+    stale.close()  # the file stays behind, nobody listens
+    daemon = Daemon(state, fake_run_jobs([]), state_dir=state_dir, poll_interval=1)
+    thread = start(daemon, state_dir)
+    daemon.stop()
+    thread.join(5)
+    assert not thread.is_alive()
+
+
+def test_second_daemon_refuses_to_start(state, state_dir):
+    first = Daemon(state, fake_run_jobs([]), state_dir=state_dir, poll_interval=1)
+    thread = start(first, state_dir)
+    try:
+        second = Daemon(state, fake_run_jobs([]), state_dir=state_dir)
+        with pytest.raises(RuntimeError, match="already listening"):
+            second.serve()
+    finally:
+        first.stop()
+        thread.join(5)
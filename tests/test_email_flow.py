@@ -0,0 +1,89 @@
+import threading
+import time
+
+from amperstand_core.models import CapturedContent, ContentType
+
+from amperstand.email_flow import AccountStats, EmailJob, email_stages, fetch_all
+from amperstand.pipeline import Pipeline
+
+
+def newsletter(label: str, n: int) -> CapturedContent:
+    return CapturedContent(
+        url=f"email://{label}/{n}",
+        title=f"{label} #{n}",
+        content_markdown="body",
+        content_type=ContentType.NEWSLETTER,
+    )
+
+
+def fake_fetch(account: dict):
+    label = account["name"]
+    for n in range(account["count"]):
+        if n == account.get("fail_at"):
+            raise OSError("connection reset")
+        yield str(n).encode(), newsletter(label, n)
+
+
+def test_fetch_all_interleaves_accounts_and_records_errors():
+    accounts = [
+        ("a", {"name": "a", "count": 5}),
+        ("b", {"name": "b", "count": 3}),
+        ("c", {"name": "c", "count": 4, "fail_at": 2}),
+    ]
+    stats = {label: AccountStats(label) for label, _ in accounts}
+
+    jobs = list(fetch_all(accounts, fake_fetch, stats, queue_size=2))
+
+    titles = sorted(job.content.title for job in jobs)
+    assert len(titles) == 10
+    assert {job.label for job in jobs} == {"a", "b", "c"}
+    assert (stats["a"].fetched, stats["b"].fetched, stats["c"].fetched) == (5, 3, 2)
+    assert stats["c"].error == "connection reset"
+    assert stats["a"].error is None
+    assert all(st.finished is not None for st in stats.values())
+
+
+def test_fetch_all_blocks_fetchers_when_the_queue_is_full():
+    produced = []
+
+    def fetch(account):
+        for n in range(10):
+            produced.append(n)
+            yield str(n).encode(), newsletter("a", n)
+
+    jobs = fetch_all([("a", {})], fetch, {"a": AccountStats("a")}, queue_size=2)
+    first = next(jobs)
+    time.sleep(0.1)  # let the fetcher run ahead as far as it can
+    assert first.uid == b"0"
+    assert len(produced) <= 4  # one taken, two queued, one blocked on put
+    assert len(list(jobs)) == 9
+
+
+def test_fetch_all_with_no_accounts():
+    assert list(fetch_all([], fake_fetch, {})) == []
+
+
+class FakeWriter:
+    def __init__(self) -> None:
+        self.docs = []
+        self.lock = threading.Lock()
+
+    def add_doc(self, body, frontmatter, item=None):
+        with self.lock:
+            self.docs.append((body, frontmatter, item))
+
+
+def test_email_stages_dedup_convert_and_save():
+    writer = FakeWriter()
+    stages = email_stages(writer, is_duplicate=lambda job: job.uid == b"dup", workers=4)
+    assert [s.name for s in stages] == ["dedup", "convert", "save"]
+
+    jobs = [EmailJob("a", str(n).encode(), newsletter("a", n)) for n in range(5)]
+    jobs.append(EmailJob("a", b"dup", newsletter("a", 99)))
+    Pipeline(stages).run(jobs)
+
+    assert sorted(fm["title"] for _, fm, _ in writer.docs) == [f"a #{n}" for n in range(5)]
+    body, fm, item = writer.docs[0]
+    assert body.startswith(f"# {fm['title']}\n")
+    assert fm["type"] == "newsletter"
+    assert item.frontmatter is fm
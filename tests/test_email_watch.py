@@ -0,0 +1,151 @@
+import imaplib
+from email.message import EmailMessage
+
+import pytest
+
+from amperstand import email_flow
+
+
+def raw_email(sender: str, subject: str) -> bytes:
+    msg = EmailMessage()
+    msg["From"] = sender
+    msg["Subject"] = subject
+    msg["Message-ID"] = f"<{subject}@example.com>"
+    msg.set_content(f"{subject} body")
+    return msg.as_bytes()
+
+
+class Stop(Exception):
+    """Ends the otherwise endless watch loop."""
+
+
+class FakeConn:
+    def __init__(self, mail=None, *, idle=True, lines=()):
+        self.mail = dict(mail or {})
+        self.idle = idle
+        self.lines = list(lines)
+        self.searches = []
+        self.seen = []
+        self.sent = []
+        self.logged_out = False
+        self.sock = self
+
+    # imaplib surface used by the watch loop
+    def capability(self):
+        return "OK", [b"IMAP4rev1 IDLE" if self.idle else b"IMAP4rev1"]
+
+    def search(self, charset, criterion):
+        self.searches.append(criterion)
+        return "OK", [b" ".join(uid for uid in self.mail if uid not in self.seen)]
+
+    def fetch(self, uid, parts):
+        return "OK", [(b"1 (RFC822)", self.mail[uid])]
+
+    def store(self, uid, op, flag):
+        self.seen.append(uid)
+        return "OK", [b""]
+
+    def noop(self):
+        raise Stop
+
+    def logout(self):
+        self.logged_out = True
+
+    def _new_tag(self):
+        return b"A1"
+
+    def send(self, data):
+        self.sent.append(data)
+
+    def readline(self):
+        return self.lines.pop(0) if self.lines else b""
+
+    def pending(self):
+        return 1
+
+
+def test_deliver_unseen_marks_delivered_mail_seen_and_leaves_rejects():
+    conn = FakeConn({
+        b"1": raw_email("news@substack.com", "one"),
+        b"2": raw_email("spam@example.com", "two"),
+    })
+    got = []
+
+    email_flow._deliver_unseen(
+        conn, {}, got.append, lambda msg: "substack" in msg["From"]
+    )
+
+    assert [c.title for c in got] == ["one"]
+    assert conn.seen == [b"1"]
+    assert conn.searches == ["UNSEEN"]
+
+
+def test_failed_save_stays_unseen():
+    conn = FakeConn({b"1": raw_email("a@b.c", "one"), b"2": raw_email("a@b.c", "two")})
+    got = []
+
+    def on_email(content):
+        if content.title == "one":
+            raise RuntimeError("backend down")
+        got.append(content.title)
+
+    email_flow._deliver_unseen(conn, {}, on_email, None)
+    assert got == ["two"]
+    assert conn.seen == [b"2"]
+
+
+@pytest.mark.parametrize(
+    ("account", "criterion"),
+    [
+        ({}, "UNSEEN"),
+        ({"since": "2024-03-05"}, '(UNSEEN SINCE "05-Mar-2024")'),
+        ({"since": "05-Mar-2024"}, '(UNSEEN SINCE "05-Mar-2024")'),
+        ({"search_criterion": "ALL", "since": "2024-03-05"}, "ALL"),
+    ],
+)
+def test_search_criterion(account, criterion):
+    assert email_flow._search_criterion(account) == criterion
+
+
+def test_idle_reads_through_to_its_tagged_reply():
+    conn = FakeConn(lines=[b"+ idling\r\n", b"* 4 EXISTS\r\n", b"* 1 RECENT\r\n", b"A1 OK\r\n"])
+    assert email_flow._idle(conn) is True
+    assert conn.sent == [b"A1 IDLE\r\n", b"DONE\r\n"]
+    assert conn.lines == []
+
+
+def test_idle_eof_is_a_dropped_connection():
+    conn = FakeConn(lines=[b"+ idling\r\n"])
+    with pytest.raises(imaplib.IMAP4.abort):
+        email_flow._idle(conn)
+
+
+def test_watch_reconnects_after_a_drop(monkeypatch):
+    monkeypatch.setattr(email_flow, "RECONNECT_DELAY_S", 0)
+    monkeypatch.setattr(email_flow.time, "sleep", lambda s: None)
+    conns = [
+        FakeConn({b"1": raw_email("a@b.c", "one")}, lines=[b"+ idling\r\n"]),  # EOF mid-IDLE
+        FakeConn({b"2": raw_email("a@b.c", "two")}, idle=False),  # polls, then Stop
+    ]
+    monkeypatch.setattr(email_flow, "_connect", lambda account: conns.pop(0))
+    events, got = [], []
+
+    with pytest.raises(Stop):
+        email_flow.watch_account(
+            {},
+            lambda c: got.append(c.title),
+            on_connect=lambda: events.append("connect"),
+            on_disconnect=lambda exc: events.append(type(exc).__name__),
+        )
+
+    assert got == ["one", "two"]
+    assert events == ["connect", "abort", "connect"]
+
+
+def test_first_connect_failure_propagates(monkeypatch):
+    def refuse(account):
+        raise imaplib.IMAP4.error("auth failed")
+
+    monkeypatch.setattr(email_flow, "_connect", refuse)
+    with pytest.raises(imaplib.IMAP4.error, match="auth failed"):
+        email_flow.watch_account({}, lambda c: None)
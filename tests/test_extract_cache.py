@@ -0,0 +1,119 @@
+import sqlite3
+
+import pytest
+from amperstand_core.models import CapturedContent, ContentType
+
+from amperstand import extract_cache
+from amperstand.extract_cache import CACHE_FILE, ExtractCache, open_extract_cache
+
+
+def article(url: str, body: str = "body") -> CapturedContent:
+    return CapturedContent(
+        url=url,
+        title=f"Title of {url}",
+        content_markdown=body,
+        content_type=ContentType.ARTICLE,
+        author="Ann Author",
+        tags=["a", "b"],
+    )
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(extract_cache.time, "time", lambda: now[0])
+    return now
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ExtractCache(tmp_path)
+    yield cache
+    cache.close()
+
+
+def test_round_trip(cache):
+    content = article("https://example.com/post")
+    cache.put(content)
+    got = cache.get("https://example.com/post")
+    assert got == content
+
+
+def test_spellings_share_an_entry(cache):
+    cache.put(article("https://example.com/post"), "https://www.example.com/post/?utm_source=x")
+    assert cache.get("http://example.com/post").url == "https://example.com/post"
+    assert cache.stats()["entries"] == 1
+
+
+def test_put_replaces(cache):
+    cache.put(article("https://example.com/post", "old"))
+    cache.put(article("https://example.com/post", "new"))
+    assert cache.get("https://example.com/post").content_markdown == "new"
+    assert cache.stats()["entries"] == 1
+
+
+def test_entries_expire(tmp_path, clock):
+    cache = ExtractCache(tmp_path, ttl=60)
+    cache.put(article("https://example.com/post"))
+    clock[0] += 59
+    assert cache.get("https://example.com/post") is not None
+    clock[0] += 2
+    assert cache.get("https://example.com/post") is None
+    assert cache.stats()["entries"] == 0
+    cache.close()
+
+
+def test_least_recently_used_is_evicted_first(tmp_path, clock):
+    probe = ExtractCache(tmp_path / "probe")
+    probe.put(article("https://example.com/0", "x" * 1000))
+    one = probe.stats()["bytes"]
+    probe.close()
+
+    cache = ExtractCache(tmp_path, max_bytes=3 * one)
+    for i in range(3):
+        clock[0] += 1
+        cache.put(article(f"https://example.com/{i}", "x" * 1000))
+    clock[0] += 1
+    cache.get("https://example.com/0")  # now more recent than /1
+    clock[0] += 1
+    cache.put(article("https://example.com/3", "x" * 1000))
+
+    assert cache.get("https://example.com/1") is None
+    assert all(cache.get(f"https://example.com/{i}") for i in (0, 2, 3))
+    cache.close()
+
+
+def test_clear(cache):
+    cache.put(article("https://example.com/a"))
+    cache.put(article("https://example.com/b"))
+    assert cache.clear() == 2
+    assert cache.stats() == {"entries": 0, "bytes": 0}
+
+
+def test_older_cache_file_is_dropped(tmp_path):
+    conn = sqlite3.connect(tmp_path / CACHE_FILE)
+    conn.execute(
+        "CREATE TABLE extract_cache (key TEXT PRIMARY KEY, url TEXT NOT NULL, "
+        "content_hash TEXT NOT NULL, payload TEXT NOT NULL, size INTEGER NOT NULL, "
+        "created_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+    )
+    conn.execute("INSERT INTO extract_cache VALUES ('k', 'u', 'h', '{}', 2, 0, 0)")
+    conn.commit()
+    conn.close()
+
+    cache = ExtractCache(tmp_path)
+    assert cache.stats()["entries"] == 0
+    cache.put(article("https://example.com/post"))
+    assert cache.get("https://example.com/post") is not None
+    cache.close()
+
+
+def test_open_extract_cache_reads_config(tmp_path):
+    from amperstand.config import set_value
+
+    set_value("extract_cache.ttl_hours", "2", tmp_path)
+    cache = open_extract_cache(tmp_path)
+    assert cache._ttl == 7200
+    cache.close()
+    set_value("extract_cache.enabled", "false", tmp_path)
+    assert open_extract_cache(tmp_path) is None
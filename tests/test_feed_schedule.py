@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+from amperstand.feed_schedule import BACKOFF, DEFAULT_INTERVAL, plan_next_poll
+
+NOW = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+LIMITS = {"min_interval": 300.0, "max_interval": 86400.0}
+
+
+def hours_ago(*hours: float) -> list[datetime]:
+    return [NOW - timedelta(hours=h) for h in hours]
+
+
+def test_new_feed_without_enough_dates_uses_the_default():
+    schedule = plan_next_poll(None, hours_ago(1), now=NOW.timestamp(), **LIMITS)
+    assert schedule.interval == DEFAULT_INTERVAL
+    assert schedule.next_due == NOW.timestamp() + DEFAULT_INTERVAL
+
+
+def test_interval_is_half_the_median_gap():
+    schedule = plan_next_poll(None, hours_ago(2, 6, 10, 14), now=NOW.timestamp(), **LIMITS)
+    assert schedule.cadence == 4 * 3600
+    assert schedule.interval == 2 * 3600
+
+
+def test_interval_stays_within_limits():
+    busy = plan_next_poll(None, hours_ago(0.01, 0.02, 0.03), now=NOW.timestamp(), **LIMITS)
+    quiet = plan_next_poll(None, hours_ago(100, 500, 900), now=NOW.timestamp(), **LIMITS)
+    assert busy.interval == LIMITS["min_interval"]
+    assert quiet.interval == LIMITS["max_interval"]
+
+
+def test_poll_without_new_entries_backs_off():
+    first = plan_next_poll(None, hours_ago(2, 6, 10), now=NOW.timestamp(), **LIMITS)
+    later = NOW.timestamp() + first.interval
+    second = plan_next_poll(first, [], now=later, **LIMITS)
+    assert second.interval == first.interval * BACKOFF
+    assert second.recent == first.recent
+
+
+def test_future_dated_entries_are_ignored():
+    future = NOW + timedelta(days=3)
+    first = plan_next_poll(None, [*hours_ago(2, 6, 10), future], now=NOW.timestamp(), **LIMITS)
+    assert future.timestamp() not in first.recent
+    assert max(first.recent) < NOW.timestamp()
+    # Seeing the same scheduled post again is not "found new".
+    second = plan_next_poll(first, [future], now=NOW.timestamp() + 60, **LIMITS)
+    assert second.interval == first.interval * BACKOFF
+
+
+def test_naive_datetimes_are_utc():
+    naive = [d.replace(tzinfo=None) for d in hours_ago(2, 6)]
+    schedule = plan_next_poll(None, naive, now=NOW.timestamp(), **LIMITS)
+    assert schedule.recent == [d.timestamp() for d in hours_ago(2, 6)]
@@ -0,0 +1,119 @@
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+from amperstand_core.models import CapturedContent
+from typer.testing import CliRunner
+
+from amperstand import backend_bridge, capture_flow
+from amperstand.state import AppState
+from amperstand.urls import canonicalize
+
+NOW = datetime.now(timezone.utc)
+
+
+def rss(path, entries: list[str]) -> str:
+    """Write an RSS file listing *entries* newest first; returns its path."""
+    items = "".join(
+        f"<item><title>{url.rsplit('/', 1)[1]}</title><link>{url}</link>"
+        f"<pubDate>{format_datetime(NOW - timedelta(hours=i))}</pubDate></item>"
+        for i, url in enumerate(entries)
+    )
+    path.write_text(
+        f'<?xml version="1.0"?><rss version="2.0"><channel><title>{path.stem}</title>'
+        f"{items}</channel></rss>",
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+class FakeBackend:
+    def __init__(self) -> None:
+        self.created: list[str] = []
+
+    def create(self, body, frontmatter):
+        self.created.append(frontmatter["source"])
+        return {"id": str(len(self.created)), "title": frontmatter["title"]}
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def env(state_home, tmp_path, monkeypatch):
+    backend = FakeBackend()
+    extracted: list[str] = []
+    monkeypatch.setattr(backend_bridge, "get_backend", lambda: backend)
+    monkeypatch.setattr(capture_flow, "fetch_html", lambda url, **_: f"<p>{url}</p>")
+
+    def extract(url, html, **_):
+        extracted.append(url)
+        if "/bad" in url:
+            raise ValueError("no article found")
+        return CapturedContent(url=url, title=url.rsplit("/", 1)[1], content_markdown="body")
+
+    monkeypatch.setattr(capture_flow, "extract_html", extract)
+    feeds = [
+        rss(tmp_path / "one.xml", [
+            "https://a.example/1", "https://a.example/2", "https://s.example/shared",
+        ]),
+        rss(tmp_path / "two.xml", [
+            "https://b.example/1", "https://www.s.example/shared/", "https://b.example/bad",
+        ]),
+    ]
+    state = AppState(state_home)
+    for url in feeds:
+        state.add_feed(url, name=url.rsplit("/", 1)[1])
+    state.mark_captured("https://a.example/2")
+    state.close()
+    return backend, extracted
+
+
+def sync(*args: str):
+    from amperstand.cli import app
+
+    result = CliRunner().invoke(app, ["feed", "sync", *args])
+    assert result.exit_code == 0, result.output
+    return result.output
+
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_sync_captures_new_entries_once(env, workers):
+    backend, extracted = env
+    out = sync("--workers", workers)
+
+    # Parallel feeds race for the shared URL; either spelling may win.
+    assert sorted(canonicalize(url) for url in backend.created) == [
+        "https://a.example/1", "https://b.example/1", "https://s.example/shared",
+    ]
+    # a.example/2 was already captured; the shared URL is new only once.
+    assert "Done: captured 3, skipped 2 already captured." in out
+    assert "no article found" in out
+
+    state = AppState()
+    try:
+        assert state.is_captured("https://b.example/1")
+        assert not state.is_captured("https://b.example/bad")
+    finally:
+        state.close()
+
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_second_sync_only_retries_what_failed(env, workers):
+    backend, extracted = env
+    sync("--workers", workers)
+    extracted.clear()
+
+    out = sync("--workers", workers)
+    assert extracted == ["https://b.example/bad"]
+    assert len(backend.created) == 3
+    assert "Done: captured 0" in out
+
+
+@pytest.mark.parametrize("workers", ["1", "4"])
+def test_dry_run_lists_without_capturing(env, workers):
+    backend, extracted = env
+    out = sync("--dry-run", "--workers", workers)
+    assert "[new] 1 (" in out and "[new] bad (" in out
+    assert "Done: would capture 4, skipped 2 already captured." in out
+    assert backend.created == [] and extracted == []
@@ -0,0 +1,53 @@
+from datetime import datetime, timedelta, timezone
+
+from amperstand_core.feed import FeedEntry
+
+from amperstand.feed_watermark import Watermark, advance, entries_after
+from amperstand.urls import canonicalize
+
+NOW = datetime(2026, 5, 1, 12, tzinfo=timezone.utc)
+
+
+def entry(slug: str, hours_ago: float | None) -> FeedEntry:
+    published = None if hours_ago is None else NOW - timedelta(hours=hours_ago)
+    return FeedEntry(url=f"https://example.com/{slug}", title=slug, published=published)
+
+
+def test_no_mark_keeps_everything():
+    entries = [entry("a", 1), entry("b", 2)]
+    assert entries_after(entries, None) == (entries, 0)
+
+
+def test_entries_below_the_mark_are_skipped():
+    new, at_mark, old = entry("new", 1), entry("same-time", 5), entry("old", 9)
+    mark = Watermark(published=(NOW - timedelta(hours=5)).timestamp())
+    fresh, skipped = entries_after([new, at_mark, old], mark)
+    # Entries at the mark are still checked: several posts can share a timestamp.
+    assert fresh == [new, at_mark]
+    assert skipped == 1
+
+
+def test_undated_entries_stop_at_the_remembered_newest_entry():
+    entries = [entry("c", None), entry("b", None), entry("a", None)]
+    mark = Watermark(entry_key=canonicalize("http://www.example.com/b"))
+    assert entries_after(entries, mark) == (entries[:1], 2)
+
+
+def test_advance_moves_to_the_newest_handled_entry():
+    scanned = [entry("new", 1), entry("old", 3)]
+    mark = advance(Watermark(published=0.0), scanned, [])
+    assert mark.published == scanned[0].published.timestamp()
+    assert mark.entry_key == canonicalize(scanned[0].url)
+
+
+def test_advance_stops_below_an_unhandled_entry():
+    newest, failed, oldest = entry("newest", 1), entry("failed", 2), entry("oldest", 3)
+    mark = advance(None, [newest, failed, oldest], [failed])
+    assert mark.published == oldest.published.timestamp()
+    assert entries_after([newest, failed, oldest], mark)[0] == [newest, failed, oldest]
+
+
+def test_advance_never_moves_backwards():
+    previous = Watermark(published=NOW.timestamp())
+    mark = advance(previous, [entry("late-arrival", 10)], [])
+    assert mark.published == previous.published
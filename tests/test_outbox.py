@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from amperstand.outbox import Outbox
+
+
+class FlakyBackend:
+    """Stands in for a `BackendSession`: fails every create while `down`."""
+
+    def __init__(self) -> None:
+        self.down = True
+        self.created: list[str] = []
+
+    def create(self, body, frontmatter):
+        if self.down:
+            raise ConnectionError("backend down")
+        self.created.append(body)
+        return {"id": len(self.created), "title": frontmatter.get("title")}
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    outbox = Outbox(tmp_path, backoff=10.0, max_backoff=25.0, max_attempts=3)
+    yield outbox
+    outbox.close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+
+def test_backoff_doubles_up_to_the_cap(outbox, clock):
+    entry_id = outbox.put("body", {"title": "T"}, "boom")
+    delays = []
+    for _ in range(3):
+        (entry,) = outbox.entries()
+        delays.append(entry.next_attempt_at - clock[0])
+        outbox.failed(entry_id, "boom")
+    assert delays == [10.0, 20.0, 25.0]
+
+
+def test_only_due_entries_are_drained(outbox, clock):
+    backend = FlakyBackend()
+    backend.down = False
+    outbox.put("body", {"title": "T"}, "boom")
+    assert outbox.drain(backend) == (0, 0)
+    clock[0] += 10
+    assert outbox.drain(backend) == (1, 0)
+    assert backend.created == ["body"]
+    assert outbox.count() == 0
+
+
+def test_entries_past_max_attempts_are_dead(outbox, clock, caplog):
+    backend = FlakyBackend()
+    outbox.put("body", {"title": "T"}, "boom")
+    for _ in range(2):
+        clock[0] += 100
+        assert outbox.drain(backend) == (0, 1)
+    assert "giving up on #1 T after 3 attempts" in caplog.text
+    (entry,) = outbox.entries()
+    assert outbox.is_dead(entry)
+    assert outbox.dead_count() == 1
+
+    clock[0] += 1000
+    assert outbox.drain(backend) == (0, 0)  # dead entries aren't retried...
+    backend.down = False
+    assert outbox.drain(backend, force=True) == (1, 0)  # ...unless forced
+    assert outbox.count() == 0
+
+
+def test_claimed_entries_are_leased_to_one_drainer(tmp_path, clock):
+    first = Outbox(tmp_path, backoff=0.0, lease=60.0)
+    second = Outbox(tmp_path, backoff=0.0, lease=60.0)
+    try:
+        for i in range(4):
+            first.put(f"body {i}", {}, "boom")
+        assert len(first.claim(limit=3)) == 3
+        assert [e.body for e in second.claim(force=True)] == ["body 3"]
+        assert second.claim(force=True) == []
+        clock[0] += 61  # a crashed drainer's lease runs out
+        assert len(second.claim()) == 4
+    finally:
+        first.close()
+        second.close()
+
+
+def test_failed_attempt_releases_the_lease(outbox, clock):
+    entry_id = outbox.put("body", {}, "boom")
+    clock[0] += 10
+    assert [e.id for e in outbox.claim()] == [entry_id]
+    outbox.failed(entry_id, "boom again")
+    clock[0] += 20
+    assert [e.id for e in outbox.claim()] == [entry_id]
@@ -0,0 +1,136 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from amperstand.pipeline import Pipeline, Stage
+
+
+def test_items_flow_through_every_stage():
+    seen: list[int] = []
+    stages = [
+        Stage("double", lambda x: x * 2, 3),
+        Stage("collect", seen.append, 1),
+    ]
+    stats = Pipeline(stages).run(range(20))
+    assert sorted(seen) == [x * 2 for x in range(20)]
+    assert stats["double"].processed == 20
+    # The last stage's return value (None from append) is not "dropped" downstream.
+    assert stats["collect"].processed == 20
+
+
+def test_none_drops_an_item():
+    seen: list[int] = []
+    stages = [Stage("odd", lambda x: x if x % 2 else None), Stage("collect", seen.append)]
+    stats = Pipeline(stages).run(range(10))
+    assert sorted(seen) == [1, 3, 5, 7, 9]
+    assert stats["odd"].dropped == 5
+
+
+def test_fan_out_expands_items():
+    seen: list[str] = []
+    stages = [
+        Stage("expand", lambda n: [f"{n}.{i}" for i in range(n)], fan_out=True),
+        Stage("collect", seen.append),
+    ]
+    Pipeline(stages).run([1, 2, 3])
+    assert sorted(seen) == ["1.0", "2.0", "2.1", "3.0", "3.1", "3.2"]
+
+
+def test_a_failing_item_is_reported_and_the_rest_continue():
+    errors: list[tuple[str, object]] = []
+    seen: list[int] = []
+
+    def check(x: int) -> int:
+        if x == 3:
+            raise ValueError("bad item")
+        return x
+
+    stages = [Stage("check", check, 2), Stage("collect", seen.append)]
+    stats = Pipeline(stages, on_error=lambda stage, item, exc: errors.append((stage, item))).run(
+        range(6)
+    )
+    assert errors == [("check", 3)]
+    assert sorted(seen) == [0, 1, 2, 4, 5]
+    assert stats["check"].failed == 1
+
+
+def test_source_errors_are_reported():
+    errors: list[str] = []
+
+    def source():
+        yield 1
+        raise OSError("read failed")
+
+    seen: list[int] = []
+    Pipeline([Stage("collect", seen.append)], on_error=lambda s, i, e: errors.append(s)).run(
+        source()
+    )
+    assert seen == [1]
+    assert errors == ["source"]
+
+
+def test_stage_concurrency_overlaps_work():
+    active = 0
+    peak = 0
+    lock = threading.Lock()
+
+    def slow(x: int) -> int:
+        nonlocal active, peak
+        with lock:
+            active += 1
+            peak = max(peak, active)
+        time.sleep(0.02)
+        with lock:
+            active -= 1
+        return x
+
+    Pipeline([Stage("slow", slow, 4)]).run(range(12))
+    assert peak == 4
+
+
+def test_bounded_queues_apply_backpressure():
+    pulled = 0
+    release = threading.Event()
+
+    def source():
+        nonlocal pulled
+        for i in range(100):
+            pulled += 1
+            yield i
+
+    def blocked(x: int) -> int:
+        release.wait(5)
+        return x
+
+    def run() -> None:
+        Pipeline([Stage("blocked", blocked)], queue_size=2).run(source())
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    time.sleep(0.2)
+    # One item in the worker, two in the queue, one waiting on put().
+    assert pulled <= 4
+    release.set()
+    thread.join(5)
+    assert pulled == 100
+
+
+def test_coroutine_stages_and_async_sources():
+    async def source():
+        for i in range(5):
+            yield i
+
+    async def add_one(x: int) -> int:
+        await asyncio.sleep(0)
+        return x + 1
+
+    seen: list[int] = []
+    Pipeline([Stage("add", add_one, 2), Stage("collect", seen.append)]).run(source())
+    assert sorted(seen) == [1, 2, 3, 4, 5]
+
+
+def test_needs_a_stage():
+    with pytest.raises(ValueError):
+        Pipeline([])
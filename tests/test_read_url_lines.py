@@ -0,0 +1,47 @@
+import io
+
+from amperstand.cli import _read_url_lines
+
+
+def read(text: str) -> list[str]:
+    return list(_read_url_lines(io.StringIO(text)))
+
+
+def test_plain_list_skips_blanks_and_comments():
+    text = "# my reading list\n\nhttps://a.example/1\n  # indented comment\nhttps://a.example/2\n"
+    assert read(text) == ["https://a.example/1", "https://a.example/2"]
+
+
+def test_plain_list_takes_first_token_and_keeps_commas():
+    text = (
+        "https://a.example/post  a title after it\n"
+        "https://a.example/x?ids=1,2,3\n"
+        "https://a.example/y, Trailing comma\n"
+        "not a url\n"
+    )
+    assert read(text) == [
+        "https://a.example/post",
+        "https://a.example/x?ids=1,2,3",
+        "https://a.example/y",
+    ]
+
+
+def test_csv_export_yields_the_url_column():
+    text = (
+        "title,url,time_added\n"
+        '"Hello, world",https://a.example/1,1700000000\n'
+        "No url,,1700000001\n"
+        "Second,http://a.example/2,1700000002\n"
+    )
+    assert read(text) == ["https://a.example/1", "http://a.example/2"]
+
+
+def test_first_line_url_is_not_a_header():
+    # A list whose first URL happens to contain "url" stays a plain list.
+    text = "https://a.example/url,link\nhttps://a.example/2\n"
+    assert read(text) == ["https://a.example/url,link", "https://a.example/2"]
+
+
+def test_empty_input():
+    assert read("") == []
+    assert read("# only a comment\n\n") == []
@@ -0,0 +1,42 @@
+import pytest
+
+from amperstand.sender_allowlist import SenderAllowlist
+
+
+@pytest.fixture
+def allowlist() -> SenderAllowlist:
+    return SenderAllowlist(["Editor@Newsletter.com", "@substack.com", " @Example.org "])
+
+
+@pytest.mark.parametrize(
+    "sender",
+    [
+        "editor@newsletter.com",
+        "EDITOR@NEWSLETTER.COM",
+        "writer@substack.com",
+        "writer@mail.substack.com",
+        "bot@a.b.example.org",
+    ],
+)
+def test_matches(allowlist, sender):
+    assert allowlist.matches(sender)
+
+
+@pytest.mark.parametrize(
+    "sender",
+    [
+        "other@newsletter.com",
+        "someone@notsubstack.com",  # a suffix, but not a parent domain
+        "someone@substack.com.evil.net",
+        "substack.com",
+        "",
+    ],
+)
+def test_rejects(allowlist, sender):
+    assert not allowlist.matches(sender)
+
+
+def test_empty_entries_are_ignored():
+    allowlist = SenderAllowlist(["", "@", "  "])
+    assert len(allowlist) == 0
+    assert not allowlist.matches("anyone@example.com")
@@ -0,0 +1,120 @@
+import sqlite3
+import threading
+
+import pytest
+
+from amperstand.state import AppState
+
+
+@pytest.fixture
+def state(tmp_path):
+    state = AppState(tmp_path)
+    yield state
+    state.close()
+
+
+def test_mark_captured_is_keyed_by_canonical_url(state):
+    state.mark_captured("https://www.example.com/post/?utm_source=news")
+    assert state.is_captured("http://example.com/post")
+    assert not state.is_captured("https://example.com/other")
+
+
+def test_concurrent_writes_share_a_commit(state, monkeypatch):
+    commits: list[int] = []
+    commit = state._commit
+
+    def counting_commit(batch):
+        commits.append(len(batch))
+        commit(batch)
+
+    monkeypatch.setattr(state, "_commit", counting_commit)
+    errors: list[Exception] = []
+
+    def mark(i: int) -> None:
+        state.mark_captured(f"https://example.com/post-{i}")
+
+    def bad_write() -> None:
+        try:
+            state._write("INSERT INTO no_such_table VALUES (1)")
+        except sqlite3.Error as exc:
+            errors.append(exc)
+
+    # Hold the writer so every thread queues up behind the first one.
+    with state._write_lock:
+        threads = [threading.Thread(target=mark, args=(i,)) for i in range(8)]
+        threads.append(threading.Thread(target=bad_write))
+        for t in threads:
+            t.start()
+        while len(state._pending) < len(threads) - 1:
+            threading.Event().wait(0.001)
+    for t in threads:
+        t.join()
+
+    assert commits == [1, len(threads) - 1]
+    # The failing write doesn't take the rest of its group down with it.
+    assert len(errors) == 1
+    assert state.captured_count == 8
+
+
+def test_reader_connections_close_when_their_threads_exit(state, monkeypatch):
+    import amperstand.state as state_mod
+
+    opened: list[sqlite3.Connection] = []
+    connect = state_mod._connect
+
+    def recording_connect(path):
+        conn = connect(path)
+        opened.append(conn)
+        return conn
+
+    monkeypatch.setattr(state_mod, "_connect", recording_connect)
+    state.list_feeds()
+    main = state._local.reader.conn  # the main thread's reader stays open
+    for _ in range(50):
+        t = threading.Thread(target=state.list_feeds)
+        t.start()
+        t.join()
+
+    assert len(opened) == 50
+    assert len(state._readers) == 1
+    for conn in opened:
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+    main.execute("SELECT 1")
+
+    state.close()
+    with pytest.raises(sqlite3.ProgrammingError):
+        main.execute("SELECT 1")
+
+
+def test_batch_reads_its_own_writes(state, tmp_path):
+    other = AppState(tmp_path)
+    try:
+        with state.batch():
+            state.mark_captured("https://example.com/post")
+            assert state.is_captured("https://www.example.com/post/")
+            # Buffered, not committed: other connections can't see it yet.
+            assert other.captured_count == 0
+        assert other.captured_count == 1
+    finally:
+        other.close()
+
+
+def test_batch_flushes_when_the_block_raises(state):
+    with pytest.raises(RuntimeError):
+        with state.batch():
+            state.mark_captured("https://example.com/post")
+            raise RuntimeError
+    assert state.captured_count == 1
+
+
+def test_nested_batches_flush_at_the_outermost_exit(state, tmp_path):
+    other = AppState(tmp_path)
+    try:
+        with state.batch():
+            with state.batch():
+                state.mark_captured("https://example.com/post")
+            assert other.captured_count == 0
+        assert other.captured_count == 1
+    finally:
+        other.close()
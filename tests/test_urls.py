@@ -0,0 +1,56 @@
+import pytest
+
+from amperstand.urls import canonicalize
+
+
+@pytest.mark.parametrize(
+    ("url", "key"),
+    [
+        ("https://www.Example.com/post/", "https://example.com/post"),
+        ("http://example.com/post", "https://example.com/post"),
+        ("https://example.com/post#comments", "https://example.com/post"),
+        ("https://example.com/post?utm_source=news&b=2&a=1", "https://example.com/post?a=1&b=2"),
+        ("https://example.com/post?fbclid=abc", "https://example.com/post"),
+        ("https://youtu.be/abc?t=3", "https://youtube.com/watch?v=abc"),
+    ],
+)
+def test_spellings_fold_onto_one_key(url, key):
+    assert canonicalize(url) == key
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "https://example.com/blog/my-post/amp",
+        "https://example.com/amp/blog/my-post",
+        "https://example-com.cdn.ampproject.org/c/s/example.com/blog/my-post/amp",
+    ],
+)
+def test_amp_variants_map_to_the_article(url):
+    assert canonicalize(url) == "https://example.com/blog/my-post"
+
+
+def test_amp_prefix_before_dated_path():
+    assert canonicalize("https://example.com/amp/2024/05/post") == "https://example.com/2024/05/post"
+
+
+@pytest.mark.parametrize("url", ["https://example.com/tags/amp", "https://example.com/amp"])
+def test_pages_about_amp_keep_their_path(url):
+    assert canonicalize(url) == url
+
+
+def test_amp_subdomain_is_dropped():
+    assert canonicalize("https://amp.example.com/post") == "https://example.com/post"
+
+
+@pytest.mark.parametrize("url", ["https://amp.dev/documentation", "https://www.com/about"])
+def test_prefix_that_is_the_whole_domain_stays(url):
+    assert canonicalize(url) == url
+
+
+@pytest.mark.parametrize(
+    "url",
+    ["http://[bad/x", "https://example.com:abc/x", "mailto:someone@example.com"],
+)
+def test_unparseable_and_non_web_urls_come_back_unchanged(url):
+    assert canonicalize(f"  {url}\n") == url
@@ -0,0 +1,187 @@
+import subprocess
+import threading
+
+import pytest
+
+from amperstand import vault
+from amperstand.vault import (
+    VaultError,
+    VaultSyncer,
+    VaultWriter,
+    init_vault,
+    is_vault,
+    tune_vault,
+)
+
+
+def git_config(path, key: str) -> str:
+    result = subprocess.run(
+        ["git", "-C", str(path), "config", "--get", key], capture_output=True, text=True
+    )
+    return result.stdout.strip()
+
+
+@pytest.fixture(autouse=True)
+def git_identity(monkeypatch):
+    for var in ("AUTHOR", "COMMITTER"):
+        monkeypatch.setenv(f"GIT_{var}_NAME", "Test")
+        monkeypatch.setenv(f"GIT_{var}_EMAIL", "test@example.com")
+
+
+def test_is_vault_at_the_root_and_below(tmp_path):
+    init_vault(tmp_path / "repo")
+    notes = tmp_path / "repo" / "notes" / "2024"
+    notes.mkdir(parents=True)
+    assert is_vault(tmp_path / "repo")
+    assert is_vault(notes)  # a vault inside a larger repository
+    assert not is_vault(tmp_path)
+
+
+def test_is_vault_follows_a_gitfile(tmp_path):
+    (tmp_path / "worktree").mkdir()
+    (tmp_path / "worktree" / ".git").write_text("gitdir: /elsewhere\n")
+    assert is_vault(tmp_path / "worktree")
+
+
+def test_git_version_parses_vendor_strings(monkeypatch):
+    def fake_git(path, *args, **kwargs):
+        return subprocess.CompletedProcess(args, 0, "git version 2.39.3 (Apple Git-145)\n", "")
+
+    vault.git_version.cache_clear()
+    monkeypatch.setattr(vault, "_git", fake_git)
+    try:
+        assert vault.git_version() == (2, 39)
+    finally:
+        vault.git_version.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("platform", "version", "fsmonitor"),
+    [
+        ("darwin", (2, 36), "true"),
+        ("win32", (2, 45), "true"),
+        ("darwin", (2, 35), ""),
+        ("linux", (2, 45), ""),
+    ],
+)
+def test_fsmonitor_needs_a_supported_platform_and_git(
+    tmp_path, monkeypatch, platform, version, fsmonitor
+):
+    subprocess.run(["git", "init", "-q", str(tmp_path)], check=True)
+    monkeypatch.setattr(vault.sys, "platform", platform)
+    monkeypatch.setattr(vault, "git_version", lambda: version)
+    tune_vault(tmp_path)
+    assert git_config(tmp_path, "feature.manyFiles") == "true"
+    assert git_config(tmp_path, "core.fsmonitor") == fsmonitor
+
+
+def commit_count(path) -> int:
+    return int(vault._git(path, "rev-list", "--count", "HEAD").stdout)
+
+
+def write_notes(path, names):
+    files = []
+    for name in names:
+        f = path / f"{name}.md"
+        f.write_text(f"# {name}\n")
+        files.append(f)
+    return files
+
+
+@pytest.fixture
+def repo(tmp_path):
+    init_vault(tmp_path / "vault")
+    return tmp_path / "vault"
+
+
+def test_writer_commits_a_full_batch_at_once(repo):
+    commits = []
+    writer = VaultWriter(repo, max_files=3, max_delay=None, on_commit=lambda: commits.append(1))
+    files = write_notes(repo, ["a", "b", "c", "d"])
+    for f in files[:2]:
+        writer.add(f)
+    assert commit_count(repo) == 1
+    writer.add(files[2])
+    assert commit_count(repo) == 2
+    assert "Add 3 files" in vault._git(repo, "log", "-1", "--format=%B").stdout
+    writer.add(files[3])
+    assert writer.pending == 1
+    writer.close()
+    assert commit_count(repo) == 3
+    assert commits == [1, 1]
+    assert writer.pending == 0
+
+
+def test_writer_commits_after_max_delay(repo):
+    committed = threading.Event()
+    writer = VaultWriter(repo, max_delay=0.05, on_commit=committed.set)
+    writer.add(write_notes(repo, ["a"])[0])
+    assert committed.wait(5)
+    assert commit_count(repo) == 2
+    writer.close()
+
+
+def test_size_triggered_commit_does_not_wait_for_a_busy_vault(repo):
+    writer = VaultWriter(repo, max_files=1, max_delay=None)
+    with vault._vault_lock(repo):  # a sync holds the vault
+        writer.add(write_notes(repo, ["a"])[0])
+        assert writer.pending == 1
+    assert commit_count(repo) == 1
+    writer.close()
+    assert commit_count(repo) == 2
+
+
+def test_failed_commit_keeps_the_paths_queued(repo, monkeypatch):
+    writer = VaultWriter(repo, max_delay=None)
+    writer.add(write_notes(repo, ["a"])[0])
+    real = vault._commit_files
+
+    def broken(*args):
+        raise VaultError("index.lock exists")
+
+    monkeypatch.setattr(vault, "_commit_files", broken)
+    assert writer.flush() is False
+    assert writer.pending == 1
+    monkeypatch.setattr(vault, "_commit_files", real)
+    assert writer.close() is True
+    assert commit_count(repo) == 2
+
+
+def test_syncer_pushes_to_the_remote(repo, tmp_path):
+    remote = tmp_path / "remote.git"
+    subprocess.run(["git", "init", "-q", "--bare", str(remote)], check=True)
+    vault._git(repo, "remote", "add", "origin", str(remote))
+    branch = vault._git(repo, "branch", "--show-current").stdout.strip()
+    vault._git(repo, "push", "-q", "origin", branch)
+
+    with VaultWriter(repo, max_delay=None) as writer:
+        writer.add(write_notes(repo, ["a"])[0])
+    syncer = VaultSyncer(repo)
+    syncer.request()
+    assert syncer.wait(30)
+    assert syncer.last_error is None
+    head = vault._git(repo, "rev-parse", "HEAD").stdout
+    assert vault._git(remote, "rev-parse", branch).stdout == head
+
+
+def test_syncer_folds_requests_made_during_a_run(monkeypatch, tmp_path):
+    started, release = threading.Event(), threading.Event()
+    runs = []
+
+    def slow_sync(path, timeout=None):
+        runs.append(path)
+        started.set()
+        release.wait(5)
+        if len(runs) == 2:
+            raise VaultError("rejected")
+
+    monkeypatch.setattr(vault, "sync", slow_sync)
+    syncer = VaultSyncer(tmp_path)
+    syncer.request()
+    assert started.wait(5)
+    for _ in range(5):
+        syncer.request()
+    release.set()
+    assert syncer.wait(5)
+    assert syncer.runs == len(runs) == 2
+    assert str(syncer.last_error) == "rejected"